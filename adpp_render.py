@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+adpp_render.py – Render Model A-DPP (Daftar Perubahan Pemilih) seluruh TPS secara paralel.
+• ambil_kelompok_tps : satu query berurutan → baris ADPP dikelompokkan per TPS
+                       (menggantikan SELECT DISTINCT TPS + COUNT(*) per TPS).
+• ambil_baris_tps    : baris ADPP satu TPS (tampilan per TPS di LampAdpp).
+• bangun_story       : story ReportLab satu TPS dari data polos (tanpa Qt, tanpa DB).
+• render_tps         : story → bytes PDF lengkap footer 'Hal X dari Y'.
+• pdf_tps            : PDF satu TPS lewat pdf_cache (render ulang hanya bila isinya berubah).
+• render_berurutan   : TPS yang berubah dirender di process pool (1 TPS = 1 tugas),
+                       hasil di-yield sesuai urutan TPS agar bisa langsung di-merge /
+                       dicetak, dengan callback tunggu (progres) dan batal.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from itertools import groupby
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+import pdf_cache
+from report_resources import font_laporan, gaya, kanvas_nomor_halaman, logo_kpu
+
+# Worker: sisakan satu core untuk GUI, batasi agar RAM tetap wajar di laptop PPS
+JUMLAH_WORKER = max(1, min(6, (os.cpu_count() or 2) - 1))
+
+# Di bawah jumlah TPS ini (atau di mesin 1 core) biaya start proses tidak sebanding → render serial
+MIN_TPS_PARALEL = 3
+
+KOLOM_ADPP = "NKK, NIK, NAMA, TMPT_LHR, TGL_LHR, STS, JK, ALAMAT, RT, RW, DIS, KTPel, KET"
+
+JUDUL_TAHAPAN = {"DPHP": "DPS", "DPSHP": "DPSHP", "DPSHPA": "DPT"}
+
+# =========================================================
+# 🗂️ DATA
+# =========================================================
+def ambil_kelompok_tps(conn, tbl_name):
+    """
+    Satu query berurutan (TPS numerik, lalu RW, RT, NKK, NAMA) → [(tps, [baris...]), ...].
+    TPS tanpa baris KET <> '0' otomatis tidak muncul.
+    """
+    cur = conn.cursor()
+    cur.arraysize = 1000
+    cur.execute(f"""
+        SELECT TPS, {KOLOM_ADPP}
+        FROM {tbl_name}
+        WHERE KET <> '0' AND TPS IS NOT NULL
+        ORDER BY
+            CASE WHEN TPS GLOB '[0-9]*' THEN CAST(TPS AS INTEGER) END,
+            TPS, RW, RT, NKK, NAMA
+    """)
+    return [
+        (tps, [tuple(r[1:]) for r in baris])
+        for tps, baris in groupby(cur.fetchall(), key=lambda r: r[0])
+    ]
+
+
+def ambil_baris_tps(conn, tbl_name, tps):
+    """Baris ADPP satu TPS (urut RW, RT, NKK, NAMA); tps kosong → seluruh TPS."""
+    cur = conn.cursor()
+    cur.arraysize = 1000
+    if tps:
+        cur.execute(f"""
+            SELECT {KOLOM_ADPP}
+            FROM {tbl_name}
+            WHERE KET <> '0' AND TPS = ?
+            ORDER BY RW, RT, NKK, NAMA
+        """, (tps,))
+    else:
+        cur.execute(f"""
+            SELECT {KOLOM_ADPP}
+            FROM {tbl_name}
+            WHERE KET <> '0'
+            ORDER BY TPS, RW, RT, NKK, NAMA
+        """)
+    return [tuple(r) for r in cur.fetchall()]
+
+
+# =========================================================
+# 🧾 STORY & PDF (dipanggil di proses worker)
+# =========================================================
+def bangun_story(konteks, tps, rows):
+    """
+    Story Model A-DPP satu TPS.
+    konteks: dict polos (tahap, kecamatan, kabupaten, desa, label_wilayah,
+             jenis_wilayah, ketua_pps, tanggal_ba) → aman di-pickle ke worker.
+    """
+    font_base, font_bold = font_laporan("calibri")
+    judul_tahapan = JUDUL_TAHAPAN.get(konteks["tahap"], "DPHP")
+    nama_desa = konteks["desa"]
+    story = []
+
+    # ---------- Nama Form ----------
+    style_form = gaya("IdentitasRapat", fontName=font_base, fontSize=12, leading=16, alignment=TA_CENTER)
+    tabel_form = Table(
+        [["", "", "", Paragraph("Model A-Daftar Perubahan Pemilih", style_form)]],
+        colWidths=[4*cm, 10*cm, 7*cm, 7*cm],
+        hAlign="CENTER",
+    )
+    tabel_form.setStyle(TableStyle([
+        ("BOX", (0, 0), (-1, -1), 0, colors.white),
+        ("BOX", (-1, 0), (-1, -1), 0.9, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 1), colors.white),
+        ("FONTNAME", (0, 0), (-1, -1), font_bold),
+        ("FONTSIZE", (0, 0), (-1, -1), 10.5),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("LEFTPADDING", (0, 0), (-1, -1), 2),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+    ]))
+    story.append(tabel_form)
+
+    # ---------- Header Judul + Logo ----------
+    logo = logo_kpu(1.5 * cm, 1.6 * cm)
+    if logo is not None:
+        judul_html = f"""
+            <b>DAFTAR PERUBAHAN PEMILIH UNTUK {judul_tahapan}</b><br/>
+            PEMILIHAN UMUM TAHUN 2029<br/>
+            OLEH PPS
+        """
+        teks_judul = Paragraph(judul_html, gaya(
+            "TitleCenter", fontName=font_base, fontSize=13, alignment=TA_CENTER, leading=14,
+        ))
+        tbl_title = Table([[logo, teks_judul, ""]], colWidths=[3*cm, 20*cm, 3*cm], hAlign="CENTER")
+        tbl_title.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (1, 0), (1, 0), "CENTER"),
+            ("LEFTPADDING", (0, 0), (0, 0), 0),
+            ("RIGHTPADDING", (0, 0), (0, 0), 0),
+            ("TOPPADDING", (0, 0), (-1, -1), 0),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+        ]))
+        story.append(tbl_title)
+        story.append(Spacer(1, 4))
+
+    # ---------- Identitas Wilayah ----------
+    # 🧩 Hilangkan hanya kata "KOTA " di depan, biarkan "KABUPATEN" tetap tampil
+    nama_kab = konteks["kabupaten"].upper().replace("KOTA ", "")
+    tps_text = f"{int(tps):03d}" if (tps and str(tps).isdigit()) else str(tps or "-")
+    style_ident = gaya("IdentitasRapat", fontName=font_base, fontSize=11, leading=11, alignment=TA_LEFT)
+
+    data_identitas = [
+        [
+            Paragraph("PROVINSI", style_ident), Paragraph(":", style_ident), Paragraph("JAWA BARAT", style_ident),
+            "", Paragraph("KECAMATAN", style_ident), Paragraph(":", style_ident),
+            Paragraph(konteks["kecamatan"].upper(), style_ident),
+        ],
+        [
+            Paragraph(konteks["jenis_wilayah"].upper(), style_ident), Paragraph(":", style_ident),
+            Paragraph(nama_kab, style_ident),
+            "", Paragraph(konteks["label_wilayah"].upper(), style_ident), Paragraph(":", style_ident),
+            Paragraph(nama_desa.upper(), style_ident),
+        ],
+        [
+            "", "", "", "",
+            Paragraph("TPS", style_ident), Paragraph(":", style_ident), Paragraph(tps_text, style_ident),
+        ],
+    ]
+    tabel_identitas = Table(
+        data_identitas,
+        colWidths=[3*cm, 0.3*cm, 5*cm, 11*cm, 3*cm, 0.3*cm, 4*cm],
+        hAlign="CENTER",
+    )
+    tabel_identitas.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), font_base),
+        ("FONTSIZE", (0, 0), (-1, -1), 10.5),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("LEFTPADDING", (0, 0), (-1, -1), 2),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+    ]))
+    story.append(tabel_identitas)
+    story.append(Spacer(1, 12))
+
+    # ---------- Header tabel ----------
+    wrap_left = gaya("WrapLeft", fontName=font_base, fontSize=9, leading=10, alignment=TA_LEFT)
+    center_header = gaya("CenterHeader", fontName=font_bold, fontSize=9, leading=10, alignment=TA_CENTER)
+
+    header_top = [
+        [
+            Paragraph("<b>No</b>", center_header),
+            Paragraph("<b>No KK</b>", center_header),
+            Paragraph("<b>NIK</b>", center_header),
+            Paragraph("<b>Nama</b>", center_header),
+            Paragraph("<b>Tempat<br/>Lahir</b>", center_header),
+            Paragraph("<b>Tanggal<br/>Lahir</b>", center_header),
+            Paragraph("<b>Status<br/>Perkawinan<br/>B/S/P</b>", center_header),
+            Paragraph("<b>Jenis<br/>Kelamin<br/>L/P</b>", center_header),
+            Paragraph("<b>Alamat</b>", center_header),
+            Paragraph("", center_header),
+            Paragraph("", center_header),
+            Paragraph("<b>Disabilitas</b>", center_header),
+            Paragraph("<b>Status KTP-el</b>", center_header),
+            Paragraph("<b>Keterangan</b>", center_header),
+        ],
+        [
+            "", "", "", "", "", "", "", "",
+            Paragraph("<b>Jalan/Dukuh</b>", center_header),
+            Paragraph("<b>RT</b>", center_header),
+            Paragraph("<b>RW</b>", center_header),
+            "", "", "",
+        ],
+        [Paragraph(str(i), center_header) for i in range(1, 15)],
+    ]
+
+    # ---------- Data ----------
+    data_matrix = []
+    for idx, row in enumerate(rows, start=1):
+        new_row = [str(idx)]
+        for i, val in enumerate(row):
+            text = str(val or "").strip().replace("\n", " ")
+            if i in (2, 3, 7):  # NAMA, TMPT_LHR, ALAMAT
+                new_row.append(Paragraph(text, wrap_left))
+            else:
+                new_row.append(text)
+        data_matrix.append(new_row)
+
+    table_matrix = header_top + (data_matrix if data_matrix else [[""] + [""] * 13])
+
+    t_data = LongTable(
+        table_matrix,
+        colWidths=[1 * cm, 2.8 * cm, 2.8 * cm, 4.2 * cm, 2.7 * cm, 1.8 * cm,
+                   2 * cm, 1.6 * cm, 3.8 * cm, 0.9 * cm, 0.9 * cm,
+                   1 * cm, 1.3 * cm, 1.2 * cm],
+        repeatRows=3,
+    )
+    t_data.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.9, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 2), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, -1), font_base),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("WORDWRAP", (0, 0), (-1, -1), True),
+        ("SPAN", (0, 0), (0, 1)),
+        ("SPAN", (1, 0), (1, 1)),
+        ("SPAN", (2, 0), (2, 1)),
+        ("SPAN", (3, 0), (3, 1)),
+        ("SPAN", (4, 0), (4, 1)),
+        ("SPAN", (5, 0), (5, 1)),
+        ("SPAN", (6, 0), (6, 1)),
+        ("SPAN", (7, 0), (7, 1)),
+        ("SPAN", (8, 0), (10, 0)),
+        ("SPAN", (11, 0), (11, 1)),
+        ("SPAN", (12, 0), (12, 1)),
+        ("SPAN", (13, 0), (13, 1)),
+    ]))
+    story.append(t_data)
+    story.append(Spacer(1, 12))
+
+    # ============================================================
+    # 🧾 TABEL KETERANGAN
+    # ============================================================
+    ket_style = gaya("ket_style", fontName=font_base, fontSize=10, leading=10, alignment=TA_LEFT)
+    ttd_style = gaya("ttd_style", fontName=font_base, fontSize=11, leading=10, alignment=TA_CENTER)
+    paraf_style = gaya("paraf_style", fontName=font_base, fontSize=11, leading=10, alignment=TA_LEFT)
+    desa_kapital = str(nama_desa).capitalize()
+
+    data_keterangan = [
+        [Paragraph("Keterangan Status", ket_style), Paragraph("Keterangan Disabilitas (12)", ket_style), Paragraph("Kolom Keterangan Status", ket_style),
+         Paragraph("Kolom Keterangan (14):", ket_style), "", Paragraph("Ditetapkan di", paraf_style), Paragraph(f": {desa_kapital}", paraf_style)],
+
+        [Paragraph("Perkawinan (7):", ket_style), Paragraph("1: Disabilitas Fisik", ket_style), Paragraph("Kepemilikan KTP-el (13)", ket_style),
+         Paragraph("B: Pemilih Baru", ket_style), "", Paragraph("Tanggal", paraf_style), Paragraph(f": {konteks['tanggal_ba']}", paraf_style)],
+
+        [Paragraph("B: Belum kawin", ket_style), Paragraph("2: Disabilitas Intelektual", ket_style), Paragraph("S: Sudah memiliki KTP-el", ket_style),
+         Paragraph("U: Ubah elemen data", ket_style), "", "", ""],
+
+        [Paragraph("S: Sudah kawin", ket_style), Paragraph("3: Disabilitas Mental", ket_style), Paragraph("B: Belum memiliki KTP-el", ket_style),
+         Paragraph("1: Meninggal", ket_style), Paragraph("5: WNA", ket_style), Paragraph(f"PPS {desa_kapital}", ttd_style), ""],
+
+        [Paragraph("P: Pernah kawin", ket_style), Paragraph("4: Disabilitas Sensorik Wicara", ket_style), "",
+         Paragraph("2: Ganda", ket_style), Paragraph("6: TNI", ket_style), Paragraph("Ketua", ttd_style), ""],
+
+        ["", Paragraph("5: Disabilitas Sensorik Rungu", ket_style), "",
+         Paragraph("3: Dibawah umur", ket_style), Paragraph("7: Polri", ket_style), "", ""],
+
+        ["", Paragraph("6: Disabilitas Sensorik Netra", ket_style), "",
+         Paragraph("4: Pindah domisili", ket_style), Paragraph("8: TPS tidak sesuai", ket_style), "", ""],
+    ]
+    tabel_keterangan = Table(
+        data_keterangan,
+        colWidths=[3*cm, 4.5*cm, 4*cm, 4*cm, 5*cm, 3*cm, 4*cm],
+        hAlign="CENTER",
+    )
+    tabel_keterangan.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), font_base),
+        ("FONTSIZE", (0, 0), (-1, -1), 10.5),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("LEFTPADDING", (0, 0), (-1, -1), 2),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+        ("SPAN", (5, 3), (6, 3)),
+        ("ALIGN", (5, 3), (6, 3), "CENTER"),
+        ("SPAN", (5, 4), (6, 4)),
+        ("ALIGN", (5, 4), (6, 4), "CENTER"),
+    ]))
+    story.append(tabel_keterangan)
+
+    # ============================================================
+    # ✍️ AREA TANDA TANGAN
+    # ============================================================
+    story.append(Spacer(1, 1.5 * cm))
+    tabel_ttd = Table(
+        [["", "", "", "", "", Paragraph(str(konteks["ketua_pps"]).upper(), ttd_style), ""]],
+        colWidths=[3*cm, 4.5*cm, 4*cm, 4*cm, 5*cm, 3*cm, 4*cm],
+        hAlign="CENTER",
+    )
+    tabel_ttd.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), font_base),
+        ("FONTSIZE", (0, 0), (-1, -1), 12),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+        ("SPAN", (5, 0), (6, 0)),
+        ("ALIGN", (5, 0), (6, 0), "CENTER"),
+    ]))
+    story.append(tabel_ttd)
+    return story
+
+
+def render_tps(konteks, tps, rows):
+    """
+    (bytes PDF, utuh) satu TPS. Story rusak / gagal build → halaman placeholder
+    dengan utuh=False (tidak disimpan ke cache), bukan exception.
+    """
+    font_base, _ = font_laporan("calibri")
+    utuh = True
+    try:
+        story = bangun_story(konteks, tps, rows)
+    except Exception as e:
+        print(f"[ADPP RENDER] ⚠️ Gagal buat story TPS {tps}: {e}")
+        story = []
+
+    # Buang elemen yang tidak bisa di-wrap agar doc.build tidak gagal total
+    valid_story = []
+    for item in story:
+        if item is None:
+            continue
+        try:
+            w, h = item.wrap(1000, 1000)
+            if w is None or h is None:
+                continue
+            valid_story.append(item)
+        except Exception:
+            continue
+
+    if len(valid_story) != len(story) or not valid_story:
+        utuh = False
+    if not valid_story:
+        valid_story = [
+            Spacer(1, 8 * cm),
+            Paragraph(
+                f"Tidak ada data valid untuk TPS {tps or '-'}",
+                gaya("EmptyMsg", fontName="Helvetica-Bold", fontSize=14, alignment=TA_CENTER),
+            ),
+        ]
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=landscape(A4),
+        leftMargin=40, rightMargin=40,
+        topMargin=20, bottomMargin=40,
+    )
+    try:
+        doc.build(valid_story, canvasmaker=kanvas_nomor_halaman(font_base, 10))
+    except Exception as e:
+        print(f"[ADPP RENDER] ⚠️ doc.build gagal TPS {tps}: {e}")
+        utuh = False
+        buf = BytesIO()
+        c = canvas.Canvas(buf, pagesize=landscape(A4))
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(landscape(A4)[0] / 2, landscape(A4)[1] / 2, f"PDF Gagal Dibangun untuk TPS {tps or '-'}")
+        c.showPage()
+        c.save()
+    return buf.getvalue(), utuh
+
+
+# =========================================================
+# 🗄️ CACHE ARTEFAK (pdf_cache)
+# =========================================================
+def sidik_tps(konteks, tps, rows):
+    """Sidik isi satu TPS: semua baris + konteks (wilayah, tahapan, badan adhoc)."""
+    return pdf_cache.sidik("adpp", konteks, tps, rows)
+
+
+def _simpan_cache(konteks, tps, kunci, hasil):
+    pdf_bytes, utuh = hasil
+    if utuh:
+        pdf_cache.simpan("adpp", konteks["tahap"], tps, kunci, pdf_bytes)
+    return pdf_bytes
+
+
+def pdf_tps(konteks, tps, rows):
+    """PDF satu TPS dari cache bila isinya belum berubah, selain itu render + simpan ke cache."""
+    kunci = sidik_tps(konteks, tps, rows)
+    pdf_bytes = pdf_cache.ambil("adpp", konteks["tahap"], tps, kunci)
+    if pdf_bytes is None:
+        pdf_bytes = _simpan_cache(konteks, tps, kunci, render_tps(konteks, tps, rows))
+    return pdf_bytes
+
+
+# =========================================================
+# ⚙️ PROCESS POOL
+# =========================================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _ambil_pool():
+    """Pool dibuat sekali lalu dipakai ulang (start proses worker hanya dibayar sekali)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn eksplisit: fork dari proses ber-Qt tidak aman, dan Windows memang spawn
+            _pool = ProcessPoolExecutor(
+                max_workers=JUMLAH_WORKER,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def tutup_pool():
+    """Hentikan worker (dipanggil otomatis saat aplikasi keluar)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(tutup_pool)
+
+
+def render_berurutan(konteks, kelompok, tunggu=None, batal=None, interval=0.05):
+    """
+    yield (tps, pdf_bytes) PERSIS sesuai urutan kelompok.
+    • TPS yang isinya tidak berubah sejak render terakhir diambil dari pdf_cache.
+    • Sisanya dirender di process pool (1 TPS = 1 tugas) lalu disimpan ke cache.
+    • tunggu(): dipanggil berkala selama menunggu hasil (mis. QApplication.processEvents).
+    • batal() : bila True → tugas yang belum jalan dibatalkan dan generator berhenti.
+    Pool tidak tersedia / rusak / tugas sedikit → TPS terkait dirender serial di proses ini.
+    """
+    tugas = []
+    for tps, rows in kelompok:
+        kunci = sidik_tps(konteks, tps, rows)
+        tugas.append((tps, rows, kunci, pdf_cache.ambil("adpp", konteks["tahap"], tps, kunci)))
+
+    futures = {}
+    jumlah_render = sum(1 for t in tugas if t[3] is None)
+    if jumlah_render >= MIN_TPS_PARALEL and (os.cpu_count() or 1) >= 2:
+        try:
+            pool = _ambil_pool()
+            for i, (tps, rows, _, pdf_bytes) in enumerate(tugas):
+                if pdf_bytes is None:
+                    futures[i] = pool.submit(render_tps, konteks, tps, rows)
+        except Exception as e:
+            print(f"[ADPP RENDER] Process pool tidak tersedia, render serial: {e}")
+            for fut in futures.values():
+                fut.cancel()
+            futures = {}
+            tutup_pool()
+
+    try:
+        for i, (tps, rows, kunci, pdf_bytes) in enumerate(tugas):
+            if batal is not None and batal():
+                return
+            if pdf_bytes is None:
+                fut = futures.get(i)
+                hasil = None
+                if fut is not None:
+                    while not wait([fut], timeout=interval).done:
+                        if batal is not None and batal():
+                            return
+                        if tunggu is not None:
+                            tunggu()
+                    try:
+                        hasil = fut.result()
+                    except BrokenProcessPool as e:
+                        print(f"[ADPP RENDER] Worker berhenti mendadak, TPS {tps} dirender serial: {e}")
+                        tutup_pool()
+                    except Exception as e:
+                        print(f"[ADPP RENDER] Worker gagal TPS {tps}, dirender serial: {e}")
+                if hasil is None:
+                    hasil = render_tps(konteks, tps, rows)
+                pdf_bytes = _simpan_cache(konteks, tps, kunci, hasil)
+            yield tps, pdf_bytes
+    finally:
+        # Berhenti lebih awal (batal / consumer close) → tugas yang belum jalan tidak dikerjakan
+        for fut in futures.values():
+            fut.cancel()
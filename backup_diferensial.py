@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+backup_diferensial.py – Backup penuh / diferensial NexVo dan pemulihan rantai backup.
+• Manifest lokal (SNAPSHOT_DIR/manifest.db) : sidik (BLAKE2b berkunci) tiap baris per (tabel, rowid)
+  dari backup terakhir. Hanya berisi sidik → tidak memuat data pemilih.
+• Backup diferensial : snapshot dibandingkan dengan manifest secara merge-join (urut rowid,
+  memori konstan) → arsip hanya berisi baris baru/berubah + rowid yang dihapus.
+  Tiap arsip mencatat id & basis (id backup sebelumnya) → membentuk rantai penuh → diff → diff ...
+• pulihkan_rantai : ekstrak semua arsip, susun rantai lewat basis, terapkan diff berurutan ke
+  database hasil backup penuh (trigger dilepas sementara agar tabel turunan tidak dihitung ganda).
+Perbandingan per baris, bukan per halaman: halaman SQLCipher dienkripsi ulang dengan IV acak
+setiap kali disalin sehingga isi halaman snapshot selalu berbeda walau datanya sama.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from backup_nxv import BackupRusak, pulihkan_ke_folder, tulis_backup
+from db_manager import SNAPSHOT_DIR, buka_database, load_or_create_key, snapshot_database
+from import_worker import ImportDitolak, potong
+
+MANIFEST_PATH = SNAPSHOT_DIR / "manifest.db"
+MANIFEST_BARU = SNAPSHOT_DIR / "manifest.baru"
+INFO_BACKUP = "backup.json"
+DB_DIFF = "nexvo_diff.db"
+
+# Tabel kontrol di database diff
+_T_TABEL = "__nv_tabel"     # (tabel, mode, simpan) mode: 'ubah' (per rowid) / 'penuh' (ganti seluruh isi)
+_T_HAPUS = "__nv_hapus"     # (tabel, rid) baris yang dihapus sejak backup sebelumnya
+_K_RID = "__nv_rid"
+
+
+class BackupPenuhDiperlukan(ImportDitolak):
+    """Belum ada basis yang cocok untuk backup diferensial."""
+
+    def __init__(self, pesan):
+        super().__init__(pesan, judul="Backup Penuh Diperlukan")
+
+
+# =========================================================
+# 🔎 SKEMA & SIDIK
+# =========================================================
+def _q(nama):
+    return '"' + nama.replace('"', '""') + '"'
+
+
+def _tabel_data(conn):
+    """[(nama, per_rowid)] tabel biasa; tanpa rowid / sqlite_sequence disalin utuh, virtual & stat dilewati."""
+    hasil = []
+    for nama, sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name"
+    ).fetchall():
+        sql_up = (sql or "").upper()
+        if nama.startswith("sqlite_stat") or sql_up.startswith("CREATE VIRTUAL"):
+            continue
+        per_rowid = nama != "sqlite_sequence" and "WITHOUT ROWID" not in sql_up
+        hasil.append((nama, per_rowid))
+    return hasil
+
+
+def _sidik_skema(conn):
+    h = hashlib.blake2b(digest_size=16)
+    for baris in conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY type, name"
+    ):
+        h.update(repr(baris).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _kunci_sidik(kunci_db):
+    return hashlib.sha256(b"NexVo-Backup-Manifest|" + kunci_db).digest()
+
+
+def _sidik_kunci_db(kunci_db):
+    return hashlib.sha256(b"NexVo-Backup-Key|" + kunci_db).hexdigest()[:16]
+
+
+def _sidik_baris(nilai, kunci):
+    return hashlib.blake2b(repr(nilai).encode("utf-8"), key=kunci, digest_size=12).digest()
+
+
+def _kolom(conn, tabel):
+    """Kolom tersimpan (table_info tidak memuat generated column seperti *_ISO)."""
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({_q(tabel)})")]
+
+
+def _pilih(conn, tabel, dengan_rowid=True):
+    """SELECT kolom tersimpan secara eksplisit (SELECT * ikut menghitung generated column)."""
+    kolom = ", ".join(_q(k) for k in _kolom(conn, tabel))
+    return f"SELECT {'rowid, ' if dengan_rowid else ''}{kolom} FROM {_q(tabel)}"
+
+
+# =========================================================
+# 📒 MANIFEST
+# =========================================================
+def _buka_manifest(path):
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    return conn
+
+
+def _buat_manifest(path):
+    if path.exists():
+        path.unlink()
+    conn = _buka_manifest(path)
+    conn.execute("CREATE TABLE meta (kunci TEXT PRIMARY KEY, nilai TEXT)")
+    conn.execute("CREATE TABLE baris (tabel TEXT, rid INTEGER, sidik BLOB, PRIMARY KEY (tabel, rid)) WITHOUT ROWID")
+    conn.execute("BEGIN")
+    return conn
+
+
+def baca_manifest():
+    """Meta manifest backup terakhir ({id, skema, kunci_db, dibuat}) atau None."""
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        conn = _buka_manifest(MANIFEST_PATH)
+        try:
+            return dict(conn.execute("SELECT kunci, nilai FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def diferensial_tersedia():
+    """True bila ada manifest backup sebelumnya untuk kunci database saat ini."""
+    meta = baca_manifest()
+    try:
+        return bool(meta) and meta.get("kunci_db") == _sidik_kunci_db(load_or_create_key())
+    except Exception:
+        return False
+
+
+def hapus_manifest():
+    """Putuskan rantai (mis. setelah restore): backup berikutnya wajib penuh."""
+    for berkas in (MANIFEST_PATH, MANIFEST_BARU):
+        try:
+            berkas.unlink()
+        except OSError:
+            pass
+
+
+def sahkan_manifest(sah=True):
+    """
+    Manifest backup yang baru dibuat menunggu di MANIFEST_BARU sampai arsip benar-benar disimpan
+    (kode backup tersimpan). sah=False → arsip dibatalkan, basis diferensial tetap backup sebelumnya.
+    """
+    try:
+        if sah:
+            os.replace(MANIFEST_BARU, MANIFEST_PATH)
+        else:
+            MANIFEST_BARU.unlink()
+    except OSError as e:
+        print("[BACKUP WARNING] Manifest backup tidak diperbarui:", e)
+
+
+# =========================================================
+# 🧮 PERBANDINGAN BARIS (MERGE-JOIN)
+# =========================================================
+def _bandingkan(baris_snapshot, sidik_lama, kunci, catat):
+    """
+    baris_snapshot: (rowid, kolom...) urut rowid; sidik_lama: (rid, sidik) urut rid.
+    catat(rid, sidik) menulis manifest baru. Hasilkan ('ubah', baris) / ('hapus', rid).
+    """
+    lama = iter(sidik_lama)
+    l = next(lama, None)
+    for baris in baris_snapshot:
+        rid = baris[0]
+        sidik = _sidik_baris(baris[1:], kunci)
+        catat(rid, sidik)
+        while l is not None and l[0] < rid:
+            yield "hapus", l[0]
+            l = next(lama, None)
+        if l is not None and l[0] == rid:
+            if l[1] != sidik:
+                yield "ubah", baris
+            l = next(lama, None)
+        else:
+            yield "ubah", baris
+    while l is not None:
+        yield "hapus", l[0]
+        l = next(lama, None)
+
+
+# =========================================================
+# 💾 BACKUP
+# =========================================================
+def buat_backup(path, kode, entri, ctx=None, mode="penuh"):
+    """
+    Snapshot database (SQLite backup API) lalu tulis arsip NVBAK2.
+    • mode 'penuh'       : nexvo.db utuh.
+    • mode 'diferensial' : nexvo_diff.db berisi perubahan sejak backup terakhir (lihat modul).
+    Manifest baru disiapkan di MANIFEST_BARU; panggil sahkan_manifest() setelah arsip diterima.
+    Kembalikan info backup (dict).
+    """
+    def lapor(pct, pesan):
+        if ctx is not None:
+            ctx.cek_batal()
+            ctx.progress(pct, pesan)
+
+    kunci_db = load_or_create_key()
+    meta_lama = baca_manifest() if mode == "diferensial" else None
+    if mode == "diferensial" and (not meta_lama or meta_lama.get("kunci_db") != _sidik_kunci_db(kunci_db)):
+        raise BackupPenuhDiperlukan("Belum ada backup sebelumnya untuk database ini.\nLakukan Backup Penuh terlebih dahulu.")
+
+    snapshot = snapshot_database(
+        cek_batal=ctx.cek_batal if ctx is not None else None,
+        progres=(lambda salin, total: lapor(salin * 100 // max(1, total), "Mengambil snapshot database..."))
+        if ctx is not None else None,
+    )
+    manifest_baru = MANIFEST_PATH.with_name("manifest.tmp")
+    selesai = False
+    berkas_diff = SNAPSHOT_DIR / DB_DIFF
+    snap = buka_database(snapshot)
+    try:
+        skema = _sidik_skema(snap)
+        if meta_lama is not None and meta_lama.get("skema") != skema:
+            raise BackupPenuhDiperlukan(
+                "Struktur database berubah sejak backup terakhir.\nLakukan Backup Penuh terlebih dahulu."
+            )
+
+        info = {
+            "jenis": mode,
+            "id": uuid.uuid4().hex,
+            "basis": meta_lama.get("id") if meta_lama else None,
+            "skema": skema,
+            "dibuat": datetime.now().isoformat(timespec="seconds"),
+        }
+        man = _buat_manifest(manifest_baru)
+        try:
+            if mode == "diferensial":
+                lama = _buka_manifest(MANIFEST_PATH)
+                try:
+                    info["jumlah"] = _tulis_diff(snap, lama, man, berkas_diff, kunci_db, lapor)
+                finally:
+                    lama.close()
+                isi_db = ("nexvo_diff.db", berkas_diff)
+            else:
+                _tulis_manifest(snap, man, kunci_db, lapor)
+                isi_db = ("nexvo.db", snapshot)
+
+            meta = {"id": info["id"], "skema": skema, "kunci_db": _sidik_kunci_db(kunci_db), "dibuat": info["dibuat"]}
+            man.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            man.execute("COMMIT")
+        finally:
+            man.close()
+        snap.close()
+        snap = None
+
+        tulis_backup(path, kode, [isi_db, (INFO_BACKUP, json.dumps(info)), *entri], ctx)
+        os.replace(manifest_baru, MANIFEST_BARU)
+        selesai = True
+        return info
+    finally:
+        if snap is not None:
+            snap.close()
+        for berkas in (snapshot, berkas_diff) if selesai else (snapshot, berkas_diff, manifest_baru):
+            try:
+                berkas.unlink()
+            except OSError:
+                pass
+
+
+def _tulis_manifest(snap, man, kunci_db, lapor):
+    kunci = _kunci_sidik(kunci_db)
+    tabel = [t for t, per_rowid in _tabel_data(snap) if per_rowid]
+    for i, t in enumerate(tabel):
+        lapor(i * 100 // max(1, len(tabel)), f"Mencatat manifest {t}...")
+        baris = snap.execute(f"{_pilih(snap, t)} ORDER BY rowid")
+        for chunk in potong((t, b[0], _sidik_baris(b[1:], kunci)) for b in baris):
+            man.executemany("INSERT INTO baris VALUES (?, ?, ?)", chunk)
+
+
+def _tulis_diff(snap, lama, man, berkas_diff, kunci_db, lapor):
+    """Tulis database diff (terenkripsi kunci DB) + manifest baru; kembalikan jumlah baris diff."""
+    if berkas_diff.exists():
+        berkas_diff.unlink()
+    kunci = _kunci_sidik(kunci_db)
+    diff = buka_database(berkas_diff)
+    jumlah = 0
+    try:
+        diff.execute("BEGIN")
+        diff.execute(f"CREATE TABLE {_T_TABEL} (tabel TEXT, mode TEXT, simpan TEXT)")
+        diff.execute(f"CREATE TABLE {_T_HAPUS} (tabel TEXT, rid INTEGER)")
+
+        daftar = _tabel_data(snap)
+        for i, (t, per_rowid) in enumerate(daftar):
+            lapor(i * 100 // max(1, len(daftar)), f"Membandingkan {t}...")
+            # Nama tabel di diff dinomori: nama asli bisa bentrok dengan nama internal (sqlite_sequence)
+            simpan = f"__nv_t{i}"
+            kolom = _kolom(snap, t)
+            diff.execute(f"CREATE TABLE {simpan} ({_K_RID}, {', '.join(_q(k) for k in kolom)})")
+            isi = f"INSERT INTO {simpan} VALUES ({', '.join('?' * (len(kolom) + 1))})"
+
+            if not per_rowid:
+                diff.execute(f"INSERT INTO {_T_TABEL} VALUES (?, 'penuh', ?)", (t, simpan))
+                for chunk in potong((None, *b) for b in snap.execute(_pilih(snap, t, dengan_rowid=False))):
+                    diff.executemany(isi, chunk)
+                continue
+
+            diff.execute(f"INSERT INTO {_T_TABEL} VALUES (?, 'ubah', ?)", (t, simpan))
+            manifest = []
+
+            def catat(rid, sidik):
+                manifest.append((t, rid, sidik))
+                if len(manifest) >= 2000:
+                    man.executemany("INSERT INTO baris VALUES (?, ?, ?)", manifest)
+                    manifest.clear()
+
+            perubahan = _bandingkan(
+                snap.execute(f"{_pilih(snap, t)} ORDER BY rowid"),
+                lama.execute("SELECT rid, sidik FROM baris WHERE tabel = ? ORDER BY rid", (t,)),
+                kunci, catat,
+            )
+            for chunk in potong(perubahan):
+                ubah = [b for jenis, b in chunk if jenis == "ubah"]
+                hapus = [(t, rid) for jenis, rid in chunk if jenis == "hapus"]
+                if ubah:
+                    diff.executemany(isi, ubah)
+                if hapus:
+                    diff.executemany(f"INSERT INTO {_T_HAPUS} VALUES (?, ?)", hapus)
+                jumlah += len(chunk)
+            if manifest:
+                man.executemany("INSERT INTO baris VALUES (?, ?, ?)", manifest)
+        diff.execute("COMMIT")
+    finally:
+        diff.close()
+    return jumlah
+
+
+# =========================================================
+# ♻️ RESTORE RANTAI
+# =========================================================
+def _baca_info(folder):
+    """Info backup.json; backup lama (tanpa backup.json) dianggap penuh tanpa id."""
+    berkas = Path(folder) / INFO_BACKUP
+    if not berkas.exists():
+        return {"jenis": "penuh", "id": None, "basis": None}
+    return json.loads(berkas.read_text(encoding="utf-8"))
+
+
+def _susun_rantai(arsip):
+    """arsip: [(folder, info)] → urutan penuh, diff1, diff2, ... mengikuti basis; error bila terputus."""
+    penuh = [a for a in arsip if a[1].get("jenis") != "diferensial"]
+    if len(penuh) != 1:
+        raise BackupRusak(
+            "Pilih tepat satu Backup Penuh beserta Backup Diferensial yang dibuat sesudahnya."
+            if penuh else "Backup Diferensial harus dipulihkan bersama Backup Penuh-nya."
+        )
+    rantai = [penuh[0]]
+    sisa = {a[1].get("basis"): a for a in arsip if a[1].get("jenis") == "diferensial"}
+    if len(sisa) != len(arsip) - 1:
+        raise BackupRusak("Terdapat lebih dari satu Backup Diferensial dengan basis yang sama.")
+    while sisa:
+        berikut = sisa.pop(rantai[-1][1].get("id"), None)
+        if berikut is None:
+            raise BackupRusak("Rantai backup terputus: ada Backup Diferensial yang basisnya tidak ikut dipilih.")
+        rantai.append(berikut)
+    return rantai
+
+
+def _terapkan_diff(tujuan, diff, ctx=None):
+    """Terapkan satu database diff ke database tujuan dalam satu transaksi."""
+    tujuan.execute("BEGIN IMMEDIATE")
+    try:
+        # Trigger dilepas sementara: tabel turunan (ringkasan, dst) ikut di-diff sendiri
+        trigger = tujuan.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND sql IS NOT NULL"
+        ).fetchall()
+        for nama, _ in trigger:
+            tujuan.execute(f"DROP TRIGGER {_q(nama)}")
+
+        for chunk in potong(diff.execute(f"SELECT tabel, rid FROM {_T_HAPUS}")):
+            for t, rid in chunk:
+                tujuan.execute(f"DELETE FROM {_q(t)} WHERE rowid = ?", (rid,))
+            if ctx is not None:
+                ctx.cek_batal()
+
+        for t, mode, simpan in diff.execute(f"SELECT tabel, mode, simpan FROM {_T_TABEL}").fetchall():
+            kolom = _kolom(diff, simpan)[1:]
+            daftar_kolom = ", ".join(_q(k) for k in kolom)
+            tanda = ", ".join("?" * len(kolom))
+            if mode == "penuh":
+                tujuan.execute(f"DELETE FROM {_q(t)}")
+                sql = f"INSERT INTO {_q(t)} ({daftar_kolom}) VALUES ({tanda})"
+                baris = diff.execute(f"SELECT {daftar_kolom} FROM {simpan}")
+            else:
+                sql = f"INSERT OR REPLACE INTO {_q(t)} (rowid, {daftar_kolom}) VALUES (?, {tanda})"
+                baris = diff.execute(f"SELECT {_K_RID}, {daftar_kolom} FROM {simpan}")
+            for chunk in potong(baris):
+                if ctx is not None:
+                    ctx.cek_batal()
+                tujuan.executemany(sql, chunk)
+
+        for _, sql in trigger:
+            tujuan.execute(sql)
+        tujuan.execute("COMMIT")
+    except BaseException:
+        tujuan.execute("ROLLBACK")
+        raise
+
+
+def pulihkan_rantai(daftar, folder, ctx=None):
+    """
+    daftar: [(path_nxv, kode)] – satu backup penuh (+ diferensial sesudahnya, urutan bebas).
+    Hasil akhir di folder: isi backup penuh dengan nexvo.db yang sudah diperbarui semua diff,
+    plus berkas pengaturan (JSON, otp.secret) dari arsip terakhir. Kembalikan jenis backup penuh.
+    """
+    folder = Path(folder)
+    if folder.exists():
+        shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    arsip, jenis = [], {}
+    for i, (path, kode) in enumerate(daftar):
+        sub = folder / f"arsip_{i}"
+        jenis[sub] = pulihkan_ke_folder(path, kode, sub, ctx)
+        arsip.append((sub, _baca_info(sub)))
+
+    rantai = _susun_rantai(arsip)
+    dasar, _ = rantai[0]
+    if len(rantai) > 1:
+        kunci_bin = dasar / "dbkey.bin"
+        if not kunci_bin.exists():
+            raise BackupRusak("Backup penuh tidak memuat dbkey.bin; diff tidak dapat diterapkan.")
+        kunci_db = kunci_bin.read_bytes()
+        tujuan = buka_database(dasar / "nexvo.db", kunci=kunci_db)
+        try:
+            for n, (sub, info) in enumerate(rantai[1:], start=1):
+                if ctx is not None:
+                    ctx.progress(100, f"Menerapkan backup diferensial {n}/{len(rantai) - 1}...")
+                diff = buka_database(sub / DB_DIFF, kunci=kunci_db)
+                try:
+                    _terapkan_diff(tujuan, diff, ctx)
+                finally:
+                    diff.close()
+        finally:
+            tujuan.close()
+
+        # Pengaturan & OTP mengikuti arsip terbaru
+        terakhir, _ = rantai[-1]
+        for berkas in terakhir.rglob("*"):
+            if berkas.is_file() and berkas.name not in (DB_DIFF, INFO_BACKUP):
+                target = dasar / berkas.relative_to(terakhir)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(berkas, target)
+
+    for item in dasar.iterdir():
+        shutil.move(str(item), str(folder / item.name))
+    for sub, _ in arsip:
+        shutil.rmtree(sub, ignore_errors=True)
+    return jenis[dasar]
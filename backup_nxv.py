@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+backup_nxv.py – Kontainer backup NexVo (.nxv) terenkripsi secara streaming.
+• NVBAK2 : header + rangkaian chunk AES-GCM (UKURAN_CHUNK) → backup & restore memori konstan.
+           Nonce chunk = awalan acak(7) + nomor chunk(4) + penanda akhir(1), header jadi AAD
+           → chunk tidak bisa ditukar, diulang, dipotong, atau dipindah dari file lain tanpa ketahuan.
+• NVBAK1 & format lama (otp_secret di header) tetap bisa dipulihkan: didekripsi bertahap
+  ke berkas sementara, tag GCM diverifikasi sebelum isi dipakai.
+• Snapshot database & backup penuh/diferensial ada di backup_diferensial.py.
+• tulis_backup / pulihkan_ke_folder : ZIP dialirkan langsung ke / dari berkas (tanpa BytesIO).
+• jalankan_backup : proses berat dijalankan di QThreadPool dengan overlay progres (Batal).
+"""
+
+import os
+import shutil
+import struct
+import zipfile
+from pathlib import Path
+
+from Crypto.Cipher import AES
+from Crypto.Protocol.KDF import PBKDF2
+from PyQt6.QtCore import QRunnable, QThreadPool
+
+from import_worker import ImportContext, ImportDibatalkan, ImportDitolak, ImportProgressOverlay, ImportSignals
+
+MAGIC_V1 = b"NVBAK1"
+MAGIC_V2 = b"NVBAK2"
+
+ITERASI_KDF = 200_000
+UKURAN_CHUNK = 1024 * 1024    # plaintext per chunk terenkripsi
+UKURAN_BLOK = 1024 * 1024     # blok baca/tulis berkas
+PANJANG_TAG = 16
+
+
+class BackupRusak(ImportDitolak):
+    """Berkas backup rusak, terpotong, atau kode backup salah."""
+
+    def __init__(self, pesan):
+        super().__init__(pesan, judul="Gagal Dekripsi")
+
+
+# =========================================================
+# 🔐 PENULIS NVBAK2
+# =========================================================
+class PenulisNxv:
+    """
+    Objek file (hanya-tulis) yang mengenkripsi aliran data ke format NVBAK2.
+    Header : MAGIC_V2 + salt(16) + awalan_nonce(7) + ukuran_chunk(4) + iterasi_kdf(4)
+    Chunk  : panjang(4) + ciphertext + tag(16); chunk terakhir ditandai di nonce.
+    Tanpa seek/tell → zipfile menulis entri dengan data descriptor (streaming).
+    """
+
+    def __init__(self, f, kode, ukuran_chunk=UKURAN_CHUNK, iterasi=ITERASI_KDF):
+        salt = os.urandom(16)
+        self._awalan = os.urandom(7)
+        self._header = MAGIC_V2 + salt + self._awalan + struct.pack(">II", ukuran_chunk, iterasi)
+        self._kunci = PBKDF2(kode, salt, dkLen=32, count=iterasi)
+        self._f = f
+        self._ukuran = ukuran_chunk
+        self._buf = bytearray()
+        self._nomor = 0
+        self._tertutup = False
+        f.write(self._header)
+
+    def write(self, data):
+        self._buf += data
+        while len(self._buf) > self._ukuran:
+            self._tulis_chunk(bytes(self._buf[:self._ukuran]), akhir=False)
+            del self._buf[:self._ukuran]
+        return len(data)
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        """Tulis chunk terakhir (bertanda akhir); wajib dipanggil agar backup valid."""
+        if self._tertutup:
+            return
+        self._tertutup = True
+        self._tulis_chunk(bytes(self._buf), akhir=True)
+        self._buf = bytearray()
+        self._f.flush()
+
+    def _tulis_chunk(self, data, akhir):
+        cipher = AES.new(self._kunci, AES.MODE_GCM, nonce=_nonce(self._awalan, self._nomor, akhir))
+        cipher.update(self._header)
+        isi, tag = cipher.encrypt_and_digest(data)
+        self._f.write(struct.pack(">I", len(isi)))
+        self._f.write(isi)
+        self._f.write(tag)
+        self._nomor += 1
+
+
+def _nonce(awalan, nomor, akhir):
+    return awalan + struct.pack(">I", nomor) + (b"\x01" if akhir else b"\x00")
+
+
+# =========================================================
+# 🔓 PEMBACA (SEMUA VERSI)
+# =========================================================
+def jenis_backup(path):
+    """'v2' (NVBAK2), 'v1' (NVBAK1), atau 'lama' (otp_secret di header, tanpa kode backup)."""
+    with open(path, "rb") as f:
+        awal = f.read(len(MAGIC_V2))
+    if awal == MAGIC_V2:
+        return "v2"
+    if awal == MAGIC_V1:
+        return "v1"
+    return "lama"
+
+
+def _baca_tepat(f, n):
+    data = f.read(n)
+    if len(data) != n:
+        raise BackupRusak("Backup terpotong atau rusak.")
+    return data
+
+
+def _dekripsi_v2(fin, fout, kode, progres):
+    header = _baca_tepat(fin, len(MAGIC_V2) + 16 + 7 + 8)
+    salt = header[6:22]
+    awalan = header[22:29]
+    ukuran_chunk, iterasi = struct.unpack(">II", header[29:37])
+    kunci = PBKDF2(kode, salt, dkLen=32, count=iterasi)
+
+    nomor = 0
+    panjang = _baca_tepat(fin, 4)
+    while True:
+        n = struct.unpack(">I", panjang)[0]
+        if n > ukuran_chunk:
+            raise BackupRusak("Ukuran chunk backup tidak valid.")
+        isi = _baca_tepat(fin, n)
+        tag = _baca_tepat(fin, PANJANG_TAG)
+        berikut = fin.read(4)
+        if berikut and len(berikut) != 4:
+            raise BackupRusak("Backup terpotong atau rusak.")
+        akhir = not berikut
+
+        cipher = AES.new(kunci, AES.MODE_GCM, nonce=_nonce(awalan, nomor, akhir))
+        cipher.update(header)
+        try:
+            fout.write(cipher.decrypt_and_verify(isi, tag))
+        except ValueError:
+            raise BackupRusak("Kode backup salah, atau berkas backup rusak / terpotong.") from None
+        progres(fin.tell())
+        if akhir:
+            return
+        nomor += 1
+        panjang = berikut
+
+
+def _dekripsi_gcm_tunggal(fin, fout, kode, progres):
+    """Format NVBAK1 / lama: satu GCM utuh → dekripsi per blok, verifikasi tag di akhir."""
+    salt = _baca_tepat(fin, 16)
+    iv = _baca_tepat(fin, 12)
+    tag = _baca_tepat(fin, PANJANG_TAG)
+    cipher = AES.new(PBKDF2(kode, salt, dkLen=32, count=ITERASI_KDF), AES.MODE_GCM, nonce=iv)
+    while True:
+        blok = fin.read(UKURAN_BLOK)
+        if not blok:
+            break
+        fout.write(cipher.decrypt(blok))
+        progres(fin.tell())
+    try:
+        cipher.verify(tag)
+    except ValueError:
+        raise BackupRusak("Kode backup salah, atau berkas backup rusak.") from None
+
+
+def dekripsi_backup(path, tujuan, kode=None, ctx=None):
+    """
+    Dekripsi .nxv (semua versi) ke berkas ZIP tujuan, bertahap; kembalikan jenis backup.
+    Berkas tujuan dihapus bila verifikasi gagal / dibatalkan.
+    """
+    total = max(1, os.path.getsize(path))
+    jenis = jenis_backup(path)
+
+    def progres(posisi):
+        if ctx is not None:
+            ctx.cek_batal()
+            ctx.progress(posisi * 60 // total, "Mendekripsi backup...")
+
+    try:
+        with open(path, "rb") as fin, open(tujuan, "wb") as fout:
+            if jenis == "v2":
+                _dekripsi_v2(fin, fout, kode, progres)
+            elif jenis == "v1":
+                fin.seek(len(MAGIC_V1))
+                _dekripsi_gcm_tunggal(fin, fout, kode, progres)
+            else:
+                panjang = int.from_bytes(_baca_tepat(fin, 2), "big")
+                try:
+                    otp_secret = _baca_tepat(fin, panjang).decode()
+                except UnicodeDecodeError:
+                    raise BackupRusak("Format backup tidak dikenal.") from None
+                _dekripsi_gcm_tunggal(fin, fout, otp_secret, progres)
+    except BaseException:
+        try:
+            os.remove(tujuan)
+        except OSError:
+            pass
+        raise
+    return jenis
+
+
+# =========================================================
+# 📦 BACKUP & RESTORE ZIP
+# =========================================================
+def tulis_backup(path, kode, entri, ctx=None):
+    """
+    Tulis backup NVBAK2 ke path (atomik: .tmp → replace).
+    entri: [(nama_di_arsip, Path | bytes | str)] – berkas dialirkan per blok, bukan dibaca utuh.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    berkas = [(n, s) for n, s in entri if isinstance(s, Path)]
+    total = max(1, sum(s.stat().st_size for _, s in berkas if s.exists()))
+    ditulis = 0
+
+    try:
+        with open(tmp, "wb") as f:
+            penulis = PenulisNxv(f, kode)
+            with zipfile.ZipFile(penulis, "w", zipfile.ZIP_DEFLATED) as zf:
+                for nama, sumber in entri:
+                    if ctx is not None:
+                        ctx.cek_batal()
+                    if not isinstance(sumber, Path):
+                        zf.writestr(nama, sumber)
+                        continue
+                    if not sumber.exists():
+                        print(f"[BACKUP WARNING] File tidak ditemukan: {sumber}")
+                        continue
+                    info = zipfile.ZipInfo.from_file(sumber, nama)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with open(sumber, "rb") as src, zf.open(info, "w") as dst:
+                        while True:
+                            blok = src.read(UKURAN_BLOK)
+                            if not blok:
+                                break
+                            dst.write(blok)
+                            ditulis += len(blok)
+                            if ctx is not None:
+                                ctx.cek_batal()
+                                ctx.progress(ditulis * 100 // total, f"Membackup {nama}...")
+            penulis.close()
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def pulihkan_ke_folder(path, kode, folder, ctx=None):
+    """Dekripsi .nxv lalu ekstrak isinya ke folder (dibuat ulang); kembalikan jenis backup."""
+    folder = Path(folder)
+    if folder.exists():
+        shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True, exist_ok=True)
+    zip_tmp = folder.with_name(folder.name + ".zip")
+
+    jenis = dekripsi_backup(path, zip_tmp, kode, ctx)
+    try:
+        with zipfile.ZipFile(zip_tmp, "r") as zf:
+            daftar = zf.infolist()
+            for i, info in enumerate(daftar, start=1):
+                if ctx is not None:
+                    ctx.cek_batal()
+                    ctx.progress(60 + i * 40 // max(1, len(daftar)), f"Mengekstrak {info.filename}...")
+                zf.extract(info, folder)
+    except zipfile.BadZipFile:
+        raise BackupRusak("Isi backup bukan arsip NexVo yang valid.") from None
+    finally:
+        try:
+            os.remove(zip_tmp)
+        except OSError:
+            pass
+    return jenis
+
+
+# =========================================================
+# 🧵 JOB & PEMICU
+# =========================================================
+class BackupJob(QRunnable):
+    """Jalankan fungsi(ctx) → hasil di thread pool (tanpa koneksi DB); BackupRusak → sinyal ditolak."""
+
+    def __init__(self, fungsi):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fungsi = fungsi
+        self.signals = ImportSignals()
+        self.ctx = ImportContext(self.signals)
+
+    def run(self):
+        sinyal, args = self.signals.selesai, ()
+        try:
+            hasil = self.fungsi(self.ctx)
+            self.ctx.cek_batal()
+            args = (hasil,)
+        except ImportDibatalkan:
+            sinyal = self.signals.dibatalkan
+        except ImportDitolak as e:
+            sinyal, args = self.signals.ditolak, (e.judul, e.pesan)
+        except Exception as e:
+            if self.ctx.sudah_batal:
+                sinyal = self.signals.dibatalkan
+            else:
+                sinyal, args = self.signals.gagal, (str(e),)
+        sinyal.emit(*args)
+
+
+class BackupProgressOverlay(ImportProgressOverlay):
+    """Overlay progres backup / restore (gaya sama dengan import)."""
+
+    TEKS_BATAL = "Membatalkan..."
+    ATRIBUT_AKTIF = "_backup_aktif"
+
+
+def jalankan_backup(parent, fungsi, judul="Membuat backup...",
+                    on_selesai=None, on_gagal=None, on_ditolak=None, on_dibatalkan=None):
+    """
+    Tampilkan overlay progres di atas parent lalu jalankan fungsi(ctx) di QThreadPool global.
+    Hanya satu backup/restore aktif per jendela; kembalikan job (None bila masih berjalan).
+    """
+    if getattr(parent, "_backup_aktif", None) is not None:
+        return None
+
+    job = BackupJob(fungsi)
+    overlay = BackupProgressOverlay(parent, judul)
+    overlay.pasang(job, on_selesai, on_gagal, on_ditolak, on_dibatalkan)
+    overlay.show()
+    overlay.raise_()
+
+    parent._backup_aktif = job
+    QThreadPool.globalInstance().start(job)
+    return job
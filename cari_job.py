@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+cari_job.py – Pencarian sidebar sambil mengetik di latar belakang (QThreadPool + QRunnable).
+• CariJob      : jalankan filter di thread worker lewat koneksi baca-saja (db_manager.koneksi_baca):
+                 prafilter SQL ber-index (kondisi_sql) + predikat terkompilasi → list PemilihRecord.
+• Penyempitan  : filter baru lebih ketat dari filter hasil sebelumnya (filter_pemilih.adalah_penyempitan)
+                 → hasil lama cukup disaring ulang di memori, tanpa query.
+• PengelolaCari: satu pencarian aktif per jendela; pencarian baru membatalkan yang lama
+                 (conn.interrupt) dan hasil yang terlambat dibuang lewat nomor generasi.
+Hasil diterapkan di thread GUI oleh pemilik lewat callback on_hasil(records, pool).
+"""
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from db_manager import koneksi_baca, sql_pilih_pemilih, tanggal_iso_tersedia
+from filter_pemilih import adalah_penyempitan, kompilasi_filter, kondisi_sql
+from import_worker import ImportContext, ImportDibatalkan
+from indeks_teks import indeks_teks_tersedia
+from pemilih_store import StringPool, iter_records
+
+# Cek batal setiap N baris saat membangun / menyaring hasil
+INTERVAL_CEK = 2000
+
+
+class CariSignals(QObject):
+    selesai = pyqtSignal(int, object)     # (generasi, (records, pool))
+    gagal = pyqtSignal(int, str)
+    dibatalkan = pyqtSignal(int)
+
+
+# =========================================================
+# 🧵 JOB
+# =========================================================
+class CariJob(QRunnable):
+    """
+    Hitung hasil filter untuk satu generasi pencarian.
+    • basis None → query tabel tbl (snapshot baca), pool string baru.
+    • basis list → saring ulang records basis dengan predikat penuh (pool lama tetap dipakai → None).
+    """
+
+    def __init__(self, generasi, tbl, filters, basis=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generasi = generasi
+        self.tbl = tbl
+        self.filters = filters
+        self.basis = basis
+        self.signals = CariSignals()
+        self.ctx = ImportContext(self.signals)
+
+    def run(self):
+        try:
+            if self.basis is not None:
+                hasil = self._saring(self.basis, kompilasi_filter(self.filters)), None
+            else:
+                hasil = self._query()
+            self.ctx.cek_batal()
+        except ImportDibatalkan:
+            self.signals.dibatalkan.emit(self.generasi)
+            return
+        except Exception as e:
+            if self.ctx.sudah_batal:
+                # conn.interrupt() → "interrupted" diperlakukan sebagai pembatalan
+                self.signals.dibatalkan.emit(self.generasi)
+            else:
+                self.signals.gagal.emit(self.generasi, str(e))
+            return
+        self.signals.selesai.emit(self.generasi, hasil)
+
+    def _saring(self, records, cocok):
+        hasil = []
+        tambah = hasil.append
+        for n, r in enumerate(records, start=1):
+            if n % INTERVAL_CEK == 0:
+                self.ctx.cek_batal()
+            if cocok(r):
+                tambah(r)
+        return hasil
+
+    def _query(self):
+        with koneksi_baca() as conn:
+            self.ctx.conn = conn
+            try:
+                self.ctx.cek_batal()
+                tanggal_iso = tanggal_iso_tersedia(conn, self.tbl)
+                indeks_teks = indeks_teks_tersedia(conn, self.tbl)
+                conditions, params = kondisi_sql(self.filters, tanggal_iso=tanggal_iso, indeks_teks=indeks_teks)
+                where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+                cur = conn.execute(f"{sql_pilih_pemilih(conn, self.tbl)} {where_clause} ORDER BY rowid ASC", params)
+                rows = cur.fetchall()
+                kolom = [d[0] for d in cur.description]
+            finally:
+                # Lepas sebelum koneksi kembali ke pool → batal() terlambat tidak menginterupsi peminjam lain
+                self.ctx.conn = None
+
+        pool = StringPool()
+        cocok = kompilasi_filter(self.filters, tanggal_iso=tanggal_iso, indeks_teks=indeks_teks)
+        return self._saring(iter_records(rows, kolom, pool=pool), cocok), pool
+
+
+# =========================================================
+# 🎛️ PENGELOLA (thread GUI)
+# =========================================================
+class PengelolaCari(QObject):
+    """
+    Koordinasi pencarian bertahap milik satu jendela.
+    • cari(...)   : batalkan pencarian berjalan, lalu mulai generasi baru (query / penyempitan).
+    • catat(...)  : simpan hasil filter sinkron (tombol Filter) sebagai basis penyempitan berikutnya.
+    • lupakan()   : buang basis (data berubah di luar koneksi GUI, mis. import worker).
+    Basis hanya dipakai bila kunci_data sama dan data yang tampil masih list hasil basis itu.
+    """
+
+    def __init__(self, on_hasil, on_gagal=None, parent=None):
+        super().__init__(parent)
+        self._on_hasil = on_hasil
+        self._on_gagal = on_gagal
+        self._generasi = 0
+        self._berjalan = {}     # generasi → job (referensi dijaga sampai job memberi sinyal akhir)
+        self._basis = None      # (tbl, kunci_data, filters, records)
+        self._diminta = {}      # generasi → (tbl, kunci_data, filters)
+
+    def batal(self):
+        """Batalkan semua pencarian berjalan; hasil yang terlambat diabaikan."""
+        self._generasi += 1
+        for job in self._berjalan.values():
+            job.ctx.batal()
+
+    def lupakan(self):
+        self._basis = None
+
+    def catat(self, tbl, kunci_data, filters, records):
+        self._basis = (tbl, kunci_data, dict(filters), records)
+
+    def cari(self, tbl, kunci_data, filters, data_tampil=None):
+        """Mulai pencarian baru; kembalikan True bila hasil lama cukup disempitkan (tanpa query)."""
+        self.batal()
+        generasi = self._generasi
+        basis = None
+        if self._basis is not None:
+            b_tbl, b_kunci, b_filters, b_records = self._basis
+            if (b_tbl == tbl and b_kunci is not None and b_kunci == kunci_data and b_records is data_tampil
+                    and adalah_penyempitan(b_filters, filters)):
+                # Salinan dangkal: list asli bisa di-sort in-place oleh thread GUI selama job berjalan
+                basis = list(b_records)
+
+        job = CariJob(generasi, tbl, dict(filters), basis)
+        # Slot berupa method QObject milik thread GUI → koneksi otomatis QueuedConnection
+        job.signals.selesai.connect(self._on_selesai)
+        job.signals.gagal.connect(self._on_gagal_job)
+        job.signals.dibatalkan.connect(self._on_dibatalkan)
+        self._berjalan[generasi] = job
+        self._diminta[generasi] = (tbl, kunci_data, dict(filters))
+        QThreadPool.globalInstance().start(job)
+        return basis is not None
+
+    def _akhiri(self, generasi):
+        self._berjalan.pop(generasi, None)
+        return self._diminta.pop(generasi, None)
+
+    def _on_selesai(self, generasi, hasil):
+        diminta = self._akhiri(generasi)
+        if generasi != self._generasi or diminta is None:
+            return
+        records, pool = hasil
+        tbl, kunci_data, filters = diminta
+        self._basis = (tbl, kunci_data, filters, records)
+        self._on_hasil(records, pool)
+
+    def _on_gagal_job(self, generasi, pesan):
+        self._akhiri(generasi)
+        if generasi == self._generasi and self._on_gagal is not None:
+            self._on_gagal(pesan)
+
+    def _on_dibatalkan(self, generasi):
+        self._akhiri(generasi)
@@ -6,6 +6,7 @@ Versi stabil & aman (anti-lock, auto-reconnect, full schema, OTP-ready)
 
 import os, sys, sqlite3, subprocess, time, functools
 from threading import Lock
+from contextlib import contextmanager
 from pathlib import Path
 from PyQt6.QtWidgets import QMessageBox
 
@@ -14,6 +15,7 @@ from PyQt6.QtWidgets import QMessageBox
 # =========================================================
 _connection = None
 _connection_lock = Lock()
+_connection_generasi = 0      # naik setiap koneksi global dibuka ulang (reconnect / restore)
 _db_initialized = False
 
 # =========================================================
@@ -271,6 +273,32 @@ def init_schema(conn):
 
     conn.commit()
 
+    # === Index sekunder tabel tahapan (upgrade in-place untuk DB lama) ===
+    try:
+        ensure_tahapan_indexes(conn)
+    except Exception as e:
+        print(f"[WARN] Gagal menyiapkan index tahapan: {e}")
+
+    # === Kolom tanggal ISO (generated) + index untuk filter umur / LastUpdate ===
+    try:
+        ensure_tanggal_iso(conn)
+    except Exception as e:
+        print(f"[WARN] Gagal menyiapkan kolom tanggal ISO: {e}")
+
+    # === Ringkasan pemilih (counter dashboard/rekap yang dijaga trigger) ===
+    try:
+        from ringkasan import ensure_ringkasan
+        ensure_ringkasan(conn)
+    except Exception as e:
+        print(f"[WARN] Gagal menyiapkan ringkasan pemilih: {e}")
+
+    # === Index trigram NAMA / ALAMAT / TMPT_LHR (FTS5, dijaga trigger) ===
+    try:
+        from indeks_teks import ensure_indeks_teks
+        ensure_indeks_teks(conn)
+    except Exception as e:
+        print(f"[WARN] Gagal menyiapkan index teks: {e}")
+
     # === Isi data kecamatan otomatis jika kosong ===
     try:
         cur.execute("SELECT COUNT(*) FROM kecamatan")
@@ -285,62 +313,405 @@ def init_schema(conn):
 
 
 # =========================================================
-# 🔒 KONEKSI GLOBAL SQLCIPHER
+# 🗂️ INDEX SEKUNDER TABEL TAHAPAN (berversi)
+# =========================================================
+TAHAPAN_TABLES = ("dphp", "dpshp", "dpshpa")
+
+# Naikkan INDEX_VERSION setiap kali daftar INDEX_TAHAPAN diubah →
+# database lama otomatis di-upgrade (index usang dibuang, index baru dibuat).
+INDEX_VERSION = 1
+INDEX_TAHAPAN = {
+    "dpid":       ("DPID",),
+    "nik":        ("NIK",),
+    "nkk":        ("NKK",),
+    "ket":        ("KET",),
+    # Prefix TPS juga melayani WHERE TPS=? / GROUP BY TPS → tidak perlu index TPS tunggal
+    "tps_ket_jk": ("TPS", "KET", "JK"),
+}
+
+
+def _ensure_meta_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+
+def get_schema_meta(conn, key, default=None):
+    """Baca nilai dari tabel schema_meta (default bila belum ada)."""
+    cur = conn.cursor()
+    _ensure_meta_table(cur)
+    row = cur.execute("SELECT value FROM schema_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_schema_meta(conn, key, value):
+    """Simpan nilai ke tabel schema_meta."""
+    cur = conn.cursor()
+    _ensure_meta_table(cur)
+    cur.execute(
+        "INSERT OR REPLACE INTO schema_meta (key, value) VALUES (?, ?)",
+        (key, str(value)),
+    )
+
+
+def sqlite_version_info(conn):
+    """Versi SQLite milik koneksi (SQLCipher membawa SQLite sendiri) → tuple (major, minor, patch)."""
+    versi = conn.execute("SELECT sqlite_version()").fetchone()[0]
+    return tuple(int(x) for x in versi.split(".")[:3])
+
+
+def ensure_tahapan_indexes(conn, tables=TAHAPAN_TABLES):
+    """
+    Pastikan index sekunder tabel tahapan sesuai INDEX_VERSION (idempotent).
+    • Index dikelola dengan nama idx_<tabel>_<nama>.
+    • Versi tersimpan lebih lama → index kelolaan yang tidak lagi terdaftar dibuang.
+    • Index yang hilang (mis. tabel dibuat ulang) selalu dibuat kembali.
+    """
+    cur = conn.cursor()
+    try:
+        versi_db = int(get_schema_meta(conn, "index_tahapan", 0) or 0)
+    except (TypeError, ValueError):
+        versi_db = 0
+
+    ada_tabel = {
+        r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+    }
+    ada_index = {
+        r[0]: r[1]
+        for r in cur.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
+        ).fetchall()
+    }
+
+    dibuat = 0
+    for tbl in tables:
+        if tbl not in ada_tabel:
+            continue
+        prefix = f"idx_{tbl}_"
+        wajib = {f"{prefix}{nama}": kolom for nama, kolom in INDEX_TAHAPAN.items()}
+
+        # 🔹 Upgrade: buang index kelolaan lama yang sudah tidak terdaftar
+        if versi_db < INDEX_VERSION:
+            for nama_idx, tbl_idx in ada_index.items():
+                if tbl_idx == tbl and nama_idx.startswith(prefix) and nama_idx not in wajib:
+                    cur.execute(f'DROP INDEX IF EXISTS "{nama_idx}"')
+
+        # 🔹 Buat index yang belum ada
+        for nama_idx, kolom in wajib.items():
+            if nama_idx in ada_index:
+                continue
+            cur.execute(f'CREATE INDEX IF NOT EXISTS "{nama_idx}" ON {tbl} ({", ".join(kolom)})')
+            dibuat += 1
+
+    if versi_db < INDEX_VERSION:
+        set_schema_meta(conn, "index_tahapan", INDEX_VERSION)
+    if dibuat:
+        # Perbarui statistik planner agar index baru langsung dipakai
+        try:
+            cur.execute("PRAGMA optimize")
+        except Exception:
+            pass
+    conn.commit()
+    return dibuat
+
+
+# =========================================================
+# 📅 KOLOM TANGGAL TERNORMALISASI (ISO, generated column)
+# =========================================================
+# TGL_LHR / LastUpdate tersimpan sebagai teks campuran (dd/mm/YYYY, dd|mm|YYYY, dd-mm-YYYY,
+# YYYY-mm-dd, YYYY-mm-dd HH:MM:SS). Kolom bayangan *_ISO dihitung SQLite sendiri dari kolom
+# asal (GENERATED ... VIRTUAL) → otomatis benar untuk setiap INSERT/UPDATE tanpa trigger,
+# tidak muncul di PRAGMA table_info (INSERT posisional & cek jumlah kolom import tetap sama),
+# dan di-index → filter umur / rentang LastUpdate cukup perbandingan teks di SQL.
+# Nilai tak terbaca / tanggal tidak valid → NULL.
+# Naikkan TANGGAL_ISO_VERSION bila ekspresi diubah → kolom lama dibuang & dibuat ulang.
+TANGGAL_ISO_VERSION = 2
+TANGGAL_ISO_MIN_SQLITE = (3, 31, 0)    # generated column
+KOLOM_TANGGAL_ISO = {
+    # kolom bayangan: (kolom asal, pemisah d/m/Y yang dikenali)
+    # Sama dengan filter_pemilih.FORMAT_TGL_LAHIR / FORMAT_LAST_UPDATE: LastUpdate tanpa '|' & tanpa jam
+    "TGL_LHR_ISO": ("TGL_LHR", "/|-"),
+    "LastUpdate_ISO": ("LastUpdate", "/-"),
+}
+
+
+def sql_tanggal_iso(kolom, pemisah="/|-"):
+    """
+    Ekspresi SQL: teks tanggal kolom → 'YYYY-mm-dd' / NULL.
+    Format sama dengan filter_pemilih.urai_tanggal: hari/bulan 1–2 digit, tahun 4 digit;
+    d/m/Y dengan salah satu `pemisah`, atau Y-m-d. Tanggal mustahil (31/02) → NULL.
+    """
+    v = f"trim({kolom})"
+    D = "[0-9]"
+
+    def pad(awal, n):
+        bagian = f"substr({v}, {awal}, {n})"
+        return bagian if n == 2 else f"'0' || {bagian}"
+
+    def valid(x):
+        # date(julianday(x)) menormalkan 31/02 → 03/03, jadi hanya tanggal nyata yang kembali sama
+        return f"CASE WHEN date(julianday({x})) = {x} THEN {x} END"
+
+    def dmy(nd, nm):
+        # Kedua pemisah harus sama (01/02-2000 ditolak, sama seperti strptime)
+        x = f"substr({v}, {nd + nm + 3}, 4) || '-' || {pad(nd + 2, nm)} || '-' || {pad(1, nd)}"
+        return (
+            f"WHEN {v} GLOB '{D * nd}[{pemisah}]{D * nm}[{pemisah}]{D * 4}' "
+            f"AND substr({v}, {nd + 1}, 1) = substr({v}, {nd + nm + 2}, 1) THEN {valid(x)}"
+        )
+
+    # Urutan cabang: format paling umum dulu (validasi tanggal hanya di cabang yang cocok)
+    cabang = [dmy(2, 2), f"WHEN {v} GLOB '{D * 4}-{D * 2}-{D * 2}' THEN {valid(v)}"]
+    cabang += [dmy(2, 1), dmy(1, 2), dmy(1, 1)]
+    for nm, nd in ((1, 2), (2, 1), (1, 1)):
+        x = f"substr({v}, 1, 4) || '-' || {pad(6, nm)} || '-' || {pad(7 + nm, nd)}"
+        cabang.append(f"WHEN {v} GLOB '{D * 4}-{D * nm}-{D * nd}' THEN {valid(x)}")
+    return "CASE " + " ".join(cabang) + " END"
+
+
+def _kolom_lengkap(cur, tbl):
+    """{nama_kolom: hidden} termasuk generated column (PRAGMA table_xinfo)."""
+    return {r[1]: r[6] for r in cur.execute(f"PRAGMA table_xinfo({tbl})").fetchall()}
+
+
+def sql_pilih_pemilih(conn, tbl):
+    """
+    'SELECT rowid, <kolom tersimpan> FROM tbl' pengganti SELECT rowid, * untuk tabel tahapan:
+    kolom *_ISO (virtual) tidak ikut dihitung ulang untuk setiap baris yang dimuat.
+    """
+    kolom = ", ".join(f'"{r[1]}"' for r in conn.execute(f"PRAGMA table_info({tbl})").fetchall())
+    return f"SELECT rowid, {kolom} FROM {tbl}"
+
+
+def tanggal_iso_tersedia(conn, tbl):
+    """True bila tabel punya kolom bayangan *_ISO (SQLite cukup baru & migrasi sudah jalan)."""
+    try:
+        ada = _kolom_lengkap(conn.cursor(), tbl)
+    except Exception:
+        return False
+    return all(k in ada for k in KOLOM_TANGGAL_ISO)
+
+
+def ensure_tanggal_iso(conn, tables=TAHAPAN_TABLES):
+    """
+    Pastikan kolom bayangan tanggal ISO + index-nya ada sesuai TANGGAL_ISO_VERSION (idempotent).
+    SQLite/SQLCipher < 3.31 → dilewati (filter tetap jalan lewat jalur Python).
+    Index bernama iso_<tabel>_<kolom> (di luar pola idx_ milik ensure_tahapan_indexes).
+    """
+    if sqlite_version_info(conn) < TANGGAL_ISO_MIN_SQLITE:
+        return []
+    cur = conn.cursor()
+    ada_tabel = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+
+    diubah = []
+    for tbl in tables:
+        if tbl not in ada_tabel:
+            continue
+        kunci_meta = f"tanggal_iso_{tbl}"
+        try:
+            versi = int(get_schema_meta(conn, kunci_meta, 0) or 0)
+        except (TypeError, ValueError):
+            versi = 0
+        kolom = _kolom_lengkap(cur, tbl)
+        if versi >= TANGGAL_ISO_VERSION and all(k in kolom for k in KOLOM_TANGGAL_ISO):
+            # Index bisa hilang (mis. dibuang manual) → cukup buat ulang
+            for nama in KOLOM_TANGGAL_ISO:
+                cur.execute(f'CREATE INDEX IF NOT EXISTS "iso_{tbl}_{nama.lower()}" ON {tbl} ({nama})')
+            continue
+
+        for nama, (asal, pemisah) in KOLOM_TANGGAL_ISO.items():
+            if asal not in kolom:
+                continue
+            if nama in kolom:
+                # Versi ekspresi lama → buang (index dulu, baru kolom; DROP COLUMN butuh 3.35)
+                cur.execute(f'DROP INDEX IF EXISTS "iso_{tbl}_{nama.lower()}"')
+                cur.execute(f"ALTER TABLE {tbl} DROP COLUMN {nama}")
+            cur.execute(
+                f"ALTER TABLE {tbl} ADD COLUMN {nama} TEXT "
+                f"GENERATED ALWAYS AS ({sql_tanggal_iso(asal, pemisah)}) VIRTUAL"
+            )
+            cur.execute(f'CREATE INDEX IF NOT EXISTS "iso_{tbl}_{nama.lower()}" ON {tbl} ({nama})')
+        set_schema_meta(conn, kunci_meta, TANGGAL_ISO_VERSION)
+        diubah.append(tbl)
+
+    if diubah:
+        try:
+            cur.execute("PRAGMA optimize")
+        except Exception:
+            pass
+    conn.commit()
+    return diubah
+
+
+# =========================================================
+# ⚙️ PROFIL PRAGMA (satu-satunya tempat PRAGMA koneksi diatur)
+# =========================================================
+# • WAL → pembaca (laporan, worker) tidak memblokir penulis dan sebaliknya.
+# • synchronous NORMAL aman di WAL: commit tetap atomik & DB tidak korup saat listrik padam,
+#   paling banyak transaksi terakhir yang belum di-checkpoint hilang.
+# • cache_size negatif = KiB per koneksi → memori terbatas walau koneksi di-pool.
+# Jangan mengubah PRAGMA ini di tempat lain saat runtime.
+PRAGMA_PROFIL = (
+    ("synchronous", "NORMAL"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", -32768),            # ±32 MiB
+    ("foreign_keys", "ON"),
+    ("busy_timeout", 8000),            # tunggu penulis lain, hindari error locked
+)
+PRAGMA_PENULIS = (
+    ("journal_mode", "WAL"),           # persisten di file DB, cukup diset oleh penulis
+    ("wal_autocheckpoint", 1000),      # checkpoint tiap ±4 MiB WAL
+    ("journal_size_limit", 67108864),  # file -wal dipangkas ke ≤64 MiB setelah checkpoint
+)
+UKURAN_POOL_BACA = 4
+
+
+def terapkan_profil(conn, baca_saja=False):
+    """Terapkan PRAGMA_PROFIL ke koneksi baru (penulis: + WAL; pembaca: query_only)."""
+    cur = conn.cursor()
+    for nama, nilai in PRAGMA_PROFIL:
+        cur.execute(f"PRAGMA {nama} = {nilai};")
+    if baca_saja:
+        cur.execute("PRAGMA query_only = ON;")
+    else:
+        for nama, nilai in PRAGMA_PENULIS:
+            cur.execute(f"PRAGMA {nama} = {nilai};").fetchall()
+    cur.close()
+    return conn
+
+
+def _buka_koneksi(check_same_thread=True, path=None, kunci=None):
+    """
+    Buka koneksi autocommit ke DB_PATH / path (SQLCipher bila tersedia, fallback SQLite biasa).
+    kunci: kunci mentah 32 byte (mis. dbkey.bin dari backup); default kunci aplikasi saat ini.
+    """
+    path = str(path or DB_PATH)
+    try:
+        from sqlcipher3 import dbapi2 as sqlcipher
+        conn = sqlcipher.connect(
+            path, isolation_level=None, check_same_thread=check_same_thread
+        )
+        hexkey = (kunci or load_or_create_key()).hex()
+        conn.execute(f"PRAGMA key = \"x'{hexkey}'\";")
+
+        # 🔒 PRAGMA keamanan tambahan
+        conn.execute("PRAGMA cipher_page_size = 4096;")
+        conn.execute("PRAGMA kdf_iter = 64000;")
+        conn.execute("PRAGMA cipher_hmac_algorithm = HMAC_SHA512;")
+        conn.execute("PRAGMA cipher_kdf_algorithm = PBKDF2_HMAC_SHA512;")
+    except ImportError:
+        conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=check_same_thread
+        )
+    return conn
+
+
+def berkas_database():
+    """File fisik database: nexvo.db beserta pendamping WAL (-wal, -shm)."""
+    return (DB_PATH, Path(f"{DB_PATH}-wal"), Path(f"{DB_PATH}-shm"))
+
+
+# =========================================================
+# 🔒 KONEKSI GLOBAL SQLCIPHER (PENULIS UTAMA / GUI)
 # =========================================================
 def get_connection():
     """
     Mengembalikan koneksi global yang aman, terenkripsi (SQLCipher),
     dan dioptimalkan untuk NexVo Desktop.
-    Mode sinkronisasi: langsung (tanpa WAL) → semua koneksi membaca hasil terbaru.
+    Koneksi ini adalah penulis utama (thread GUI); profil PRAGMA lihat PRAGMA_PROFIL.
     """
-    global _connection
+    global _connection, _connection_generasi
     with _connection_lock:
         if _connection is not None:
             return _connection
 
         try:
-            # ======================================================
-            # 🔐 Gunakan SQLCipher jika tersedia
-            # ======================================================
-            try:
-                from sqlcipher3 import dbapi2 as sqlcipher
-                _connection = sqlcipher.connect(DB_PATH, isolation_level=None)  # autocommit aktif
-                hexkey = load_or_create_key().hex()
-                _connection.execute(f"PRAGMA key = \"x'{hexkey}'\";")
-
-                # 🔒 PRAGMA keamanan tambahan
-                _connection.execute("PRAGMA cipher_page_size = 4096;")
-                _connection.execute("PRAGMA kdf_iter = 64000;")
-                _connection.execute("PRAGMA cipher_hmac_algorithm = HMAC_SHA512;")
-                _connection.execute("PRAGMA cipher_kdf_algorithm = PBKDF2_HMAC_SHA512;")
-                # print("[INFO] SQLCipher mode aktif.")
-
-            except ImportError:
-                # ==================================================
-                # 🪶 Fallback ke SQLite biasa (non-enkripsi)
-                # ==================================================
-                import sqlite3
-                _connection = sqlite3.connect(DB_PATH, isolation_level=None)
-                # print("[PERINGATAN] SQLCipher3 tidak tersedia, menggunakan SQLite biasa.")
-
-            # ======================================================
-            # ⚙️ PRAGMA — Mode sinkronisasi langsung (tanpa WAL)
-            # ======================================================
-            cur = _connection.cursor()
-            cur.execute("PRAGMA journal_mode = DELETE;")   # 💡 langsung tulis ke file utama (tidak ada .wal)
-            cur.execute("PRAGMA synchronous = FULL;")      # jamin data tersimpan 100% aman
-            cur.execute("PRAGMA temp_store = MEMORY;")     # operasi sementara di RAM
-            cur.execute("PRAGMA cache_size = 10000;")      # cache besar untuk performa
-            cur.execute("PRAGMA foreign_keys = ON;")       # aktifkan relasi antar tabel
-            cur.execute("PRAGMA busy_timeout = 8000;")     # hindari error locked
-            cur.close()
-
-            # print("[DB] Koneksi SQLCipher siap (sinkron penuh, tanpa WAL).")
+            _connection = terapkan_profil(_buka_koneksi())
+            _connection_generasi += 1
             return _connection
 
         except Exception as e:
+            _connection = None
             print(f"[DB ERROR] Gagal inisialisasi database: {e}")
             raise
+
+
+def versi_data(conn):
+    """
+    Penanda versi isi database untuk cache hasil baca, atau None bila conn bukan koneksi global aktif.
+    • generasi koneksi : berubah saat reconnect / restore (id(conn) bisa terpakai ulang).
+    • data_version     : berubah bila koneksi lain (worker import) meng-commit.
+    • total_changes    : berubah pada setiap tulisan lewat koneksi ini sendiri.
+    """
+    if conn is None or conn is not _connection:
+        return None
+    try:
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    except Exception:
+        return None
+    return (_connection_generasi, data_version, conn.total_changes)
+
+
+# =========================================================
+# 📚 POOL KONEKSI BACA-SAJA (LAPORAN / WORKER LATAR)
+# =========================================================
+_pool_baca = []
+_pool_lock = Lock()
+_pool_generasi = 0
+
+
+@contextmanager
+def koneksi_baca():
+    """
+    Pinjam koneksi baca-saja dari pool.
+    • Satu transaksi baca → semua query di dalam blok melihat snapshot yang sama.
+    • Di WAL, pembacaan panjang tidak menahan penulisan di koneksi utama/worker.
+    • Boleh dipakai dari thread mana pun (satu peminjam dalam satu waktu).
+    """
+    with _pool_lock:
+        generasi = _pool_generasi
+        conn = _pool_baca.pop() if _pool_baca else None
+    if conn is None:
+        conn = terapkan_profil(_buka_koneksi(check_same_thread=False), baca_saja=True)
+
+    try:
+        conn.execute("BEGIN;")
+        yield conn
+    finally:
+        try:
+            conn.execute("ROLLBACK;")
+            conn.row_factory = None
+            sehat = True
+        except Exception:
+            sehat = False
+
+        with _pool_lock:
+            simpan = sehat and generasi == _pool_generasi and len(_pool_baca) < UKURAN_POOL_BACA
+            if simpan:
+                _pool_baca.append(conn)
+        if not simpan:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def tutup_pool_baca():
+    """Tutup semua koneksi baca yang menganggur; yang sedang dipinjam ditutup saat dikembalikan."""
+    global _pool_generasi
+    with _pool_lock:
+        _pool_generasi += 1
+        menganggur, _pool_baca[:] = list(_pool_baca), []
+    for conn in menganggur:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 # =========================================================
 # 🔁 AUTO-RECONNECT HANDLER
 # =========================================================
@@ -396,18 +767,87 @@ def get_temp_connection():
     """Koneksi sementara independen (tidak memakai global _connection).
     Digunakan hanya untuk backup/restore agar tidak bentrok dengan koneksi utama.
     """
+    return terapkan_profil(_buka_koneksi())
+
+# =========================================================
+# 🧵 KONEKSI KHUSUS WORKER (IMPORT DI LATAR BELAKANG)
+# =========================================================
+def get_worker_connection():
+    """Koneksi tulis independen untuk thread worker (dibuat, dipakai, dan ditutup di thread yang sama).
+    Autocommit (isolation_level=None) → transaksi dikendalikan eksplisit oleh pemanggil (BEGIN/COMMIT/ROLLBACK).
+    Profil PRAGMA sama dengan koneksi utama; SQLite (WAL) tetap melayani satu penulis dalam satu waktu,
+    penulis lain menunggu lewat busy_timeout, sedangkan pembaca tidak terblokir.
+    """
+    return terapkan_profil(_buka_koneksi())
+
+# =========================================================
+# 📸 SNAPSHOT ONLINE (SQLITE BACKUP API)
+# =========================================================
+SNAPSHOT_DIR = NEXVO_DIR / "Snapshot"
+HALAMAN_PER_LANGKAH = 256   # ±1 MiB per langkah (cipher_page_size 4096)
+BATAS_ULANG_SNAPSHOT = 3    # salinan bertahap diulang SQLite > N kali → salin dalam satu langkah
+
+
+class _SnapshotDiulang(Exception):
+    """Sumber terus berubah selama salinan bertahap (internal snapshot_database)."""
+
+
+def snapshot_database(tujuan=None, cek_batal=None, progres=None, halaman=HALAMAN_PER_LANGKAH):
+    """
+    Salin database aktif ke berkas snapshot lewat online backup API → konsisten secara transaksi
+    walau aplikasi sedang dipakai. Tujuan dibuka dengan kunci & PRAGMA cipher yang sama sehingga
+    snapshot tetap terenkripsi SQLCipher. Disalin per `halaman` halaman; di antara langkah kunci baca
+    dilepas → penulis (GUI / worker) tidak tertahan lama. Bila sumber diubah koneksi lain di tengah
+    jalan, SQLite mengulang salinan dari awal sehingga hasil akhir tetap satu titik waktu; bila terus
+    terulang, sisa salinan dilakukan dalam satu langkah (di WAL pembaca tidak memblokir penulis).
+    • cek_batal()            : dipanggil tiap langkah (boleh raise untuk membatalkan).
+    • progres(salin, total)  : jumlah halaman tersalin / total halaman.
+    Kembalikan Path snapshot (pemanggil yang menghapus setelah dipakai).
+    """
+    tujuan = Path(tujuan or SNAPSHOT_DIR / "nexvo_snapshot.db")
+    tujuan.parent.mkdir(parents=True, exist_ok=True)
+    for berkas in (tujuan, Path(f"{tujuan}-journal"), Path(f"{tujuan}-wal"), Path(f"{tujuan}-shm")):
+        if berkas.exists():
+            berkas.unlink()
+
+    ulang = [0, None]   # jumlah pengulangan, sisa halaman langkah sebelumnya
+
+    def _langkah(status, sisa, total):
+        if cek_batal is not None:
+            cek_batal()
+        if ulang[1] is not None and sisa > ulang[1]:
+            ulang[0] += 1
+            if ulang[0] > BATAS_ULANG_SNAPSHOT:
+                raise _SnapshotDiulang()
+        ulang[1] = sisa
+        if progres is not None:
+            progres(total - sisa, total)
+
+    sumber = terapkan_profil(_buka_koneksi(check_same_thread=False), baca_saja=True)
+    target = _buka_koneksi(path=tujuan)
     try:
-        from sqlcipher3 import dbapi2 as sqlcipher
-        conn = sqlcipher.connect(str(DB_PATH))
-        hexkey = load_or_create_key().hex()
-        conn.execute(f"PRAGMA key = \"x'{hexkey}'\";")
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute("PRAGMA journal_mode = DELETE;")
-        conn.execute("PRAGMA synchronous = FULL;")
-        return conn
-    except ImportError:
-        # fallback ke sqlite biasa
-        return sqlite3.connect(DB_PATH)
+        try:
+            sumber.backup(target, pages=halaman, progress=_langkah, sleep=0.01)
+        except _SnapshotDiulang:
+            print("[SNAPSHOT] Database terus berubah, salin dalam satu langkah.")
+            sumber.backup(target, pages=-1, progress=_langkah)
+    except BaseException:
+        target.close()
+        target = None
+        if tujuan.exists():
+            tujuan.unlink()
+        raise
+    finally:
+        sumber.close()
+        if target is not None:
+            target.close()
+    return tujuan
+
+
+def buka_database(path, kunci=None):
+    """Koneksi ke berkas database lain (snapshot / hasil ekstrak backup) dengan kunci & PRAGMA cipher NexVo."""
+    return _buka_koneksi(check_same_thread=False, path=path, kunci=kunci)
+
 
 # =========================================================
 # 🚀 BOOTSTRAP
@@ -430,6 +870,7 @@ def bootstrap():
 # =========================================================
 def close_connection():
     global _connection
+    tutup_pool_baca()
     with _connection_lock:
         if _connection is not None:
             try:
@@ -444,6 +885,35 @@ def close_connection():
 # =========================================================
 # 🧹 HAPUS SEMUA DATA
 # =========================================================
+def _kosongkan_tabel(conn, pertahankan):
+    """
+    Kosongkan semua tabel biasa selain `pertahankan`.
+    Tabel internal SQLite (sqlite_*) dan index teks FTS5 (fts_<tahapan> + tabel bayangannya)
+    tidak di-DELETE langsung – isinya bukan baris data, mengosongkannya merusak index
+    ("database disk image is malformed" di INSERT berikutnya). Trigger index teks dilepas
+    dulu, lalu ensure_indeks_teks menyusun ulang index (kosong) dan memasang triggernya lagi.
+    """
+    from indeks_teks import AWALAN_FTS, ensure_indeks_teks, hapus_trigger_teks
+
+    cur = conn.cursor()
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = [
+        r[0]
+        for r in cur.fetchall()
+        if r[0] not in pertahankan and not r[0].startswith(("sqlite_", AWALAN_FTS))
+    ]
+
+    for tbl in TAHAPAN_TABLES:
+        hapus_trigger_teks(conn, tbl)
+
+    # Hapus isi tiap tabel
+    for tbl in tables:
+        cur.execute(f"DELETE FROM {tbl}")
+    conn.commit()
+
+    ensure_indeks_teks(conn)
+
+
 def hapus_semua_data(conn=None):
     """
     Hapus seluruh isi tabel selain 'users' dan 'kecamatan'.
@@ -451,21 +921,8 @@ def hapus_semua_data(conn=None):
     """
     if conn is None:
         conn = get_connection()
-    cur = conn.cursor()
     try:
-        # Ambil daftar semua tabel kecuali yang tidak boleh disentuh
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [
-            r[0]
-            for r in cur.fetchall()
-            if r[0] not in ("sqlite_sequence", "users", "kecamatan")
-        ]
-
-        # Hapus isi tiap tabel
-        for tbl in tables:
-            cur.execute(f"DELETE FROM {tbl}")
-        conn.commit()
-
+        _kosongkan_tabel(conn, ("schema_meta", "users", "kecamatan"))
         print("[INFO] Semua data berhasil dihapus (kecuali tabel 'users' dan 'kecamatan').")
 
     except Exception as e:
@@ -481,20 +938,7 @@ def hapus_buat_akun(conn=None):
     """
     if conn is None:
         conn = get_connection()
-    cur = conn.cursor()
     try:
-        # Ambil daftar semua tabel kecuali yang tidak boleh disentuh
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [
-            r[0]
-            for r in cur.fetchall()
-            if r[0] not in ("sqlite_sequence", "kecamatan")
-        ]
-
-        # Hapus isi tiap tabel
-        for tbl in tables:
-            cur.execute(f"DELETE FROM {tbl}")
-        conn.commit()
-
+        _kosongkan_tabel(conn, ("schema_meta", "kecamatan"))
     except Exception as e:
         print(f"[WARN] Gagal hapus data: {e}")
\ No newline at end of file
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+excel_export.py – Mesin export .xlsx NexVo berbasis openpyxl mode write_only.
+• Satu pass konversi: baris mentah → tuple nilai polos + lebar kolom dihitung sekaligus.
+• Lembar ditulis streaming (tanpa objek Cell per sel di memori) dengan gaya bernama bersama
+  (satu NamedStyle per jenis sel, bukan Border/Alignment baru per sel).
+• Lebar kolom wajib ditulis sebelum sheetData pada mode write_only, karena itu nilai
+  dikumpulkan dulu sebagai tuple (jauh lebih ringan dari Workbook biasa) lalu dialirkan.
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+# Lapor progres setiap N baris yang ditulis
+INTERVAL_PROGRES = 2000
+
+
+def _gaya_nexvo():
+    """Gaya bernama export NexVo (dibuat baru per workbook karena NamedStyle terikat ke workbook)."""
+    tipis = Side(border_style="thin", color="CCCCCC")
+    garis = Border(top=tipis, bottom=tipis, left=tipis, right=tipis)
+    kiri = Alignment(horizontal="left", vertical="center")
+    tengah = Alignment(horizontal="center", vertical="center")
+    return [
+        NamedStyle(
+            name="nexvo_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill("solid", fgColor="4E4E4E"),
+            alignment=tengah,
+        ),
+        NamedStyle(name="nexvo_kiri", alignment=kiri, border=garis),
+        NamedStyle(name="nexvo_kiri_angka", alignment=kiri, border=garis, number_format="0"),
+        NamedStyle(name="nexvo_tengah", alignment=tengah, border=garis),
+        NamedStyle(name="nexvo_tengah_angka", alignment=tengah, border=garis, number_format="0"),
+        NamedStyle(name="nexvo_polos_kiri", alignment=kiri),
+    ]
+
+
+def _sel(ws, nama_gaya):
+    if nama_gaya is None:
+        return None
+    cell = WriteOnlyCell(ws)
+    cell.style = nama_gaya
+    return cell
+
+
+def tulis_xlsx(path, judul_sheet, kolom, baris, gaya_header=None, tambah_lebar=2,
+               freeze="A2", progress=None):
+    """
+    Tulis baris ke .xlsx dan kembalikan jumlah baris data.
+    • kolom   : [(judul, nama_gaya_sel)] – nama gaya dari _gaya_nexvo() atau None (tanpa gaya).
+    • baris   : iterable tuple/list nilai yang SUDAH dikonversi (int / str / None).
+    • progress: callable(ditulis, total) opsional, dipanggil tiap INTERVAL_PROGRES baris.
+    Lebar kolom = isi terpanjang (termasuk judul) + tambah_lebar.
+    """
+    judul = [j for j, _ in kolom]
+    lebar = [len(j) for j in judul]
+    data = []
+    for nilai in baris:
+        for i, v in enumerate(nilai):
+            if v is not None:
+                n = len(str(v))
+                if n > lebar[i]:
+                    lebar[i] = n
+        data.append(nilai)
+
+    wb = Workbook(write_only=True)
+    for gaya in _gaya_nexvo():
+        wb.add_named_style(gaya)
+    ws = wb.create_sheet(judul_sheet)
+    for i, n in enumerate(lebar, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = n + tambah_lebar
+    if freeze:
+        ws.freeze_panes = freeze
+
+    # === Header ===
+    if gaya_header is None:
+        ws.append(judul)
+    else:
+        header = []
+        for j in judul:
+            cell = _sel(ws, gaya_header)
+            cell.value = j
+            header.append(cell)
+        ws.append(header)
+
+    # === Data: satu WriteOnlyCell per kolom dipakai ulang (ditulis langsung saat append) ===
+    sel = [_sel(ws, g) for _, g in kolom]
+    total = len(data)
+    for n, nilai in enumerate(data, start=1):
+        row = []
+        for cell, v in zip(sel, nilai):
+            if cell is None:
+                row.append(v)
+            else:
+                cell.value = v
+                row.append(cell)
+        ws.append(row)
+        if progress is not None and n % INTERVAL_PROGRES == 0:
+            progress(n, total)
+
+    wb.save(path)
+    if progress is not None:
+        progress(total, total)
+    return total
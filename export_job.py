@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+export_job.py – Subsistem export NexVo di latar belakang (QThreadPool + QRunnable).
+• FORMAT_EKSPOR   : plug-in format file (xlsx, csv '#' ala Sidalih, parquet bila pyarrow terpasang).
+• snapshot_records: salin nilai kolom dari self.all_data ke tuple di thread GUI, sehingga
+                    tabel boleh diedit / difilter ulang selama export berjalan.
+• EksporJob       : konversi tipe + tulis berkas di thread worker (atomik: .tmp → replace),
+                    lapor progres & throughput (baris/detik), bisa dibatalkan.
+• jalankan_ekspor : indikator ringkas di status bar (non-modal) → pengguna tetap bisa bekerja.
+• teks_tabel      : format teks csv/tsv bersama untuk salin-ke-clipboard jendela rekap.
+• salin_seleksi   : Ctrl+C jendela rekap → snapshot_seleksi + mime_tabel (tetap di thread GUI).
+"""
+
+import csv
+import os
+import time
+from operator import attrgetter
+
+from PyQt6.QtCore import QMimeData, QRunnable, QThreadPool, Qt
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QLabel, QProgressBar, QPushButton, QWidget
+
+from excel_export import tulis_xlsx
+from import_worker import (
+    UKURAN_CHUNK, ImportContext, ImportDibatalkan, ImportDitolak, ImportProgressOverlay, ImportSignals,
+    PenerimaJob, potong,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Lapor progres / cek batal setiap N baris
+INTERVAL_LAPOR = 2000
+
+
+# =========================================================
+# 📐 SPESIFIKASI & SNAPSHOT
+# =========================================================
+class SpesifikasiEkspor:
+    """
+    Tata letak satu export.
+    • kolom        : [(judul, gaya_xlsx)] – gaya bernama excel_export (diabaikan format lain).
+    • ubah         : fungsi(baris_mentah) → tuple nilai final; None = baris sudah final.
+    • judul_sheet, gaya_header, tambah_lebar : khusus xlsx.
+    """
+
+    def __init__(self, kolom, ubah=None, judul_sheet="Data", gaya_header=None, tambah_lebar=2):
+        self.kolom = kolom
+        self.ubah = ubah
+        self.judul_sheet = judul_sheet
+        self.gaya_header = gaya_header
+        self.tambah_lebar = tambah_lebar
+
+    @property
+    def judul(self):
+        return [j for j, _ in self.kolom]
+
+
+def snapshot_records(records, keys):
+    """Bekukan records (PemilihRecord / dict) menjadi list tuple nilai sesuai urutan keys."""
+    ambil = attrgetter(*keys)
+    hasil = []
+    tambah = hasil.append
+    for r in records:
+        try:
+            tambah(ambil(r))
+        except AttributeError:
+            tambah(tuple(r.get(k, "") for k in keys))
+    return hasil
+
+
+def snapshot_seleksi(table, kosong="0"):
+    """
+    Bekukan rentang terseleksi pertama QTableWidget menjadi list baris teks (baris pertama = header).
+    Sel kosong / "-" diganti `kosong` agar angka rekap tetap bisa dijumlah di Excel.
+    None bila tidak ada seleksi.
+    """
+    selected = table.selectedRanges()
+    if not selected:
+        return None
+    rng = selected[0]
+    kolom = range(rng.leftColumn(), rng.rightColumn() + 1)
+
+    header = []
+    for c in kolom:
+        item = table.horizontalHeaderItem(c)
+        header.append(item.text() if item else "")
+    hasil = [header]
+
+    for r in range(rng.topRow(), rng.bottomRow() + 1):
+        cols = []
+        for c in kolom:
+            item = table.item(r, c)
+            val = item.text() if item else ""
+            cols.append(kosong if val.strip() in ("-", "") else val)
+        hasil.append(cols)
+    return hasil
+
+
+# =========================================================
+# 🧩 PLUG-IN FORMAT
+# =========================================================
+FORMAT_EKSPOR = {}
+
+
+def daftarkan_format(cls):
+    """Dekorator: daftarkan kelas format ke FORMAT_EKSPOR dengan kunci cls.nama."""
+    FORMAT_EKSPOR[cls.nama] = cls()
+    return cls
+
+
+@daftarkan_format
+class FormatXlsx:
+    nama = "xlsx"
+    label = "Excel (.xlsx)"
+    ekstensi = ".xlsx"
+    porsi_baca = 0.5   # xlsx menyangga baris dulu (lebar kolom) → separuh progres untuk konversi
+
+    def tulis(self, path, spec, baris, progres):
+        return tulis_xlsx(
+            path, spec.judul_sheet, spec.kolom, baris,
+            gaya_header=spec.gaya_header, tambah_lebar=spec.tambah_lebar, progress=progres,
+        )
+
+
+@daftarkan_format
+class FormatCsv:
+    nama = "csv"
+    label = "CSV Sidalih (#)"
+    ekstensi = ".csv"
+    porsi_baca = 1.0
+    delimiter = "#"    # sama dengan baca_csv_bertahap → hasil export bisa diimport kembali
+
+    def tulis(self, path, spec, baris, progres):
+        total = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, delimiter=self.delimiter)
+            w.writerow(spec.judul)
+            for chunk in potong(baris, UKURAN_CHUNK):
+                w.writerows(chunk)
+                total += len(chunk)
+        return total
+
+
+if pa is not None:
+    @daftarkan_format
+    class FormatParquet:
+        nama = "parquet"
+        label = "Parquet (kolumnar)"
+        ekstensi = ".parquet"
+        porsi_baca = 1.0
+
+        def tulis(self, path, spec, baris, progres):
+            # Semua kolom teks → NIK/NKK tidak kehilangan nol di depan; satu row group per chunk
+            schema = pa.schema([(j, pa.string()) for j in spec.judul])
+            total = 0
+            with pq.ParquetWriter(path, schema) as writer:
+                for chunk in potong(baris, UKURAN_CHUNK):
+                    kolom = [
+                        pa.array([None if v is None else str(v) for v in nilai], type=pa.string())
+                        for nilai in zip(*chunk)
+                    ]
+                    writer.write_table(pa.Table.from_arrays(kolom, schema=schema))
+                    total += len(chunk)
+            return total
+
+
+def pilihan_format():
+    """[(nama, label)] format yang tersedia di instalasi ini (urutan pendaftaran)."""
+    return [(f.nama, f.label) for f in FORMAT_EKSPOR.values()]
+
+
+# =========================================================
+# 📋 CLIPBOARD
+# =========================================================
+def teks_tabel(baris, delimiter):
+    """Gabungkan baris (list teks) menjadi satu teks tabel berpemisah delimiter."""
+    return "\n".join(delimiter.join(row) for row in baris)
+
+
+def mime_tabel(baris, delimiter_csv):
+    """QMimeData tabel dalam 3 format (tsv, csv sesuai locale, teks) agar Excel pasti kenal."""
+    tsv_text = teks_tabel(baris, "\t")
+    mime = QMimeData()
+    mime.setData("text/tab-separated-values", tsv_text.encode("utf-8"))
+    mime.setData("text/csv", teks_tabel(baris, delimiter_csv).encode("utf-8"))
+    mime.setText(tsv_text)  # fallback umum
+    return mime
+
+
+def salin_seleksi(table, delimiter_csv):
+    """Salin seleksi tabel rekap (termasuk header) ke clipboard. Harus dipanggil dari thread GUI."""
+    baris = snapshot_seleksi(table)
+    if baris is None:
+        return
+    QApplication.clipboard().setMimeData(mime_tabel(baris, delimiter_csv))
+
+
+# =========================================================
+# 🧵 JOB
+# =========================================================
+def format_laju(jumlah, detik):
+    return f"{jumlah / max(detik, 1e-6):,.0f}".replace(",", ".")
+
+
+class EksporJob(QRunnable):
+    """
+    Tulis sumber(ctx) ke path dengan format plug-in di thread pool.
+    • sumber(ctx) → list baris mentah (snapshot); boleh membaca DB lewat ctx.conn bila butuh_db,
+      atau raise ImportDitolak (mis. data kosong) → sinyal ditolak.
+    • Berkas ditulis ke path + '.tmp' lalu di-replace → batal/gagal tidak meninggalkan berkas setengah jadi.
+    Hasil selesai: (path, jumlah_baris, detik).
+    """
+
+    def __init__(self, path, format_nama, spec, sumber, butuh_db=False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.format = FORMAT_EKSPOR[format_nama]
+        self.spec = spec
+        self.sumber = sumber
+        self.butuh_db = butuh_db
+        self.signals = ImportSignals()
+        self.ctx = ImportContext(self.signals)
+
+    def run(self):
+        conn = None
+        tmp = self.path + ".tmp"
+        sinyal, args = self.signals.selesai, ()
+        try:
+            mulai = time.perf_counter()
+            if self.butuh_db:
+                from db_manager import get_worker_connection
+                conn = get_worker_connection()
+                self.ctx.conn = conn
+                conn.execute("BEGIN")  # satu transaksi baca → snapshot konsisten
+            baris = self.sumber(self.ctx)
+            if conn is not None:
+                conn.execute("COMMIT")
+            self.ctx.cek_batal()
+
+            jumlah = self.format.tulis(tmp, self.spec, self._ubah(baris, mulai),
+                                       self._progres_tulis(len(baris), mulai))
+            self.ctx.cek_batal()
+            os.replace(tmp, self.path)
+            args = ((self.path, jumlah, time.perf_counter() - mulai),)
+        except ImportDibatalkan:
+            sinyal = self.signals.dibatalkan
+        except ImportDitolak as e:
+            sinyal, args = self.signals.ditolak, (e.judul, e.pesan)
+        except Exception as e:
+            if self.ctx.sudah_batal:
+                sinyal = self.signals.dibatalkan
+            else:
+                sinyal, args = self.signals.gagal, (str(e),)
+        finally:
+            self.ctx.conn = None
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            if sinyal is not self.signals.selesai:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+        sinyal.emit(*args)
+
+    def _ubah(self, baris, mulai):
+        """Satu pass konversi tipe + progres/throughput + cek batal."""
+        ubah = self.spec.ubah
+        total = max(1, len(baris))
+        porsi = self.format.porsi_baca * 100
+        for n, raw in enumerate(baris, start=1):
+            if n % INTERVAL_LAPOR == 0:
+                self.ctx.cek_batal()
+                laju = format_laju(n, time.perf_counter() - mulai)
+                self.ctx.progress(n * porsi / total, f"Export {n:,}/{total:,} baris – {laju} baris/dtk")
+            yield raw if ubah is None else ubah(raw)
+
+    def _progres_tulis(self, total, mulai):
+        porsi = self.format.porsi_baca * 100
+
+        def progres(n, _total):
+            self.ctx.cek_batal()
+            laju = format_laju(n, time.perf_counter() - mulai)
+            self.ctx.progress(porsi + n * (100 - porsi) / max(1, total),
+                              f"Menulis {n:,}/{total:,} baris – {laju} baris/dtk")
+        return progres
+
+
+# =========================================================
+# 🪟 INDIKATOR STATUS BAR & PEMICU
+# =========================================================
+class EksporIndikator(PenerimaJob, QWidget):
+    """Indikator progres ringkas di status bar (non-modal) dengan tombol Batal."""
+
+    TEKS_BATAL = "Membatalkan export..."
+    ATRIBUT_AKTIF = "_ekspor_aktif"
+
+    def __init__(self, pemilik, status_bar, judul):
+        super().__init__(status_bar)
+        self._pemilik = pemilik
+        self._status_bar = status_bar
+        lay = QHBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.setSpacing(6)
+
+        self.lbl_status = QLabel(judul)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedWidth(140)
+        self.progress_bar.setFixedHeight(14)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                background-color: #e0e0e0;
+                border: 1px solid #999;
+                border-radius: 6px;
+                text-align: center;
+                font-size: 9px;
+            }
+            QProgressBar::chunk {
+                background-color: #ff6600;
+                border-radius: 6px;
+            }
+        """)
+        self.btn_batal = QPushButton("Batal")
+        self.btn_batal.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_batal.setStyleSheet("""
+            QPushButton {
+                background-color: #ff6600;
+                color: white;
+                font-weight: bold;
+                border-radius: 4px;
+                padding: 1px 8px;
+            }
+            QPushButton:hover { background-color: #d71d1d; }
+            QPushButton:disabled { background-color: #999999; }
+        """)
+
+        lay.addWidget(self.lbl_status)
+        lay.addWidget(self.progress_bar)
+        lay.addWidget(self.btn_batal)
+
+        self._job = None
+        self._callbacks = {}
+
+    def _lepas(self):
+        self._status_bar.removeWidget(self)
+        super()._lepas()
+
+
+class EksporProgressOverlay(ImportProgressOverlay):
+    """Overlay progres export untuk jendela tanpa status bar."""
+
+    TEKS_BATAL = "Membatalkan export..."
+    ATRIBUT_AKTIF = "_ekspor_aktif"
+
+
+def jalankan_ekspor(parent, path, format_nama, spec, sumber, butuh_db=False, judul="Export data...",
+                    on_selesai=None, on_gagal=None, on_ditolak=None, on_dibatalkan=None):
+    """
+    Jalankan EksporJob di QThreadPool global dengan indikator di status bar parent
+    (overlay bila parent tidak punya status bar). Satu export aktif per jendela;
+    kembalikan job (None bila masih ada export berjalan).
+    """
+    if getattr(parent, "_ekspor_aktif", None) is not None:
+        return None
+
+    job = EksporJob(path, format_nama, spec, sumber, butuh_db=butuh_db)
+    status_bar = parent.statusBar() if hasattr(parent, "statusBar") else None
+    if status_bar is not None:
+        indikator = EksporIndikator(parent, status_bar, judul)
+        indikator.pasang(job, on_selesai, on_gagal, on_ditolak, on_dibatalkan)
+        status_bar.addPermanentWidget(indikator)
+        indikator.show()
+    else:
+        overlay = EksporProgressOverlay(parent, judul)
+        overlay.pasang(job, on_selesai, on_gagal, on_ditolak, on_dibatalkan)
+        overlay.show()
+        overlay.raise_()
+
+    parent._ekspor_aktif = job
+    QThreadPool.globalInstance().start(job)
+    return job
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+filter_pemilih.py – Mesin filter sidebar NexVo (dikompilasi sekali per klik Terapkan).
+• kondisi_sql      : bagian filter yang aman didorong ke SQL (prafilter, selalu superset hasil akhir).
+• kompilasi_filter : dict filter → predikat(item) -> bool. Hanya pemeriksaan yang aktif yang dibuat;
+                     teks filter di-upper/strip, pola wildcard dipecah, dan tanggal filter diurai SEKALI.
+• Rentang umur diubah menjadi batas tanggal lahir (tuple (y, m, d)) → per baris cukup satu
+  perbandingan, tanpa menghitung umur. Tanggal baris diurai tanpa strptime & di-cache per nilai.
+• Tabel punya kolom TGL_LHR_ISO / LastUpdate_ISO (db_manager.ensure_tanggal_iso) → umur & rentang
+  LastUpdate menjadi batas teks ISO di WHERE (pakai index) dan dilewati di predikat Python.
+• Tabel punya index trigram fts_<tabel> (indeks_teks.py) → NAMA / ALAMAT dicari lewat index;
+  filters["mirip"] → pencarian toleran salah ketik (cukup sebagian trigram pola ada di teks).
+• adalah_penyempitan: filter baru lebih ketat dari filter lama → pencarian-sambil-mengetik cukup
+  menyaring ulang hasil sebelumnya di memori, tanpa query ulang.
+Semantik sama dengan MainWindow.matches_filters versi lama (termasuk format LastUpdate yang dikenali).
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+
+from pemilih_store import PemilihRecord
+
+# Urutan format sama dengan strptime lama: (pemisah, urutan bagian); sama dengan db_manager.sql_tanggal_iso
+FORMAT_TGL_LAHIR = (("/", "dmy"), ("-", "ymd"), ("-", "dmy"), ("|", "dmy"))        # %d/%m/%Y, %Y-%m-%d, %d-%m-%Y, %d|%m|%Y
+FORMAT_LAST_UPDATE = (("/", "dmy"), ("-", "ymd"), ("-", "dmy"))                    # %d/%m/%Y, %Y-%m-%d, %d-%m-%Y
+FORMAT_FILTER = (("/", "dmy"),)                                                    # %d/%m/%Y
+
+# Alias kunci untuk item non-PemilihRecord (dict / sqlite Row)
+_ALIAS = {
+    "NAMA": ("NAMA",),
+    "NIK": ("NIK",),
+    "NKK": ("NKK",),
+    "TGL_LHR": ("TGL_LHR", "tgl_lahir", "tanggal_lahir"),
+    "KET": ("KET",),
+    "JK": ("JK",),
+    "STS": ("STS",),
+    "DIS": ("DIS",),
+    "KTPel": ("KTPel", "KTP_EL", "KTP_EL?"),
+    "SUMBER": ("SUMBER",),
+    "ALAMAT": ("ALAMAT",),
+    "DPID": ("DPID",),
+    "LastUpdate": ("LastUpdate", "LASTUPDATE", "LAST_UPDATE"),
+}
+
+_KET_TMS = frozenset("12345678")
+
+
+# =========================================================
+# 📅 TANGGAL
+# =========================================================
+@lru_cache(maxsize=65536)
+def urai_tanggal(teks, pola=FORMAT_TGL_LAHIR):
+    """
+    'dd/mm/YYYY' dsb → (y, m, d) atau None. Setara strptime untuk format di `pola`
+    (hari/bulan 1–2 digit, tahun tepat 4 digit, tanggal harus valid) tapi jauh lebih cepat.
+    """
+    for sep, urutan in pola:
+        bagian = teks.split(sep)
+        if len(bagian) != 3:
+            continue
+        if urutan == "ymd":
+            y, m, d = bagian
+        else:
+            d, m, y = bagian
+        if not (len(y) == 4 and 1 <= len(m) <= 2 and 1 <= len(d) <= 2):
+            continue
+        if not (y + m + d).isascii() or not (y + m + d).isdigit():
+            continue
+        try:
+            date(int(y), int(m), int(d))
+        except ValueError:
+            continue
+        return int(y), int(m), int(d)
+    return None
+
+
+@lru_cache(maxsize=65536)
+def urai_update(teks):
+    """
+    LastUpdate → (y, m, d) atau None untuk pengurutan header; 'YYYY-mm-dd HH:MM:SS' (jam valid)
+    diambil tanggalnya. Filter rentang LastUpdate tidak memakai ini (tanpa jam, FORMAT_LAST_UPDATE).
+    """
+    if len(teks) == 19 and teks[10] == " ":
+        jam = teks[11:].split(":")
+        if len(jam) != 3 or not all(len(j) == 2 and j.isascii() and j.isdigit() for j in jam):
+            return None
+        if int(jam[0]) > 23 or int(jam[1]) > 59 or int(jam[2]) > 59:
+            return None
+        return urai_tanggal(teks[:10], (("-", "ymd"),))
+    return urai_tanggal(teks, FORMAT_LAST_UPDATE)
+
+
+def _iso(tgl):
+    return "%04d-%02d-%02d" % tgl
+
+
+def batas_lahir(umur_min, umur_max, hari_ini=None):
+    """
+    Rentang umur → (paling_lambat, lebih_dari) tanggal lahir sebagai tuple (y, m, d):
+    umur >= umur_min  ⇔  lahir <= (Y - umur_min, M, D)
+    umur <= umur_max  ⇔  lahir >  (Y - umur_max - 1, M, D)
+    Perbandingan tuple → 29 Februari tidak perlu ditangani khusus.
+    """
+    t = hari_ini or date.today()
+    return (t.year - umur_min, t.month, t.day), (t.year - umur_max - 1, t.month, t.day)
+
+
+# =========================================================
+# 🔎 POLA WILDCARD
+# =========================================================
+def buat_wildcard(pattern):
+    """Pola dengan % sebagai wildcard (tanpa beda huruf besar/kecil) → fungsi(teks) -> bool."""
+    if not pattern:
+        return lambda teks: True
+    pattern = pattern.lower()
+    if "%" not in pattern:
+        return lambda teks: pattern in teks.lower()
+
+    parts = pattern.split("%")
+    awal, akhir = parts[0], parts[-1]
+    tengah = [p for p in parts[1:-1] if p]
+
+    def cocok(teks):
+        teks = teks.lower()
+        if awal and not teks.startswith(awal):
+            return False
+        if akhir and not teks.endswith(akhir):
+            return False
+        pos = len(awal)
+        for part in tengah:
+            pos = teks.find(part, pos)
+            if pos == -1:
+                return False
+            pos += len(part)
+        return True
+
+    return cocok
+
+
+# =========================================================
+# 🔤 TRIGRAM (pencarian mirip)
+# =========================================================
+_LITERAL_TRIGRAM = re.compile(r"[^%_]{3}")
+
+
+def trigram(pola):
+    """Himpunan trigram (huruf kecil) tiap bagian pola; % memisah bagian, jadi tidak ikut trigram."""
+    hasil = set()
+    for bagian in pola.lower().split("%"):
+        hasil.update(bagian[i:i + 3] for i in range(len(bagian) - 2))
+    return hasil
+
+
+def batas_mirip(jumlah):
+    """
+    Jumlah trigram pola yang minimal harus ada di teks.
+    Satu salah ketik menghapus ≤ 3 trigram; diizinkan 1 salah ketik per 10 trigram, paling longgar sepertiga.
+    """
+    salah = 1 + jumlah // 10
+    return max(1, (jumlah + 2) // 3, jumlah - 3 * salah)
+
+
+def buat_mirip(pattern):
+    """Pola → fungsi(teks) -> bool toleran salah ketik; pola < 3 huruf → sama dengan buat_wildcard."""
+    tri = tuple(trigram(pattern or ""))
+    if not tri:
+        return buat_wildcard(pattern)
+    batas = batas_mirip(len(tri))
+
+    def cocok(teks):
+        teks = teks.lower()
+        return sum(1 for t in tri if t in teks) >= batas
+
+    return cocok
+
+
+# =========================================================
+# 🧱 PREFILTER SQL
+# =========================================================
+def _umur_aktif(filters):
+    if "umur_min" not in filters or "umur_max" not in filters:
+        return False
+    return not (filters["umur_min"] == 0 and filters["umur_max"] == 100)
+
+
+def _rentang_update(filters):
+    """(awal, akhir) tuple (y, m, d) / (None, None) bila rentang diisi tapi tak valid / False bila kosong."""
+    if not (filters.get("last_update_start") and filters.get("last_update_end")):
+        return False
+    awal = urai_tanggal(filters["last_update_start"], FORMAT_FILTER)
+    akhir = urai_tanggal(filters["last_update_end"], FORMAT_FILTER)
+    if awal is None or akhir is None:
+        return None, None
+    return awal, akhir
+
+
+def _kondisi_teks(kolom, pola, mirip, indeks_teks):
+    """(kondisi, params) untuk NAMA / ALAMAT, atau None bila hanya bisa dinilai di Python."""
+    tri = trigram(pola) if mirip else None
+    if tri and indeks_teks:
+        # Tiap trigram → daftar rowid dari index; lolos bila muncul di ≥ batas_mirip daftar
+        cocok = f"SELECT rowid AS r FROM {indeks_teks} WHERE {indeks_teks} MATCH ?"
+        sql = (f"rowid IN (SELECT r FROM ({' UNION ALL '.join([cocok] * len(tri))}) "
+               f"GROUP BY r HAVING COUNT(*) >= ?)")
+        frasa = [f'{kolom} : "{t.replace(chr(34), chr(34) * 2)}"' for t in sorted(tri)]
+        return sql, frasa + [batas_mirip(len(tri))]
+    if tri:
+        return None
+    if indeks_teks and _LITERAL_TRIGRAM.search(pola):
+        # LIKE pada tabel FTS trigram memakai index (butuh ≥ 3 huruf berurutan tanpa wildcard)
+        return f"rowid IN (SELECT rowid FROM {indeks_teks} WHERE {kolom} LIKE ?)", [f"%{pola}%"]
+    return f"{kolom} LIKE ?", [f"%{pola}%"]
+
+
+def kondisi_sql(filters, tanggal_iso=False, hari_ini=None, indeks_teks=None):
+    """
+    (conditions, params) untuk klausa WHERE; tiap kondisi lebih longgar/sama dengan predikat Python.
+    tanggal_iso=True → umur & rentang LastUpdate dievaluasi penuh di SQL lewat kolom *_ISO
+    (pasangkan dengan kompilasi_filter(..., tanggal_iso=True)).
+    indeks_teks = nama tabel FTS (indeks_teks.indeks_teks_tersedia) → NAMA / ALAMAT lewat index trigram;
+    pencarian mirip dinilai penuh di SQL (pasangkan dengan kompilasi_filter(..., indeks_teks=...)).
+    """
+    conditions, params = [], []
+    mirip = bool(filters.get("mirip"))
+    teks = {kolom: _kondisi_teks(kolom, filters[kunci], mirip, indeks_teks)
+            for kunci, kolom in (("nama", "NAMA"), ("alamat", "ALAMAT")) if filters.get(kunci)}
+    if teks.get("NAMA"):
+        conditions.append(teks["NAMA"][0]);   params += teks["NAMA"][1]
+    if filters.get("nik"):
+        conditions.append("NIK LIKE ?");    params.append(f"%{filters['nik']}%")
+    if filters.get("nkk"):
+        conditions.append("NKK LIKE ?");    params.append(f"%{filters['nkk']}%")
+    if teks.get("ALAMAT"):
+        conditions.append(teks["ALAMAT"][0]); params += teks["ALAMAT"][1]
+    if filters.get("tgl_lahir"):
+        conditions.append("instr(TGL_LHR, ?) > 0"); params.append(filters["tgl_lahir"])
+    if filters.get("jk"):
+        conditions.append("JK = ?");        params.append(filters["jk"])
+    if filters.get("sts"):
+        conditions.append("STS = ?");       params.append(filters["sts"])
+    if filters.get("ktpel"):
+        conditions.append("KTPel = ?");     params.append(filters["ktpel"])
+    if filters.get("sumber"):
+        conditions.append("SUMBER = ?");    params.append(filters["sumber"])
+    if filters.get("tps"):
+        conditions.append("TPS = ?");       params.append(filters["tps"])
+
+    if tanggal_iso:
+        # Tanggal lahir kosong / tak terbaca (NULL) tidak menggugurkan baris
+        if _umur_aktif(filters):
+            paling_lambat, lebih_dari = batas_lahir(filters["umur_min"], filters["umur_max"], hari_ini)
+            conditions.append("(TGL_LHR_ISO IS NULL OR (TGL_LHR_ISO > ? AND TGL_LHR_ISO <= ?))")
+            params += [_iso(lebih_dari), _iso(paling_lambat)]
+        rentang = _rentang_update(filters)
+        if rentang:
+            awal, akhir = rentang
+            if awal is None:
+                conditions.append("0")
+            else:
+                conditions.append("LastUpdate_ISO >= ? AND LastUpdate_ISO <= ?")
+                params += [_iso(awal), _iso(akhir)]
+    return conditions, params
+
+
+# =========================================================
+# 🔍 PENYEMPITAN (pencarian bertahap)
+# =========================================================
+_PENYEMPITAN_SAMA = ("jk", "sts", "ktpel", "sumber", "tps")     # diputus SQL (=) → harus tetap sama
+_PENYEMPITAN_PILIHAN = ("keterangan", "dis", "rank")            # hanya di Python → boleh baru diisi
+_PENYEMPITAN_MEMUAT = ("nik", "nkk", "tgl_lahir")              # substring → nilai baru memuat nilai lama
+
+
+def _rentang_umur(filters):
+    return (filters["umur_min"], filters["umur_max"]) if _umur_aktif(filters) else None
+
+
+def adalah_penyempitan(lama, baru):
+    """
+    True bila setiap baris yang lolos filter `baru` pasti lolos filter `lama`, dan predikat Python
+    (kompilasi_filter(baru)) atas hasil `lama` memberi hasil sama dengan query ulang penuh.
+    """
+    if bool(lama.get("mirip")) != bool(baru.get("mirip")):
+        return False
+    for kunci in ("nama", "alamat"):
+        a, b = lama.get(kunci) or "", baru.get(kunci) or ""
+        if not a or a == b:
+            continue
+        if baru.get("mirip") or "%" in a:
+            return False
+        # Semua bagian pola baru wajib ada di teks → cukup satu bagian yang memuat pola lama
+        if not any(a.lower() in bagian for bagian in b.lower().split("%")):
+            return False
+    for kunci in _PENYEMPITAN_MEMUAT:
+        if (lama.get(kunci) or "") not in (baru.get(kunci) or ""):
+            return False
+    for kunci in _PENYEMPITAN_SAMA:
+        if (lama.get(kunci) or "") != (baru.get(kunci) or ""):
+            return False
+    for kunci in _PENYEMPITAN_PILIHAN:
+        if lama.get(kunci) and lama.get(kunci) != baru.get(kunci):
+            return False
+
+    umur_lama, umur_baru = _rentang_umur(lama), _rentang_umur(baru)
+    if umur_lama is not None:
+        if umur_baru is None or not (umur_lama[0] <= umur_baru[0] and umur_baru[1] <= umur_lama[1]):
+            return False
+    if _rentang_update(lama):
+        kunci = ("last_update_start", "last_update_end")
+        if any(lama.get(k) != baru.get(k) for k in kunci):
+            return False
+    return True
+
+
+# =========================================================
+# ⚙️ KOMPILASI PREDIKAT
+# =========================================================
+def _pengambil(kolom):
+    """Fungsi(item) -> str ter-strip; PemilihRecord lewat slot langsung, lainnya lewat alias."""
+    alias = _ALIAS[kolom]
+
+    def ambil(item):
+        if isinstance(item, PemilihRecord):
+            return (getattr(item, kolom) or "").strip()
+        for k in alias:
+            if isinstance(item, dict):
+                if k in item:
+                    return (item.get(k) or "").strip()
+                for ik in item.keys():
+                    if ik.lower() == k.lower():
+                        return (item.get(ik) or "").strip()
+            else:
+                try:
+                    return (item[k] or "").strip()
+                except Exception:
+                    try:
+                        return (getattr(item, k) or "").strip()
+                    except Exception:
+                        pass
+        return ""
+
+    return ambil
+
+
+def _sama(kolom, nilai):
+    ambil = _pengambil(kolom)
+    nilai = nilai.strip().upper()
+    return lambda item: ambil(item).upper() == nilai
+
+
+def _memuat(kolom, nilai):
+    ambil = _pengambil(kolom)
+    return lambda item: nilai in ambil(item)
+
+
+def _cek_teks(kolom, pola, mirip, indeks_teks):
+    """Predikat NAMA / ALAMAT, atau None bila sudah dinilai penuh oleh kondisi_sql (mirip + index)."""
+    if mirip and trigram(pola):
+        if indeks_teks:
+            return None
+        cocok = buat_mirip(pola)
+    else:
+        cocok = buat_wildcard(pola)
+    ambil = _pengambil(kolom)
+    return lambda item: cocok(ambil(item))
+
+
+def kompilasi_filter(filters, hari_ini=None, tanggal_iso=False, indeks_teks=None):
+    """
+    Dict filter sidebar → predikat(item) -> bool (item: PemilihRecord / dict / sqlite Row).
+    tanggal_iso=True → umur & rentang LastUpdate sudah disaring kondisi_sql, tidak diulang di sini.
+    indeks_teks terisi → pencarian mirip NAMA / ALAMAT sudah disaring kondisi_sql, tidak diulang.
+    """
+    cek = []
+    mirip = bool(filters.get("mirip"))
+    teks = {kolom: _cek_teks(kolom, filters[kunci], mirip, indeks_teks)
+            for kunci, kolom in (("nama", "NAMA"), ("alamat", "ALAMAT")) if filters.get(kunci)}
+
+    if teks.get("NAMA"):
+        cek.append(teks["NAMA"])
+    if filters.get("nik"):
+        cek.append(_memuat("NIK", filters["nik"]))
+    if filters.get("nkk"):
+        cek.append(_memuat("NKK", filters["nkk"]))
+    if filters.get("tgl_lahir"):
+        cek.append(_memuat("TGL_LHR", filters["tgl_lahir"]))
+
+    # Umur → batas tanggal lahir (tanggal kosong / tak terbaca tidak menggugurkan baris)
+    if not tanggal_iso and _umur_aktif(filters):
+        ambil_lahir = _pengambil("TGL_LHR")
+        paling_lambat, lebih_dari = batas_lahir(filters["umur_min"], filters["umur_max"], hari_ini)
+
+        def cek_umur(item):
+            tgl = ambil_lahir(item)
+            if not tgl:
+                return True
+            lahir = urai_tanggal(tgl, FORMAT_TGL_LAHIR)
+            return lahir is None or lebih_dari < lahir <= paling_lambat
+
+        cek.append(cek_umur)
+
+    for kunci, kolom in (("keterangan", "KET"), ("jk", "JK"), ("sts", "STS"), ("dis", "DIS"),
+                         ("ktpel", "KTPel"), ("sumber", "SUMBER")):
+        if filters.get(kunci):
+            cek.append(_sama(kolom, filters[kunci]))
+
+    # Rank (Aktif / Ubah / Baru / TMS) – KET kosong: DPID terisi → aktif (0), selain itu baru (B)
+    if filters.get("rank"):
+        rank_req = filters["rank"].strip().upper()
+        ambil_ket, ambil_dpid = _pengambil("KET"), _pengambil("DPID")
+
+        def ket_efektif(item):
+            ket = ambil_ket(item).upper()
+            if ket:
+                return ket
+            dpid = ambil_dpid(item)
+            return "0" if (dpid and dpid != "0") else "B"
+
+        if rank_req == "TMS":
+            cek.append(lambda item: ket_efektif(item) in _KET_TMS)
+        else:
+            wajib = {"AKTIF": "0", "UBAH": "U", "BARU": "B"}.get(rank_req)
+            if wajib is not None:
+                cek.append(lambda item: ket_efektif(item) == wajib)
+
+    if teks.get("ALAMAT"):
+        cek.append(teks["ALAMAT"])
+
+    # Rentang LastUpdate (DD/MM/YYYY): kosong / tak terbaca → tidak lolos
+    rentang = False if tanggal_iso else _rentang_update(filters)
+    if rentang:
+        awal, akhir = rentang
+        if awal is None:
+            return lambda item: False
+        ambil_update = _pengambil("LastUpdate")
+
+        def cek_update(item):
+            tgl = ambil_update(item)
+            if not tgl:
+                return False
+            tgl = urai_tanggal(tgl, FORMAT_LAST_UPDATE)
+            return tgl is not None and awal <= tgl <= akhir
+
+        cek.append(cek_update)
+
+    if not cek:
+        return lambda item: True
+    if len(cek) == 1:
+        return cek[0]
+    cek = tuple(cek)
+
+    def cocok(item):
+        for c in cek:
+            if not c(item):
+                return False
+        return True
+
+    return cocok
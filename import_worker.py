@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+import_worker.py – Jalur import CSV NexVo di latar belakang (QThreadPool + QRunnable).
+• ImportJob      : menjalankan fungsi import di thread pool dengan koneksi DB khusus,
+                   satu transaksi (BEGIN IMMEDIATE) → batal/gagal = ROLLBACK bersih.
+• ImportContext  : dipakai fungsi import untuk lapor progres & cek pembatalan.
+• baca_csv_bertahap / potong : baca CSV per baris (streaming) + kelompokkan per chunk.
+• jalankan_import: tampilkan overlay progres (dengan tombol Batal) lalu jalankan job.
+GUI tetap responsif karena parsing & penulisan DB tidak lagi berjalan di thread utama.
+"""
+
+import csv
+import os
+import threading
+from itertools import islice
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel, QProgressBar, QPushButton, QVBoxLayout, QWidget
+
+from db_manager import get_worker_connection
+
+# Jumlah baris per executemany (cukup besar untuk throughput, cukup kecil untuk batal cepat)
+UKURAN_CHUNK = 2000
+
+
+class ImportDibatalkan(Exception):
+    """Import dihentikan oleh pengguna (tombol Batal)."""
+
+
+class ImportDitolak(Exception):
+    """Isi CSV tidak memenuhi syarat (wilayah beda, bukan CSV Ecoklit, dst)."""
+
+    def __init__(self, pesan, judul="Ditolak"):
+        super().__init__(pesan)
+        self.pesan = pesan
+        self.judul = judul
+
+
+# =========================================================
+# 📡 SINYAL & KONTEKS
+# =========================================================
+class ImportSignals(QObject):
+    progress = pyqtSignal(int, str)
+    selesai = pyqtSignal(object)
+    peringatan = pyqtSignal(str)      # selesai tapi ada langkah tambahan yang gagal (dikirim sebelum selesai)
+    gagal = pyqtSignal(str)
+    ditolak = pyqtSignal(str, str)
+    dibatalkan = pyqtSignal()
+
+
+class ImportContext:
+    """Jembatan antara fungsi import (thread worker) dan GUI."""
+
+    def __init__(self, signals):
+        self._signals = signals
+        self._batal = threading.Event()
+        self._pct_terakhir = -1
+        self.conn = None
+
+    def progress(self, pct, pesan=""):
+        """Lapor progres 0–100 (hanya dikirim bila persentase berubah → event loop tidak banjir)."""
+        pct = max(0, min(100, int(pct)))
+        if pct != self._pct_terakhir:
+            self._pct_terakhir = pct
+            self._signals.progress.emit(pct, pesan)
+
+    def batal(self):
+        """Dipanggil dari GUI; query yang sedang berjalan ikut diinterupsi."""
+        self._batal.set()
+        conn = self.conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except Exception:
+                pass
+
+    @property
+    def sudah_batal(self):
+        return self._batal.is_set()
+
+    def cek_batal(self):
+        if self._batal.is_set():
+            raise ImportDibatalkan()
+
+
+# =========================================================
+# 🧵 JOB
+# =========================================================
+class ImportJob(QRunnable):
+    """
+    Jalankan fungsi(ctx) → hasil di thread pool.
+    • ctx.conn   : koneksi khusus worker (bukan koneksi global GUI).
+    • Semua tulisan fungsi berada dalam satu transaksi; di-COMMIT hanya bila selesai normal.
+    • pasca(conn, hasil) opsional dijalankan setelah COMMIT (pemeliharaan ringkasan, dsb).
+      Data sudah tersimpan → kegagalan pasca dilaporkan sebagai peringatan, bukan import gagal.
+    """
+
+    def __init__(self, fungsi, pasca=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fungsi = fungsi
+        self.pasca = pasca
+        self.signals = ImportSignals()
+        self.ctx = ImportContext(self.signals)
+
+    def run(self):
+        conn = None
+        sinyal, args = self.signals.selesai, ()
+        pesan_pasca = None
+        try:
+            conn = get_worker_connection()
+            self.ctx.conn = conn
+            conn.execute("BEGIN IMMEDIATE")
+            hasil = self.fungsi(self.ctx)
+            self.ctx.cek_batal()
+            conn.execute("COMMIT")
+            args = (hasil,)
+            if self.pasca is not None:
+                try:
+                    self.pasca(conn, hasil)
+                except Exception as e:
+                    self._rollback(conn)
+                    pesan_pasca = str(e)
+        except ImportDibatalkan:
+            self._rollback(conn)
+            sinyal = self.signals.dibatalkan
+        except ImportDitolak as e:
+            self._rollback(conn)
+            sinyal, args = self.signals.ditolak, (e.judul, e.pesan)
+        except Exception as e:
+            self._rollback(conn)
+            if self.ctx.sudah_batal:
+                # conn.interrupt() → "interrupted" diperlakukan sebagai pembatalan
+                sinyal = self.signals.dibatalkan
+            else:
+                sinyal, args = self.signals.gagal, (str(e),)
+        finally:
+            self.ctx.conn = None
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        # Sinyal dikirim setelah koneksi worker ditutup → GUI langsung bisa membaca hasil final
+        if pesan_pasca is not None:
+            self.signals.peringatan.emit(pesan_pasca)
+        sinyal.emit(*args)
+
+    @staticmethod
+    def _rollback(conn):
+        if conn is None:
+            return
+        try:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        except Exception:
+            pass
+
+
+# =========================================================
+# 📄 CSV STREAMING
+# =========================================================
+def baca_csv_bertahap(file_path, ctx=None, pesan="Membaca CSV...", delimiter="#", lewati_header=True):
+    """
+    Hasilkan baris CSV satu per satu tanpa memuat seluruh file ke memori.
+    Progres dihitung dari jumlah karakter terbaca dibanding ukuran file.
+    """
+    ukuran = max(1, os.path.getsize(file_path))
+    terbaca = 0
+
+    with open(file_path, newline="", encoding="utf-8") as f:
+        def _baris_teks():
+            nonlocal terbaca
+            for line in f:
+                terbaca += len(line)
+                yield line
+
+        reader = csv.reader(_baris_teks(), delimiter=delimiter)
+        if lewati_header:
+            next(reader, None)
+        for i, row in enumerate(reader):
+            if ctx is not None and i % 500 == 0:
+                ctx.cek_batal()
+                ctx.progress(terbaca * 100 // ukuran, pesan)
+            yield row
+
+
+def baca_header_csv(file_path, delimiter="#"):
+    """Baca baris header saja (validasi awal di thread GUI tetap instan untuk file besar)."""
+    with open(file_path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f, delimiter=delimiter), None)
+
+
+def potong(iterable, ukuran=UKURAN_CHUNK):
+    """Kelompokkan iterable menjadi list berukuran tetap (chunk terakhir boleh lebih kecil)."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, ukuran))
+        if not chunk:
+            return
+        yield chunk
+
+
+def executemany_bertahap(ctx, sql, baris, ukuran=UKURAN_CHUNK):
+    """executemany per chunk di koneksi worker; cek pembatalan di antara chunk. Kembalikan jumlah baris."""
+    cur = ctx.conn.cursor()
+    total = 0
+    for chunk in potong(baris, ukuran):
+        ctx.cek_batal()
+        cur.executemany(sql, chunk)
+        total += len(chunk)
+    return total
+
+
+# =========================================================
+# 🔍 VALIDASI ECOKLIT (SAMBIL STREAMING)
+# =========================================================
+class PemeriksaEcoklit:
+    """
+    Kumpulkan syarat CSV Ecoklit selama baris dibaca (tanpa pass kedua atas file):
+    • semua SUMBER = COKLIT (bila tidak ada kolom LATITUDE/LONGITUDE),
+    • tepat satu KECAMATAN & satu DESA, dan sama dengan wilayah aplikasi.
+    periksa() dipanggil setelah semua baris dibaca → ImportDitolak bila tidak lolos (transaksi di-rollback).
+    """
+
+    def __init__(self, idx_sumber, idx_kec, idx_kel, ada_latlong, kecamatan, desa):
+        self.idx_sumber = idx_sumber
+        self.idx_kec = idx_kec
+        self.idx_kel = idx_kel
+        self.ada_latlong = ada_latlong
+        self.kecamatan = kecamatan or ""
+        self.desa = desa or ""
+        self.jumlah_baris = 0
+        self._total_sumber = 0
+        self._coklit = 0
+        self._kec = set()
+        self._desa = set()
+
+    def feed(self, r):
+        self.jumlah_baris += 1
+        if self.idx_sumber is not None and self.idx_sumber < len(r):
+            self._total_sumber += 1
+            if r[self.idx_sumber].strip().upper() == "COKLIT":
+                self._coklit += 1
+        if self.idx_kec < len(r) and r[self.idx_kec].strip():
+            # Hapus spasi lalu kapital
+            self._kec.add(r[self.idx_kec].strip().replace(" ", "").upper())
+        if self.idx_kel < len(r) and r[self.idx_kel].strip():
+            self._desa.add(r[self.idx_kel].strip().replace(" ", "").upper())
+
+    def periksa(self):
+        if self.jumlah_baris == 0:
+            raise ImportDitolak("File CSV tidak berisi data.", judul="Error")
+
+        semua_coklit = self._total_sumber > 0 and self._total_sumber == self._coklit
+        if not (self.ada_latlong or semua_coklit):
+            raise ImportDitolak("Data yang diimport bukan CSV dari web Ecoklit.")
+
+        pesan_wilayah = (
+            f"Import CSV gagal!\nHarap gunakan CSV Ecoklit untuk Desa {self.desa.title()} "
+            f"Kecamatan {self.kecamatan.title()}."
+        )
+        if len(self._kec) != 1 or len(self._desa) != 1:
+            raise ImportDitolak(pesan_wilayah, judul="Error")
+        if (
+            next(iter(self._kec)) != self.kecamatan.replace(" ", "").upper()
+            or next(iter(self._desa)) != self.desa.replace(" ", "").upper()
+        ):
+            raise ImportDitolak(pesan_wilayah, judul="Error")
+
+
+# =========================================================
+# 🪟 OVERLAY PROGRES
+# =========================================================
+class PenerimaJob:
+    """
+    Mixin widget penerima sinyal job di thread GUI (progres, Batal, selesai/gagal/batal).
+    Widget turunan wajib punya lbl_status, progress_bar, btn_batal; self._pemilik = jendela
+    yang ditandai job aktif lewat atribut ATRIBUT_AKTIF.
+    """
+
+    TEKS_BATAL = "Membatalkan..."
+    ATRIBUT_AKTIF = None
+
+    def pasang(self, job, on_selesai=None, on_gagal=None, on_ditolak=None, on_dibatalkan=None,
+               on_peringatan=None):
+        self._job = job
+        self._callbacks = {
+            "selesai": on_selesai, "gagal": on_gagal,
+            "ditolak": on_ditolak, "dibatalkan": on_dibatalkan,
+            "peringatan": on_peringatan,
+        }
+        self._peringatan = None
+        # Slot berupa method QObject milik thread GUI → koneksi otomatis QueuedConnection
+        job.signals.progress.connect(self._on_progress)
+        job.signals.selesai.connect(self._on_selesai)
+        job.signals.peringatan.connect(self._on_peringatan)
+        job.signals.gagal.connect(self._on_gagal)
+        job.signals.ditolak.connect(self._on_ditolak)
+        job.signals.dibatalkan.connect(self._on_dibatalkan)
+        self.btn_batal.clicked.connect(self._on_batal)
+
+    def _on_progress(self, pct, pesan):
+        self.progress_bar.setValue(pct)
+        if pesan:
+            self.lbl_status.setText(pesan)
+
+    def _on_batal(self):
+        if self._job is None:
+            return
+        self.btn_batal.setEnabled(False)
+        self.lbl_status.setText(self.TEKS_BATAL)
+        self._job.ctx.batal()
+
+    def _lepas(self):
+        """Sembunyikan & hapus widget (turunan boleh menambah langkah, mis. lepas dari status bar)."""
+        self.hide()
+        self.deleteLater()
+
+    def _tutup(self, nama, *args):
+        pemilik = self._pemilik
+        if pemilik is not None and getattr(pemilik, self.ATRIBUT_AKTIF, None) is self._job:
+            setattr(pemilik, self.ATRIBUT_AKTIF, None)
+        self._job = None
+        self._lepas()
+        cb = self._callbacks.get(nama)
+        if cb is not None:
+            cb(*args)
+
+    def _on_peringatan(self, pesan):
+        self._peringatan = pesan
+
+    def _on_selesai(self, hasil):
+        self.progress_bar.setValue(100)
+        peringatan, self._peringatan = self._peringatan, None
+        self._tutup("selesai", hasil)
+        cb = self._callbacks.get("peringatan")
+        if peringatan is not None and cb is not None:
+            cb(peringatan)
+
+    def _on_gagal(self, pesan):
+        self._tutup("gagal", pesan)
+
+    def _on_ditolak(self, judul, pesan):
+        self._tutup("ditolak", judul, pesan)
+
+    def _on_dibatalkan(self):
+        self._tutup("dibatalkan")
+
+
+class ImportProgressOverlay(PenerimaJob, QWidget):
+    """Overlay progres khas NexVo (oranye) dengan tombol Batal menutupi seluruh jendela."""
+
+    TEKS_BATAL = "Membatalkan import..."
+    ATRIBUT_AKTIF = "_import_aktif"   # atribut parent yang menandai job aktif (satu per jendela)
+
+    def __init__(self, parent, judul="Mengimpor data CSV..."):
+        super().__init__(parent)
+        self._pemilik = parent
+        self.setGeometry(0, 0, parent.width(), parent.height())
+        self.setStyleSheet("background-color: rgba(255,255,255,230);")
+
+        lay = QVBoxLayout(self)
+        lay.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.lbl_status = QLabel(judul)
+        self.lbl_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_status.setStyleSheet("color: black; font-size: 13pt; font-weight: 600;")
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedWidth(int(parent.width() * 0.4))
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                background-color: #e0e0e0;
+                border: 1px solid #999;
+                border-radius: 10px;
+                text-align: center;
+                height: 24px;
+                color: black;
+                font-weight: bold;
+            }
+            QProgressBar::chunk {
+                background-color: #ff6600;
+                border-radius: 10px;
+            }
+        """)
+
+        self.btn_batal = QPushButton("Batal")
+        self.btn_batal.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_batal.setFixedWidth(120)
+        self.btn_batal.setStyleSheet("""
+            QPushButton {
+                background-color: #ff6600;
+                color: white;
+                font-weight: bold;
+                border-radius: 6px;
+                padding: 6px;
+            }
+            QPushButton:hover { background-color: #d71d1d; }
+            QPushButton:disabled { background-color: #999999; }
+        """)
+
+        lay.addWidget(self.lbl_status)
+        lay.addSpacing(10)
+        lay.addWidget(self.progress_bar, alignment=Qt.AlignmentFlag.AlignCenter)
+        lay.addSpacing(10)
+        lay.addWidget(self.btn_batal, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        self._job = None
+        self._callbacks = {}
+
+
+def jalankan_import(parent, fungsi, judul="Mengimpor data CSV...", pasca=None,
+                    on_selesai=None, on_gagal=None, on_ditolak=None, on_dibatalkan=None,
+                    on_peringatan=None):
+    """
+    Tampilkan overlay progres di atas parent lalu jalankan fungsi(ctx) di QThreadPool global.
+    Hanya satu import aktif per jendela; kembalikan job (None bila masih ada import berjalan).
+    on_peringatan(pesan) dipanggil setelah on_selesai bila pasca gagal (data tetap tersimpan).
+    """
+    if getattr(parent, "_import_aktif", None) is not None:
+        return None
+
+    job = ImportJob(fungsi, pasca=pasca)
+    overlay = ImportProgressOverlay(parent, judul)
+    overlay.pasang(job, on_selesai, on_gagal, on_ditolak, on_dibatalkan, on_peringatan)
+    overlay.show()
+    overlay.raise_()
+
+    parent._import_aktif = job
+    QThreadPool.globalInstance().start(job)
+    return job
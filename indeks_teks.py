@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+indeks_teks.py – Index teks trigram (FTS5) untuk pencarian NAMA / ALAMAT / TMPT_LHR NexVo.
+• fts_<tahapan> adalah tabel FTS5 external-content (tokenize='trigram'): teks tidak disalin,
+  hanya index trigram-nya → LIKE '%x%' dan pencarian mirip menjawab rowid tanpa memindai tabel.
+• Dijaga otomatis oleh trigger INSERT/UPDATE/DELETE pada tabel tahapan (pola sama dengan ringkasan.py).
+• Import massal: trigger dilepas (hapus_trigger_teks), lalu ensure_indeks_teks membangun ulang sekali.
+• SQLite/SQLCipher tanpa FTS5 atau < 3.34 → dilewati; filter tetap jalan lewat LIKE biasa.
+"""
+
+from db_manager import TAHAPAN_TABLES, get_schema_meta, set_schema_meta, sqlite_version_info
+
+# Naikkan bila definisi tabel/trigger berubah → index dibangun ulang otomatis
+INDEKS_TEKS_VERSION = 1
+INDEKS_TEKS_MIN_SQLITE = (3, 34, 0)    # tokenizer trigram
+
+KOLOM_TEKS = ("NAMA", "ALAMAT", "TMPT_LHR")
+
+
+# Awalan tabel FTS & tabel bayangannya (fts_<tbl>_data/_idx/_docsize/_config)
+AWALAN_FTS = "fts_"
+
+
+def nama_fts(tbl):
+    return f"{AWALAN_FTS}{tbl}"
+
+
+def _nama_trigger(tbl):
+    return (f"trg_{tbl}_teks_ins", f"trg_{tbl}_teks_del", f"trg_{tbl}_teks_upd")
+
+
+def fts_didukung(conn):
+    """True bila SQLite cukup baru & modul FTS5 (tokenizer trigram) tersedia di build ini."""
+    if sqlite_version_info(conn) < INDEKS_TEKS_MIN_SQLITE:
+        return False
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.__nv_uji_fts USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.__nv_uji_fts")
+        return True
+    except Exception:
+        return False
+
+
+def _sql_isi(fts, alias, hapus=False):
+    kolom = ", ".join(KOLOM_TEKS)
+    nilai = ", ".join(f"{alias}.{k}" for k in KOLOM_TEKS)
+    if hapus:
+        # External content: entri lama dihapus dengan menyebut ulang nilai yang dulu di-index
+        return f"INSERT INTO {fts} ({fts}, rowid, {kolom}) VALUES ('delete', {alias}.rowid, {nilai});"
+    return f"INSERT INTO {fts} (rowid, {kolom}) VALUES ({alias}.rowid, {nilai});"
+
+
+def _buat_indeks(cur, tbl):
+    fts = nama_fts(tbl)
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {", ".join(KOLOM_TEKS)},
+            content='{tbl}', content_rowid='rowid', tokenize='trigram'
+        )
+    """)
+
+
+def _buat_trigger(cur, tbl):
+    fts = nama_fts(tbl)
+    trg_ins, trg_del, trg_upd = _nama_trigger(tbl)
+    berubah = " OR ".join(f"OLD.{k} IS NOT NEW.{k}" for k in KOLOM_TEKS)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_ins} AFTER INSERT ON {tbl}
+        BEGIN {_sql_isi(fts, "NEW")} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_del} AFTER DELETE ON {tbl}
+        BEGIN {_sql_isi(fts, "OLD", hapus=True)} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_upd} AFTER UPDATE OF {", ".join(KOLOM_TEKS)} ON {tbl}
+        WHEN {berubah}
+        BEGIN {_sql_isi(fts, "OLD", hapus=True)} {_sql_isi(fts, "NEW")} END
+    """)
+
+
+def hapus_trigger_teks(conn, tbl):
+    """Lepas trigger index teks (dipakai saat import massal; bangun ulang setelahnya)."""
+    cur = conn.cursor()
+    for nama in _nama_trigger(tbl):
+        cur.execute(f"DROP TRIGGER IF EXISTS {nama}")
+
+
+def bangun_ulang_indeks_teks(conn, tbl):
+    """Susun ulang index trigram satu tabel tahapan dari isi tabelnya (satu perintah 'rebuild')."""
+    fts = nama_fts(tbl)
+    cur = conn.cursor()
+    _buat_indeks(cur, tbl)
+    cur.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def indeks_teks_tersedia(conn, tbl):
+    """
+    Nama tabel FTS bila index teks tabel ini siap dipakai, selain itu None.
+    Trigger harus lengkap: tanpa trigger (import massal berjalan / terputus) index bisa basi.
+    """
+    nama = (nama_fts(tbl),) + _nama_trigger(tbl)
+    try:
+        ada = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join('?' * len(nama))})", nama
+        ).fetchone()[0]
+    except Exception:
+        return None
+    return nama_fts(tbl) if ada == len(nama) else None
+
+
+def ensure_indeks_teks(conn, tables=TAHAPAN_TABLES):
+    """
+    Pastikan tabel FTS + trigger ada dan sesuai INDEKS_TEKS_VERSION (idempotent).
+    Trigger hilang (DB lama, import terputus) atau versi lama → trigger dibuat ulang
+    dan index disusun ulang dari tabel tahapan.
+    """
+    if not fts_didukung(conn):
+        return []
+    cur = conn.cursor()
+    ada_tabel = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    ada_trigger = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='trigger'").fetchall()}
+
+    dibangun = []
+    for tbl in tables:
+        if tbl not in ada_tabel:
+            continue
+        kunci_meta = f"indeks_teks_{tbl}"
+        try:
+            versi = int(get_schema_meta(conn, kunci_meta, 0) or 0)
+        except (TypeError, ValueError):
+            versi = 0
+        lengkap = nama_fts(tbl) in ada_tabel and all(n in ada_trigger for n in _nama_trigger(tbl))
+        if lengkap and versi >= INDEKS_TEKS_VERSION:
+            continue
+
+        hapus_trigger_teks(conn, tbl)
+        if versi < INDEKS_TEKS_VERSION:
+            # Definisi tabel FTS bisa berubah antar versi → buang & buat ulang
+            cur.execute(f"DROP TABLE IF EXISTS {nama_fts(tbl)}")
+        bangun_ulang_indeks_teks(conn, tbl)
+        _buat_trigger(cur, tbl)
+        set_schema_meta(conn, kunci_meta, INDEKS_TEKS_VERSION)
+        dibangun.append(tbl)
+
+    conn.commit()
+    return dibangun
+
@@ -16,24 +16,10 @@ try:
     USE_GLOBAL_CONN = True
 except ImportError:
     # Jika dijalankan manual (tanpa NexVo)
-    from db_manager import DB_PATH, load_or_create_key
+    from db_manager import DB_PATH, load_or_create_key, terapkan_profil
     USE_GLOBAL_CONN = False
 
 
-def _apply_optim_pragmas(conn):
-    """Terapkan PRAGMA untuk kecepatan maksimum (aman & hasil identik)."""
-    cur = conn.cursor()
-    cur.executescript("""
-        PRAGMA cipher_memory_security = OFF;
-        PRAGMA cipher_page_size = 4096;
-        PRAGMA journal_mode = MEMORY;
-        PRAGMA synchronous = OFF;
-        PRAGMA temp_store = MEMORY;
-        PRAGMA cache_size = 1000000;
-        PRAGMA locking_mode = EXCLUSIVE;
-    """)
-
-
 # ============================================================
 # 🔹 Inisialisasi tabel kecamatan (super cepat kilat)
 # ============================================================
@@ -49,7 +35,9 @@ def init_kecamatan():
 
         @with_safe_db
         def _isi_kecamatan(*, conn=None):
-            _apply_optim_pragmas(conn)
+            _isi_dengan(conn)
+
+        def _isi_dengan(conn):
             cur = conn.cursor()
 
             # --- pastikan tabel ada
@@ -104,7 +92,7 @@ def init_kecamatan():
             print("[WARN] sqlcipher3 tidak ditemukan, fallback ke SQLite biasa.")
 
         try:
-            _apply_optim_pragmas(conn)
+            terapkan_profil(conn)
             cur = conn.cursor()
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS kecamatan (
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+pdf_cache.py – Cache artefak PDF laporan NexVo di disk.
+• Kunci: (laporan, tahapan, TPS, sidik isi) – sidik = hash semua data yang ikut
+  menentukan isi PDF (baris pemilih, data badan adhoc, wilayah, versi template).
+• Data berubah → sidik berubah → TPS itu saja yang dirender ulang; TPS lain dipakai ulang.
+• Satu berkas per (laporan, tahapan, TPS); versi lama langsung ditimpa.
+• Isi berkas dienkripsi AES-GCM (kunci turunan dari kunci database) karena memuat data pribadi.
+Kegagalan cache tidak pernah menggagalkan laporan: ambil() → None, simpan() → False.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+from Crypto.Cipher import AES
+
+APPDATA = Path(os.getenv("APPDATA") or (Path.home() / "AppData" / "Roaming"))
+CACHE_DIR = APPDATA / "NexVo" / "Cache" / "pdf"
+
+# Naikkan versi laporan setiap kali tampilan / isi template PDF-nya diubah
+VERSI_LAPORAN = {
+    "adpp": 1,
+    "arpp": 1,
+    "rekap_pps": 1,
+    "lap_coklit": 1,
+    "berita_acara": 1,
+}
+
+_kunci_aes = None
+
+
+def _kunci():
+    """Kunci AES cache = SHA-256(label || kunci SQLCipher), dihitung sekali per proses."""
+    global _kunci_aes
+    if _kunci_aes is None:
+        from db_manager import load_or_create_key
+        _kunci_aes = hashlib.sha256(b"NexVo-PDF-Cache|" + load_or_create_key()).digest()
+    return _kunci_aes
+
+
+def _nama_aman(teks):
+    return re.sub(r"[^0-9A-Za-z_-]", "_", str(teks if teks not in (None, "") else "ALL"))
+
+
+def _berkas(laporan, tahap, tps):
+    return CACHE_DIR / _nama_aman(laporan) / _nama_aman(tahap) / f"{_nama_aman(tps)}.bin"
+
+
+def sidik(laporan, *bagian):
+    """Hash isi (BLAKE2b) dari versi template laporan + semua bagian data yang dirender."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{laporan}:{VERSI_LAPORAN.get(laporan, 0)}".encode("utf-8"))
+    for b in bagian:
+        if isinstance(b, dict):
+            b = sorted(b.items(), key=lambda kv: str(kv[0]))
+        if isinstance(b, (list, tuple)):
+            h.update(b"[")
+            for item in b:
+                h.update(repr(item).encode("utf-8"))
+                h.update(b"\x1f")
+            h.update(b"]")
+        else:
+            h.update(repr(b).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def ambil(laporan, tahap, tps, kunci_isi):
+    """Bytes PDF bila cache (laporan, tahap, tps) masih sesuai sidik; selain itu None."""
+    path = _berkas(laporan, tahap, tps)
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        nonce, tag, isi = data[:12], data[12:28], data[28:]
+        cipher = AES.new(_kunci(), AES.MODE_GCM, nonce=nonce)
+        cipher.update(kunci_isi.encode("ascii"))  # sidik jadi AAD → sidik beda = verifikasi gagal
+        return cipher.decrypt_and_verify(isi, tag)
+    except Exception:
+        return None
+
+
+def simpan(laporan, tahap, tps, kunci_isi, pdf_bytes):
+    """Tulis atomik (tmp + replace) menimpa versi lama TPS yang sama."""
+    if not pdf_bytes:
+        return False
+    path = _berkas(laporan, tahap, tps)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        nonce = os.urandom(12)
+        cipher = AES.new(_kunci(), AES.MODE_GCM, nonce=nonce)
+        cipher.update(kunci_isi.encode("ascii"))
+        isi, tag = cipher.encrypt_and_digest(pdf_bytes)
+        tmp.write_bytes(nonce + tag + isi)
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        print(f"[PDF CACHE] Gagal simpan {laporan}/{tahap}/{tps}: {e}")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def kosongkan(laporan=None):
+    """Hapus seluruh cache (atau satu jenis laporan), mis. setelah restore database."""
+    global _kunci_aes
+    target = CACHE_DIR / _nama_aman(laporan) if laporan else CACHE_DIR
+    shutil.rmtree(target, ignore_errors=True)
+    if laporan is None:
+        _kunci_aes = None
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+pemilih_store.py – Penyimpanan data pemilih di memori (hemat RAM) untuk NexVo.
+• PemilihRecord : satu baris pemilih berbasis __slots__ (tanpa dict per baris).
+• StringPool    : nilai teks yang sama dipakai bersama → memori ikut jumlah nilai unik,
+                  bukan baris × kolom.
+• Antarmuka mirip dict (get, [], in, keys, items, update) → grid, filter, sortir,
+  dan export tetap membaca record dengan cara yang sama seperti dulu.
+"""
+
+from datetime import datetime
+
+# =========================================================
+# 🧱 KOLOM TABEL TAHAPAN (dphp / dpshp / dpshpa)
+# =========================================================
+KOLOM_PEMILIH = (
+    "checked", "KECAMATAN", "DESA", "DPID", "NKK", "NIK", "NAMA", "JK",
+    "TMPT_LHR", "TGL_LHR", "STS", "ALAMAT", "RT", "RW", "DIS", "KTPel",
+    "SUMBER", "KET", "TPS", "LastUpdate", "CEK_DATA",
+    "NKK_ASAL", "NIK_ASAL", "NAMA_ASAL", "JK_ASAL", "TMPT_LHR_ASAL",
+    "TGL_LHR_ASAL", "STS_ASAL", "ALAMAT_ASAL", "RT_ASAL", "RW_ASAL",
+    "DIS_ASAL", "KTPel_ASAL", "SUMBER_ASAL", "TPS_ASAL",
+)
+
+_SLOT_META = ("rowid", "_warna_font")
+_SLOT_KEYS = frozenset(KOLOM_PEMILIH + _SLOT_META)
+
+
+class StringPool:
+    """Kumpulan string unik: nilai yang sama (TPS, RT, KET, DESA, ...) hanya disimpan sekali."""
+    __slots__ = ("_pool",)
+
+    def __init__(self):
+        self._pool = {}
+
+    def intern(self, val):
+        if val is None:
+            return ""
+        if not isinstance(val, str):
+            val = str(val)
+        return self._pool.setdefault(val, val)
+
+    def __len__(self):
+        return len(self._pool)
+
+
+class PemilihRecord:
+    """
+    Satu baris data pemilih.
+    • Kolom tabel tahapan selalu ada (default "").
+    • rowid / _warna_font hanya 'ada' setelah diisi (semantik sama seperti key dict).
+    • Key lain yang tidak dikenal disimpan di _extra (dibuat hanya bila perlu).
+    """
+    __slots__ = KOLOM_PEMILIH + _SLOT_META + ("_extra",)
+
+    def __init__(self, data=None, **kwargs):
+        for k in KOLOM_PEMILIH:
+            object.__setattr__(self, k, "")
+        self._extra = None
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    # ---------------------------------------------------------
+    # Akses ala dict
+    # ---------------------------------------------------------
+    def __getitem__(self, key):
+        if key in _SLOT_KEYS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _SLOT_KEYS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in KOLOM_PEMILIH:
+            setattr(self, key, "")
+        elif key in _SLOT_META:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in _SLOT_KEYS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, key, *default):
+        try:
+            val = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return val
+
+    def keys(self):
+        keys = list(KOLOM_PEMILIH)
+        keys.extend(k for k in _SLOT_META if hasattr(self, k))
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, "items"):
+            other = other.items()
+        for k, v in other:
+            self[k] = v
+        for k, v in kwargs.items():
+            self[k] = v
+
+    def copy(self):
+        """Salinan sebagai dict biasa (untuk dialog/ekspor yang butuh dict)."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"PemilihRecord(rowid={self.get('rowid')!r}, DPID={self.DPID!r}, NAMA={self.NAMA!r})"
+
+
+# =========================================================
+# 🏭 BUILDER DARI CURSOR DATABASE
+# =========================================================
+def iter_records(rows, col_names, pool=None, formatters=None):
+    """
+    Hasilkan PemilihRecord satu per satu dari baris hasil query (streaming).
+    • rows       : iterable tuple / sqlite Row (indeks angka).
+    • col_names  : nama kolom sesuai cur.description (boleh memuat "rowid").
+    • pool       : StringPool bersama (dibuat baru bila None).
+    • formatters : {nama_kolom: fungsi(str) -> str} untuk normalisasi tampilan
+                   (hasil di-cache per nilai unik).
+    None → "" dan semua nilai kolom disimpan sebagai str, sama seperti list-of-dict lama.
+    """
+    if pool is None:
+        pool = StringPool()
+    intern = pool.intern
+    formatters = formatters or {}
+
+    plan = []          # (index, nama_kolom, slot?, cache_formatter, formatter)
+    rowid_idx = -1
+    for i, name in enumerate(col_names):
+        if name == "rowid":
+            rowid_idx = i
+            continue
+        fmt = formatters.get(name)
+        plan.append((i, name, name in _SLOT_KEYS, {} if fmt else None, fmt))
+
+    # Kolom yang tidak ada di hasil query tetap diisi "" (semantik kolom selalu ada)
+    diisi = {name for _, name, _, _, _ in plan}
+    kolom_kosong = [k for k in KOLOM_PEMILIH if k not in diisi]
+
+    new = PemilihRecord.__new__
+    setslot = object.__setattr__
+
+    for r in rows:
+        rec = new(PemilihRecord)
+        setslot(rec, "_extra", None)
+        for k in kolom_kosong:
+            setslot(rec, k, "")
+        for i, name, is_slot, cache, fmt in plan:
+            val = r[i]
+            if val is None or val == "":
+                val = ""
+            elif fmt is not None:
+                key = val
+                val = cache.get(key)
+                if val is None:
+                    val = cache[key] = intern(fmt(str(key)))
+            else:
+                val = intern(val)
+            if is_slot:
+                setslot(rec, name, val)
+            else:
+                rec[name] = val
+        if rowid_idx != -1:
+            setslot(rec, "rowid", r[rowid_idx])
+        yield rec
+
+
+def records_from_rows(rows, col_names, pool=None, formatters=None):
+    """Bangun list PemilihRecord dari baris hasil query (lihat iter_records)."""
+    return list(iter_records(rows, col_names, pool=pool, formatters=formatters))
+
+
+def records_from_cursor(cur, pool=None, formatters=None):
+    """Jalankan fetchall() lalu bangun PemilihRecord (cur sudah di-execute)."""
+    col_names = [d[0] for d in cur.description]
+    return records_from_rows(cur.fetchall(), col_names, pool=pool, formatters=formatters)
+
+
+# =========================================================
+# 📅 FORMAT TANGGAL TAMPILAN
+# =========================================================
+def format_tgl_tampil(val):
+    """Ubah 'YYYY-mm-dd[ HH:MM:SS]' / 'dd/mm/YYYY' → 'dd/mm/YYYY' (nilai lain dikembalikan apa adanya)."""
+    if not val:
+        return ""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(val, fmt).strftime("%d/%m/%Y")
+        except Exception:
+            continue
+    return val
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+print_job.py – Jalur cetak PDF NexVo di latar belakang (QThreadPool + QRunnable).
+• CetakJob        : muat PDF → gambar halaman demi halaman ke QPrinter di thread worker
+                    (QPainter pada QPrinter boleh dipakai di luar thread GUI).
+• Render per pita : tiap halaman dirender PDFium dalam pita setinggi TINGGI_PITA piksel,
+                    bukan satu QImage utuh 600 DPI (± 140 MB per halaman A4 landscape).
+• jalankan_cetak  : tampilkan overlay progres per halaman (dengan tombol Batal) lalu jalankan job.
+Dialog printer tetap di thread GUI; hanya proses render + kirim ke printer yang dipindah.
+"""
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QRect, QRectF, QRunnable, QSize, QThreadPool
+from PyQt6.QtGui import QPainter
+from PyQt6.QtPdf import QPdfDocument, QPdfDocumentRenderOptions
+from PyQt6.QtPrintSupport import QPrinter
+
+from import_worker import ImportContext, ImportDibatalkan, ImportProgressOverlay, ImportSignals
+
+# Tinggi satu pita render (piksel printer); 512 baris × lebar A4 600 DPI ≈ 14 MB
+TINGGI_PITA = 512
+
+
+def sumber_tunggal(label, pdf_bytes):
+    """Sumber cetak untuk satu dokumen yang sudah ada (mis. PDF yang sedang tampil)."""
+    return lambda batal: [(label, bytes(pdf_bytes))]
+
+
+def bytes_buffer(buf):
+    """Isi QBuffer PDF aktif jendela laporan sebagai bytes (None bila kosong)."""
+    if buf is None:
+        return None
+    data = bytes(buf.data())
+    return data or None
+
+
+# =========================================================
+# 🧵 JOB
+# =========================================================
+class CetakJob(QRunnable):
+    """
+    Cetak semua dokumen dari sumber(batal) ke printer dalam satu job printer.
+    • sumber(batal) → iterable (label, pdf_bytes); boleh generator yang merender sambil jalan.
+    • jumlah        : perkiraan jumlah dokumen (untuk persentase); None = satu dokumen.
+    • Batal → printer.abort() → tidak ada halaman setengah jadi yang terkirim.
+    Hasil selesai: (jumlah_dokumen, jumlah_halaman).
+    """
+
+    def __init__(self, printer, sumber, jumlah=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.printer = printer
+        self.sumber = sumber
+        self.jumlah = max(1, jumlah or 1)
+        self.signals = ImportSignals()
+        self.ctx = ImportContext(self.signals)
+
+    def run(self):
+        painter = QPainter()
+        aktif = False
+        it = None
+        sinyal, args = self.signals.selesai, ()
+        try:
+            if not painter.begin(self.printer):
+                raise RuntimeError("Tidak dapat memulai printer.")
+            aktif = True
+
+            dokumen = halaman = 0
+            it = iter(self.sumber(lambda: self.ctx.sudah_batal))
+            for label, pdf_bytes in it:
+                self.ctx.cek_batal()
+                dokumen += 1
+                halaman = self._cetak_dokumen(painter, label, pdf_bytes, dokumen, halaman)
+            self.ctx.cek_batal()
+
+            aktif = False
+            painter.end()
+            args = ((dokumen, halaman),)
+        except ImportDibatalkan:
+            sinyal = self.signals.dibatalkan
+        except Exception as e:
+            if self.ctx.sudah_batal:
+                sinyal = self.signals.dibatalkan
+            else:
+                sinyal, args = self.signals.gagal, (str(e),)
+        finally:
+            tutup = getattr(it, "close", None)
+            if tutup is not None:
+                tutup()
+            if aktif:
+                self.printer.abort()
+                painter.end()
+        sinyal.emit(*args)
+
+    def _cetak_dokumen(self, painter, label, pdf_bytes, no_dokumen, halaman):
+        """Cetak semua halaman satu PDF; kembalikan total halaman tercetak sejauh ini."""
+        buf = QBuffer()
+        buf.setData(QByteArray(pdf_bytes))
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+
+        doc = QPdfDocument()
+        try:
+            doc.load(buf)
+            total = doc.pageCount()
+            for p in range(total):
+                self.ctx.cek_batal()
+                pdf_sz = doc.pagePointSize(p)
+                if not pdf_sz.isValid():
+                    continue
+                # halaman baru hanya SEBELUM halaman berikutnya → tanpa lembar kosong di akhir
+                if halaman:
+                    self.printer.newPage()
+                self._cetak_halaman(painter, doc, p, pdf_sz)
+                halaman += 1
+
+                pct = ((no_dokumen - 1) + (p + 1) / total) * 100 / self.jumlah
+                self.ctx.progress(pct, f"Mencetak {label} – halaman {p + 1}/{total}")
+        finally:
+            doc.close()
+            buf.close()
+        return halaman
+
+    def _cetak_halaman(self, painter, doc, p, pdf_sz):
+        """Fit-to-page di tengah area cetak; halaman dirender & digambar per pita."""
+        page_rect = self.printer.pageRect(QPrinter.Unit.Point)
+        scale_dpi = self.printer.resolution() / 72
+
+        area_w = page_rect.width() * scale_dpi
+        area_h = page_rect.height() * scale_dpi
+        scale = min(area_w / (pdf_sz.width() * scale_dpi), area_h / (pdf_sz.height() * scale_dpi))
+        target_w = int(pdf_sz.width() * scale_dpi * scale)
+        target_h = int(pdf_sz.height() * scale_dpi * scale)
+        off_x = int((area_w - target_w) / 2)
+        off_y = int((area_h - target_h) / 2)
+
+        opsi = QPdfDocumentRenderOptions()
+        opsi.setScaledSize(QSize(target_w, target_h))
+        y = 0
+        while y < target_h:
+            self.ctx.cek_batal()
+            tinggi = min(TINGGI_PITA, target_h - y)
+            opsi.setScaledClipRect(QRect(0, y, target_w, tinggi))
+            img = doc.render(p, QSize(target_w, tinggi), opsi)
+            if not img.isNull():
+                painter.drawImage(QRectF(off_x, off_y + y, target_w, tinggi), img)
+            y += tinggi
+
+
+# =========================================================
+# 🪟 OVERLAY & PEMICU
+# =========================================================
+class CetakProgressOverlay(ImportProgressOverlay):
+    """Overlay progres cetak (gaya sama dengan import)."""
+
+    TEKS_BATAL = "Membatalkan cetak..."
+    ATRIBUT_AKTIF = "_cetak_aktif"
+
+
+def jalankan_cetak(parent, printer, sumber, judul="Mencetak dokumen...", jumlah=None,
+                   on_selesai=None, on_gagal=None, on_dibatalkan=None):
+    """
+    Tampilkan overlay progres di atas parent lalu cetak sumber(batal) di QThreadPool global.
+    Hanya satu cetak aktif per jendela; kembalikan job (None bila masih ada cetak berjalan).
+    """
+    if getattr(parent, "_cetak_aktif", None) is not None:
+        return None
+
+    job = CetakJob(printer, sumber, jumlah=jumlah)
+    overlay = CetakProgressOverlay(parent, judul)
+    overlay.pasang(job, on_selesai=on_selesai, on_gagal=on_gagal, on_dibatalkan=on_dibatalkan)
+    overlay.show()
+    overlay.raise_()
+
+    parent._cetak_aktif = job
+    QThreadPool.globalInstance().start(job)
+    return job
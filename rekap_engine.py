@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+rekap_engine.py – Mesin rekap per TPS NexVo berbasis himpunan (GROUP BY).
+• Satu query agregat per tabel rekap (bukan COUNT per TPS per kolom).
+• Hasil ditulis sekaligus dengan executemany.
+• Daftar TPS, urutan, dan nama "TPS 001" identik dengan rekap lama.
+"""
+
+from ringkasan import ensure_ringkasan
+
+KET_TMS = "('1','2','3','4','5','6','7','8')"
+
+_SKEMA_KK_LP = """
+    "NAMA TPS" TEXT,
+    "JUMLAH KK" INTEGER,
+    "LAKI-LAKI" INTEGER,
+    "PEREMPUAN" INTEGER,
+    "JUMLAH" INTEGER
+"""
+
+_SKEMA_SARING = """
+    "NAMA TPS" TEXT,
+    "1L" INTEGER, "1P" INTEGER,
+    "2L" INTEGER, "2P" INTEGER,
+    "3L" INTEGER, "3P" INTEGER,
+    "4L" INTEGER, "4P" INTEGER,
+    "5L" INTEGER, "5P" INTEGER,
+    "6L" INTEGER, "6P" INTEGER,
+    "7L" INTEGER, "7P" INTEGER,
+    "8L" INTEGER, "8P" INTEGER,
+    "TMS L" INTEGER, "TMS P" INTEGER,
+    "JUMLAH" INTEGER
+"""
+
+_SKEMA_DIFABEL = """
+    "NAMA TPS" TEXT,
+    "JUMLAH KK" INTEGER,
+    "FISIK" INTEGER,
+    "INTELEKTUAL" INTEGER,
+    "MENTAL" INTEGER,
+    "DIF. WICARA" INTEGER,
+    "DIF. RUNGU" INTEGER,
+    "DIF. NETRA" INTEGER,
+    "JUMLAH" INTEGER
+"""
+
+# =========================================================
+# 📋 DEFINISI REKAP
+# =========================================================
+# Rekap "KK + L/P": kondisi baris (SQL, {tbl} = tabel tahapan aktif)
+REKAP_KK_LP = {
+    "rekap_sesuai": "COALESCE(KET,'') = '0'",
+    "rekap":        f"COALESCE(KET,'') NOT IN {KET_TMS}",
+    "baru":         "COALESCE(KET,'') IN ('B')",
+    "pemula":       "LOWER(COALESCE(KET,'')) = 'b' AND NIK IN (SELECT NIK FROM nik_unik)",
+    "barukode8":    "LOWER(COALESCE(KET,'')) = 'b' AND NIK IN (SELECT NIK FROM nik_ganda)",
+    "ubah":         "COALESCE(KET,'') IN ('U')",
+    "ktpel":        f"LOWER(COALESCE(KTPel,''))='b' AND COALESCE(KET,'') NOT IN {KET_TMS}",
+    "ubah_kelamin": "COALESCE(KET,'')='U' AND JK<>JK_ASAL",
+}
+
+# Rekap perubahan TPS: dikelompokkan menurut kolom TPS tertentu
+REKAP_UBAH_TPS = {
+    "ubah_tps_masuk":  "TPS",
+    "ubah_tps_keluar": "TPS_ASAL",
+}
+_KONDISI_UBAH_TPS = "LOWER(COALESCE(KET,''))='u' AND TPS<>TPS_ASAL"
+
+SEMUA_REKAP = tuple(REKAP_KK_LP) + ("saring", "difabel") + tuple(REKAP_UBAH_TPS)
+
+
+def _nama_tps(tps):
+    return f"TPS {int(tps):03d}"
+
+
+def _siapkan_tabel(cur, nama, skema):
+    cur.execute(f'CREATE TABLE IF NOT EXISTS {nama} ({skema})')
+    cur.execute(f"DELETE FROM {nama}")
+
+
+def _cte(tbl_name, kondisi):
+    """CTE NIK unik/ganda hanya disertakan bila kondisi memerlukannya (dievaluasi sekali)."""
+    parts = []
+    if "nik_unik" in kondisi:
+        parts.append(f"nik_unik AS (SELECT NIK FROM {tbl_name} GROUP BY NIK HAVING COUNT(*) = 1)")
+    if "nik_ganda" in kondisi:
+        parts.append(f"nik_ganda AS (SELECT NIK FROM {tbl_name} GROUP BY NIK HAVING COUNT(*) > 1)")
+    return ("WITH " + ", ".join(parts) + " ") if parts else ""
+
+
+def _rekap_kk_lp(cur, tbl_name, kondisi, kolom_tps="TPS"):
+    """Satu query: KK distinct, L, P per TPS (TPS tanpa data tetap muncul dengan 0)."""
+    cur.execute(f"""
+        {_cte(tbl_name, kondisi)}
+        SELECT {kolom_tps},
+               COUNT(DISTINCT CASE WHEN {kondisi} THEN NKK END),
+               COALESCE(SUM(CASE WHEN ({kondisi}) AND JK='L' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN ({kondisi}) AND JK='P' THEN 1 ELSE 0 END), 0)
+        FROM {tbl_name}
+        WHERE TRIM({kolom_tps}) <> ''
+        GROUP BY {kolom_tps}
+        ORDER BY CAST({kolom_tps} AS INTEGER)
+    """)
+    return [
+        (_nama_tps(tps), nkk or 0, jml_l or 0, jml_p or 0, (jml_l or 0) + (jml_p or 0))
+        for tps, nkk, jml_l, jml_p in cur.fetchall()
+    ]
+
+
+def _rekap_saring(cur, tbl_name):
+    """
+    L/P per KET 1–8 + total TMS per TPS.
+    Tidak butuh NKK → dibaca dari ringkasan_pemilih (O(#TPS × kombinasi), bukan O(#pemilih)).
+    """
+    kolom = ",\n".join(
+        f"SUM(jumlah * (COALESCE(KET,'')='{ket}' AND JK='{jk}'))"
+        for ket in range(1, 9) for jk in ("L", "P")
+    )
+    cur.execute(f"""
+        SELECT TPS,
+               {kolom},
+               SUM(jumlah * (COALESCE(KET,'') IN {KET_TMS} AND JK='L')),
+               SUM(jumlah * (COALESCE(KET,'') IN {KET_TMS} AND JK='P'))
+        FROM ringkasan_pemilih
+        WHERE tahapan = ? AND TRIM(TPS) <> ''
+        GROUP BY TPS
+        ORDER BY CAST(TPS AS INTEGER)
+    """, (tbl_name,))
+    hasil = []
+    for r in cur.fetchall():
+        angka = [v or 0 for v in r[1:]]
+        tms_l, tms_p = angka[-2], angka[-1]
+        hasil.append((_nama_tps(r[0]), *angka, tms_l + tms_p))
+    return hasil
+
+
+def _rekap_difabel(cur, tbl_name):
+    """Satu query: KK difabel + jumlah per jenis disabilitas (DIS 1–6) per TPS."""
+    aktif = f"COALESCE(KET,'') NOT IN {KET_TMS}"
+    kolom = ",\n".join(f"SUM(COALESCE(DIS,'')='{kode}' AND {aktif})" for kode in range(1, 7))
+    cur.execute(f"""
+        SELECT TPS,
+               COUNT(DISTINCT CASE WHEN COALESCE(DIS,'') IN ('1','2','3','4','5','6') AND {aktif} THEN NKK END),
+               {kolom}
+        FROM {tbl_name}
+        WHERE TRIM(TPS) <> ''
+        GROUP BY TPS
+        ORDER BY CAST(TPS AS INTEGER)
+    """)
+    hasil = []
+    for r in cur.fetchall():
+        jenis = [v or 0 for v in r[2:]]
+        hasil.append((_nama_tps(r[0]), r[1] or 0, *jenis, sum(jenis)))
+    return hasil
+
+
+# =========================================================
+# 🚀 API
+# =========================================================
+def isi_rekap(conn, tbl_name, nama):
+    """Hitung ulang satu tabel rekap dari tabel tahapan tbl_name. Kembalikan jumlah baris TPS."""
+    cur = conn.cursor()
+
+    if nama in REKAP_KK_LP:
+        baris = _rekap_kk_lp(cur, tbl_name, REKAP_KK_LP[nama])
+        skema = _SKEMA_KK_LP
+    elif nama in REKAP_UBAH_TPS:
+        baris = _rekap_kk_lp(cur, tbl_name, _KONDISI_UBAH_TPS, kolom_tps=REKAP_UBAH_TPS[nama])
+        skema = _SKEMA_KK_LP
+    elif nama == "saring":
+        ensure_ringkasan(conn, (tbl_name,))
+        baris = _rekap_saring(cur, tbl_name)
+        skema = _SKEMA_SARING
+    elif nama == "difabel":
+        baris = _rekap_difabel(cur, tbl_name)
+        skema = _SKEMA_DIFABEL
+    else:
+        raise ValueError(f"Rekap tidak dikenal: {nama}")
+
+    _siapkan_tabel(cur, nama, skema)
+    if baris:
+        placeholders = ", ".join("?" * len(baris[0]))
+        cur.executemany(f"INSERT INTO {nama} VALUES ({placeholders})", baris)
+    return len(baris)
+
+
+def isi_semua_rekap(conn, tbl_name, daftar=SEMUA_REKAP):
+    """Hitung ulang beberapa tabel rekap sekaligus (satu commit)."""
+    hasil = {nama: isi_rekap(conn, tbl_name, nama) for nama in daftar}
+    conn.commit()
+    return hasil
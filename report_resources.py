@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+report_resources.py – Sumber daya ReportLab bersama untuk semua laporan PDF NexVo.
+• font_laporan / daftarkan_font : TTF diparse & diregistrasi sekali per proses (bukan tiap jendela dibuka).
+• gaya / lembar_gaya            : ParagraphStyle & stylesheet di-cache, dipakai ulang antar build / antar TPS.
+• logo_kpu                      : KPU.png didekode sekali (ImageReader bersama) untuk semua flowable logo.
+• BULAN_ID, HARI_ID, format_tanggal_indonesia : format tanggal Indonesia tanpa locale.
+• KanvasNomorHalaman / kanvas_nomor_halaman   : canvas footer 'Hal X dari Y' untuk semua laporan.
+Semua dibuat malas (saat pertama dipakai) dan aman dipanggil dari proses worker render.
+"""
+
+import os
+import threading
+from datetime import datetime
+from functools import partial
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Image as RLImage
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_DIR = os.path.join(BASE_DIR, "Fonts")
+LOGO_KPU = os.path.join(BASE_DIR, "KPU.png")
+
+# keluarga → ((nama regular, berkas), (nama bold, berkas)) di folder Fonts
+FONT_LAPORAN = {
+    "arial": (("ARIAL", "ARIAL.ttf"), ("ARIALBD", "ARIALBD.ttf")),
+    "calibri": (("calibri-regular", "calibri-regular.ttf"), ("calibri-bold", "calibri-bold.ttf")),
+}
+FONT_CADANGAN = ("Helvetica", "Helvetica-Bold")
+
+BULAN_ID = {
+    1: "Januari", 2: "Februari", 3: "Maret", 4: "April",
+    5: "Mei", 6: "Juni", 7: "Juli", 8: "Agustus",
+    9: "September", 10: "Oktober", 11: "November", 12: "Desember",
+}
+
+HARI_ID = {
+    0: "Senin", 1: "Selasa", 2: "Rabu", 3: "Kamis",
+    4: "Jumat", 5: "Sabtu", 6: "Minggu",
+}
+
+_kunci = threading.Lock()
+_font_terdaftar = {}
+_gaya = {}
+_lembar_gaya = {}
+_logo = []
+
+
+def format_tanggal_indonesia(tanggal_str, format_asal="%Y-%m-%d"):
+    """Konversi '2025-12-02' -> '2 Desember 2025' (tanpa locale, aman di Windows)."""
+    if not tanggal_str or not isinstance(tanggal_str, str):
+        return "..................."
+    try:
+        tgl = datetime.strptime(tanggal_str, format_asal)
+        return f"{tgl.day} {BULAN_ID[tgl.month]} {tgl.year}"
+    except Exception as e:
+        print(f"[Warning] format_tanggal_indonesia gagal: {e}")
+        return str(tanggal_str)
+
+
+# =========================================================
+# 🔤 FONT
+# =========================================================
+def daftarkan_font(nama, berkas):
+    """
+    Registrasi satu TTF sekali per proses → True bila tersedia.
+    Berkas dicari di folder Fonts aplikasi, lalu di search path ReportLab (font sistem).
+    """
+    with _kunci:
+        if nama not in _font_terdaftar:
+            berhasil = False
+            for path in (os.path.join(FONT_DIR, berkas), berkas):
+                try:
+                    pdfmetrics.registerFont(TTFont(nama, path))
+                    berhasil = True
+                    break
+                except Exception:
+                    continue
+            _font_terdaftar[nama] = berhasil
+        return _font_terdaftar[nama]
+
+
+def font_laporan(keluarga):
+    """(font_base, font_bold) untuk keluarga FONT_LAPORAN; fallback Helvetica bila TTF tidak ada."""
+    (base, berkas_base), (bold, berkas_bold) = FONT_LAPORAN[keluarga]
+    if daftarkan_font(base, berkas_base) and daftarkan_font(bold, berkas_bold):
+        return base, bold
+    return FONT_CADANGAN
+
+
+# =========================================================
+# 🎨 GAYA
+# =========================================================
+def gaya(nama, **atribut):
+    """ParagraphStyle yang di-cache per (nama, atribut); jangan diubah setelah diambil."""
+    kunci = (nama, tuple(sorted((k, repr(v)) for k, v in atribut.items())))
+    style = _gaya.get(kunci)
+    if style is None:
+        style = _gaya.setdefault(kunci, ParagraphStyle(nama, **atribut))
+    return style
+
+
+def lembar_gaya(kunci, pembuat):
+    """Stylesheet (hasil pembuat()) di-cache per kunci, mis. ('adpp', font_base, font_bold)."""
+    styles = _lembar_gaya.get(kunci)
+    if styles is None:
+        styles = _lembar_gaya.setdefault(kunci, pembuat())
+    return styles
+
+
+# =========================================================
+# 🖼️ LOGO
+# =========================================================
+def _reader_logo():
+    with _kunci:
+        if not _logo:
+            reader = None
+            if os.path.exists(LOGO_KPU):
+                try:
+                    from reportlab.lib.utils import ImageReader
+                    reader = ImageReader(LOGO_KPU)
+                    reader.getRGBData()  # dekode PNG sekarang, bukan di tiap halaman
+                except Exception as e:
+                    print(f"[Logo Warning] Tidak dapat memuat logo: {e}")
+                    reader = None
+            _logo.append(reader)
+        return _logo[0]
+
+
+def logo_kpu(lebar, tinggi):
+    """Flowable logo KPU berukuran tetap, atau None bila KPU.png tidak tersedia."""
+    reader = _reader_logo()
+    if reader is None:
+        return None
+    logo = RLImage(LOGO_KPU, width=lebar, height=tinggi)
+    logo._img = reader  # pakai ImageReader bersama → PNG tidak dibaca & didekode ulang
+    return logo
+
+
+# =========================================================
+# 📄 FOOTER NOMOR HALAMAN
+# =========================================================
+class KanvasNomorHalaman(Canvas):
+    """Canvas dengan footer tengah 'Hal X dari Y' (total halaman baru diketahui saat save)."""
+
+    def __init__(self, *args, font_name="Helvetica", font_size=10, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        self._saved_page_states = []
+        self._font_footer = font_name
+        self._ukuran_footer = font_size
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total = len(self._saved_page_states)
+        for state in self._saved_page_states:
+            self.__dict__.update(state)
+            self.setFont(self._font_footer, self._ukuran_footer)
+            # Tengah halaman yang sedang dipakai (A4 tegak / landscape)
+            self.drawCentredString(self._pagesize[0] / 2.0, 1 * cm, f"Hal {self._pageNumber} dari {total}")
+            Canvas.showPage(self)
+        Canvas.save(self)
+
+
+def kanvas_nomor_halaman(font_name="Helvetica", font_size=10):
+    """canvasmaker untuk doc.build(..., canvasmaker=...) dengan font footer tertentu."""
+    return partial(KanvasNomorHalaman, font_name=font_name, font_size=font_size)
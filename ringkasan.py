@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+ringkasan.py – Tabel ringkasan pemilih (materialized counter) untuk dashboard & rekap NexVo.
+• ringkasan_pemilih menyimpan jumlah baris per (tahapan, TPS, KET, JK, DIS, KTPel).
+• Dijaga otomatis oleh trigger INSERT/UPDATE/DELETE pada tabel tahapan → semua jalur tulis
+  (set status, hapus, aktifkan, import, unggah reguler) ikut memperbarui tanpa kode tambahan.
+• Dashboard cukup membaca O(#TPS × kombinasi) baris, bukan O(#pemilih).
+"""
+
+from contextlib import contextmanager
+
+from db_manager import TAHAPAN_TABLES, get_schema_meta, set_schema_meta
+
+# Naikkan bila definisi tabel/trigger berubah → ringkasan dibangun ulang otomatis
+RINGKASAN_VERSION = 1
+
+KOLOM_KUNCI = ("TPS", "KET", "JK", "DIS", "KTPel")
+
+
+def _cocok(alias):
+    """Kondisi WHERE yang NULL-safe (IS) untuk baris ringkasan milik OLD/NEW."""
+    return " AND ".join(f"{k} IS {alias}.{k}" for k in KOLOM_KUNCI)
+
+
+def _nama_trigger(tbl):
+    return (f"trg_{tbl}_ringkasan_ins", f"trg_{tbl}_ringkasan_del", f"trg_{tbl}_ringkasan_upd")
+
+
+def _sql_tambah(tbl, alias):
+    kolom = ", ".join(KOLOM_KUNCI)
+    nilai = ", ".join(f"{alias}.{k}" for k in KOLOM_KUNCI)
+    return f"""
+        INSERT INTO ringkasan_pemilih (tahapan, {kolom}, jumlah)
+        SELECT '{tbl}', {nilai}, 0
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ringkasan_pemilih WHERE tahapan = '{tbl}' AND {_cocok(alias)}
+        );
+        UPDATE ringkasan_pemilih SET jumlah = jumlah + 1
+        WHERE tahapan = '{tbl}' AND {_cocok(alias)};
+    """
+
+
+def _sql_kurang(tbl, alias):
+    return f"""
+        UPDATE ringkasan_pemilih SET jumlah = jumlah - 1
+        WHERE tahapan = '{tbl}' AND {_cocok(alias)};
+        DELETE FROM ringkasan_pemilih
+        WHERE tahapan = '{tbl}' AND {_cocok(alias)} AND jumlah <= 0;
+    """
+
+
+def _buat_tabel(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ringkasan_pemilih (
+            tahapan TEXT NOT NULL,
+            TPS TEXT,
+            KET TEXT,
+            JK TEXT,
+            DIS TEXT,
+            KTPel TEXT,
+            jumlah INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ringkasan_pemilih_kunci
+        ON ringkasan_pemilih (tahapan, TPS, KET, JK, DIS, KTPel)
+    """)
+
+
+def _buat_trigger(cur, tbl):
+    trg_ins, trg_del, trg_upd = _nama_trigger(tbl)
+    berubah = " OR ".join(f"OLD.{k} IS NOT NEW.{k}" for k in KOLOM_KUNCI)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_ins} AFTER INSERT ON {tbl}
+        BEGIN {_sql_tambah(tbl, "NEW")} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_del} AFTER DELETE ON {tbl}
+        BEGIN {_sql_kurang(tbl, "OLD")} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trg_upd} AFTER UPDATE OF {", ".join(KOLOM_KUNCI)} ON {tbl}
+        WHEN {berubah}
+        BEGIN {_sql_kurang(tbl, "OLD")} {_sql_tambah(tbl, "NEW")} END
+    """)
+
+
+def hapus_trigger(conn, tbl):
+    """Lepas trigger ringkasan (dipakai saat import massal; bangun ulang setelahnya)."""
+    cur = conn.cursor()
+    for nama in _nama_trigger(tbl):
+        cur.execute(f"DROP TRIGGER IF EXISTS {nama}")
+
+
+def bangun_ulang_ringkasan(conn, tbl):
+    """Hitung ulang ringkasan satu tabel tahapan dari nol (satu GROUP BY)."""
+    cur = conn.cursor()
+    _buat_tabel(cur)
+    kolom = ", ".join(KOLOM_KUNCI)
+    cur.execute("DELETE FROM ringkasan_pemilih WHERE tahapan = ?", (tbl,))
+    cur.execute(f"""
+        INSERT INTO ringkasan_pemilih (tahapan, {kolom}, jumlah)
+        SELECT ?, {kolom}, COUNT(*) FROM {tbl} GROUP BY {kolom}
+    """, (tbl,))
+
+
+def ensure_ringkasan(conn, tables=TAHAPAN_TABLES):
+    """
+    Pastikan tabel ringkasan + trigger ada dan sesuai RINGKASAN_VERSION (idempotent).
+    Trigger hilang (DB lama, restore backup lama, import terputus) atau versi lama
+    → trigger dibuat ulang dan ringkasan dihitung ulang dari tabel tahapan.
+    """
+    cur = conn.cursor()
+    _buat_tabel(cur)
+
+    ada_tabel = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    ada_trigger = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='trigger'").fetchall()}
+
+    dibangun = []
+    for tbl in tables:
+        if tbl not in ada_tabel:
+            continue
+        kunci_meta = f"ringkasan_{tbl}"
+        try:
+            versi = int(get_schema_meta(conn, kunci_meta, 0) or 0)
+        except (TypeError, ValueError):
+            versi = 0
+        lengkap = all(n in ada_trigger for n in _nama_trigger(tbl))
+        if lengkap and versi >= RINGKASAN_VERSION:
+            continue
+
+        hapus_trigger(conn, tbl)
+        _buat_trigger(cur, tbl)
+        bangun_ulang_ringkasan(conn, tbl)
+        set_schema_meta(conn, kunci_meta, RINGKASAN_VERSION)
+        dibangun.append(tbl)
+
+    conn.commit()
+    return dibangun
+
+
+@contextmanager
+def ringkasan_ditunda(conn, tbl):
+    """
+    Tunda pemeliharaan ringkasan selama penulisan massal (import/replace seluruh tabel):
+    trigger dilepas, lalu ringkasan dihitung ulang sekali di akhir.
+    """
+    hapus_trigger(conn, tbl)
+    try:
+        yield
+    finally:
+        # Trigger hilang → ensure_ringkasan memasang ulang & menghitung ulang
+        ensure_ringkasan(conn, (tbl,))
+
+
+# =========================================================
+# 📊 STATISTIK DASHBOARD
+# =========================================================
+_KET_LABEL = {
+    1: "MENINGGAL", 2: "GANDA", 3: "DI BAWAH UMUR", 4: "PINDAH DOMISILI",
+    5: "WNA", 6: "TNI", 7: "POLRI", 8: "SALAH TPS",
+}
+
+
+def statistik_dashboard(conn, tbl):
+    """
+    Angka dashboard dari ringkasan_pemilih (satu query).
+    Semantik identik dengan COUNT(*) lama pada tabel tahapan (CAST(KET AS INTEGER), KET B/U, JK L/P).
+    """
+    cur = conn.cursor()
+    aktif = "CAST(KET AS INTEGER) NOT IN (1,2,3,4,5,6,7,8)"
+    per_ket = ",\n".join(
+        f"SUM(CASE WHEN CAST(KET AS INTEGER)={k} THEN jumlah ELSE 0 END)" for k in _KET_LABEL
+    )
+    cur.execute(f"""
+        SELECT
+            SUM(CASE WHEN {aktif} THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN {aktif} AND JK='L' THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN {aktif} AND JK='P' THEN jumlah ELSE 0 END),
+            COUNT(DISTINCT CASE WHEN {aktif} THEN TPS END),
+            {per_ket},
+            SUM(CASE WHEN CAST(KET AS INTEGER) BETWEEN 1 AND 8 THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('B','b') AND JK IN ('L','l') THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('B','b') AND JK IN ('P','p') THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('B','b') THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('U','u') AND JK IN ('L','l') THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('U','u') AND JK IN ('P','p') THEN jumlah ELSE 0 END),
+            SUM(CASE WHEN KET IN ('U','u') THEN jumlah ELSE 0 END)
+        FROM ringkasan_pemilih
+        WHERE tahapan = ?
+    """, (tbl,))
+    r = [v or 0 for v in cur.fetchone()]
+    total, laki, perempuan, tps = r[0:4]
+    bars = {label: r[4 + i] for i, label in enumerate(_KET_LABEL.values())}
+    total_tms, baru_l, baru_p, baru_total, ubah_l, ubah_p, ubah_total = r[12:19]
+    return {
+        "total": total, "laki": laki, "perempuan": perempuan,
+        "tps": tps,
+        "bars": bars,
+        "total_tms": total_tms,
+        "baru_l": baru_l, "baru_p": baru_p, "baru_total": baru_total,
+        "ubah_l": ubah_l, "ubah_p": ubah_p, "ubah_total": ubah_total,
+    }
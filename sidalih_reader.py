@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+sidalih_reader.py – Pembaca CSV Sidalih (delimiter '#') untuk import NexVo, satu kali baca.
+• PemetaanSidalih : pemetaan alias header → kolom tabel tahapan dihitung SEKALI dari header.
+• SidalihReader   : streaming baris CSV → validasi wilayah + normalisasi baris dalam satu pass.
+Memori puncak konstan: baris dibaca satu per satu dan ditulis per chunk oleh pemanggil
+(executemany_bertahap), tidak ada list seluruh isi file.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from import_worker import ImportDitolak, baca_csv_bertahap
+from pemilih_store import KOLOM_PEMILIH
+
+# Kolom wajib penanda CSV dari aplikasi Sidalih
+KOLOM_WAJIB_SIDALIH = frozenset(("KEC_ID", "KEL_ID", "TPS_ID", "TAHAPAN_ID"))
+
+# CSV dengan baris (termasuk header) kurang dari ini dianggap tidak valid
+MIN_BARIS_SIDALIH = 15
+
+STATUS_DIIMPORT = frozenset(("AKTIF", "UBAH", "BARU"))
+
+ALIAS_KECAMATAN = ["KECAMATAN", "KEC", "DISTRIK", "NAMA KEC", "NAMA_KEC"]
+ALIAS_KELURAHAN = [
+    "KELURAHAN", "KEL", "DESA", "KEL/DESA", "DESA/KEL",
+    "KELURAHAN/DESA", "DESA/KELURAHAN",
+    "NAMA KEL", "NAMA_KEL", "NAMA DESA", "NAMA_DESA",
+]
+
+# Alias header CSV → kolom internal (urutan alias = prioritas)
+ALIAS_SIDALIH = {
+    "DPID": ["DPID", "ID", "DP_ID", "DP ID"],
+    "NKK": ["NKK", "NO KK", "NO_KK"],
+    "NIK": ["NIK"],
+    "NAMA": ["NAMA", "NAMA LENGKAP", "NAMA_LENGKAP"],
+    "JK": ["KELAMIN", "JENIS_KELAMIN", "JENISKELAMIN", "JENIS KELAMIN", "JK"],
+    "TMPT_LHR": ["TEMPAT LAHIR", "TMPTLHR", "TMPT_LHR", "TEMPAT_LAHIR",
+                 "TMPT LAHIR", "TMPT_LAHIR", "TEMPATLAHIR"],
+    "TGL_LHR": ["TANGGAL LAHIR", "TGLLHR", "TGL_LHR", "TANGGAL_LAHIR",
+                "TGL LHR", "TGL_LAHIR", "TGL LAHIR", "TANGGALLAHIR"],
+    "STS": ["STS KAWIN", "STS_KAWIN", "STATUS", "STS", "KAWIN",
+            "STATUS KAWIN", "STATUS_KAWIN", "STATUSKAWIN"],
+    "ALAMAT": ["ALAMAT", "ALMT", "KAMPUNG", "JALAN"],
+    "RT": ["RT", "NO_RT", "NO RT"],
+    "RW": ["RW", "NO_RW", "NO RW"],
+    "DIS": ["DISABILITAS", "DIS", "DIFABEL", "DIF"],
+    "KTPel": ["EKTP", "KTP", "KTPEL", "KTP EL", "KTP_EL", "E KTP", "E_KTP"],
+    "SUMBER": ["SUMBER", "SMBR", "SUMBER DATA", "SUMBER_DATA", "SUMBERDATA"],
+    "KET": ["KETERANGAN", "KET"],
+    "TPS": ["TPS"],
+    "LastUpdate": ["UPDATED_AT", "UPDATED AT", "LAST_UPDATE", "LAST UPDATE"],
+}
+
+# Kolom *_ASAL diisi dari nilai utama (tanpa DPID_ASAL)
+KOLOM_ASAL = (
+    "NKK", "NIK", "NAMA", "JK", "TMPT_LHR", "TGL_LHR", "STS",
+    "ALAMAT", "RT", "RW", "DIS", "KTPel", "SUMBER", "TPS",
+)
+
+
+# =========================================================
+# 🔤 NORMALISASI
+# =========================================================
+def normalize_wilayah(text):
+    """Nama wilayah tanpa spasi/strip/underscore: hanya huruf A-Z dan angka."""
+    if not text:
+        return ""
+    return re.sub(r"[^A-Z0-9]", "", text.upper())
+
+
+def format_nama(nama):
+    """Kapitalisasi NAMA, kecuali kata setelah koma (gelar tetap benar)."""
+    if not nama:
+        return ""
+    parts = nama.split(",")
+    parts[0] = parts[0].upper()
+    if len(parts) > 1:
+        parts[1] = parts[1].strip().title()
+    return ", ".join(parts).strip()
+
+
+def _angka_tanpa_nol(val):
+    # hapus nol di depan, jika murni angka
+    return str(int(val)) if val.isdigit() else val
+
+
+def _ket_nol(val):
+    return "0"
+
+
+def _upper(val):
+    return val.upper()
+
+
+@lru_cache(maxsize=4096)
+def _format_lastupdate(val):
+    if not val:
+        return val
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(val, fmt).strftime("%d/%m/%Y")
+        except Exception:
+            pass
+    return val
+
+
+_NORMALISASI = {
+    "RT": _angka_tanpa_nol,
+    "RW": _angka_tanpa_nol,
+    "TPS": _angka_tanpa_nol,
+    "KET": _ket_nol,            # KET selalu '0'
+    "LastUpdate": _format_lastupdate,
+    "NAMA": format_nama,
+    "JK": _upper,
+    "STS": _upper,
+    "ALAMAT": _upper,
+    "KTPel": _upper,
+    "SUMBER": _upper,
+}
+
+
+# =========================================================
+# 🗺️ PEMETAAN HEADER (SEKALI)
+# =========================================================
+def _cari_kolom_wilayah(header, aliases):
+    for name in aliases:
+        for i, col in enumerate(header):
+            if col == name or re.search(rf"\b{name}\b", col):
+                return i
+    return None
+
+
+class PemetaanSidalih:
+    """
+    Hasil analisis header CSV Sidalih (dihitung sekali, dipakai untuk setiap baris).
+    • rencana : [(idx_csv, posisi_kolom, fungsi_normalisasi|None), ...]
+    • salin   : [(posisi_kolom_utama, posisi_kolom_asal), ...]
+    """
+
+    def __init__(self, header_row, kolom=KOLOM_PEMILIH):
+        self.header = [h.strip().upper() for h in header_row]
+        header_idx = {col: i for i, col in enumerate(self.header)}
+        self.kolom = tuple(kolom)
+        posisi = {c: i for i, c in enumerate(self.kolom)}
+
+        self.sidalih = KOLOM_WAJIB_SIDALIH.issubset(self.header)
+        self.idx_kec = _cari_kolom_wilayah(self.header, ALIAS_KECAMATAN)
+        self.idx_kel = _cari_kolom_wilayah(self.header, ALIAS_KELURAHAN)
+        self.idx_status = header_idx.get("STATUS")
+
+        self.rencana = []
+        for target, aliases in ALIAS_SIDALIH.items():
+            idx = next((header_idx[a] for a in aliases if a in header_idx), None)
+            if idx is not None and target in posisi:
+                self.rencana.append((idx, posisi[target], _NORMALISASI.get(target)))
+
+        self.salin = [
+            (posisi[c], posisi[f"{c}_ASAL"]) for c in KOLOM_ASAL
+            if c in posisi and f"{c}_ASAL" in posisi
+        ]
+        self.pos_kecamatan = posisi.get("KECAMATAN")
+        self.pos_desa = posisi.get("DESA")
+        self.pos_checked = posisi.get("checked")
+        self.pos_ket = posisi.get("KET")
+
+    def templat(self, kecamatan, desa):
+        """Baris dasar: semua kolom "" + checked/KET='0'/KECAMATAN/DESA dari aplikasi (bukan CSV)."""
+        dasar = [""] * len(self.kolom)
+        if self.pos_checked is not None:
+            dasar[self.pos_checked] = 0
+        if self.pos_ket is not None:
+            dasar[self.pos_ket] = "0"
+        if self.pos_kecamatan is not None:
+            dasar[self.pos_kecamatan] = kecamatan
+        if self.pos_desa is not None:
+            dasar[self.pos_desa] = desa
+        return dasar
+
+
+# =========================================================
+# 📄 READER STREAMING
+# =========================================================
+class SidalihReader:
+    """
+    Satu kali baca CSV Sidalih:
+    • setiap baris berisi diperiksa KECAMATAN/DESA-nya (beda wilayah → ImportDitolak seketika),
+    • baris ber-STATUS AKTIF/UBAH/BARU dinormalisasi menjadi tuple siap INSERT.
+    Setelah iterasi habis, validasi akhir (jumlah baris minimum, wilayah ditemukan) dijalankan.
+    """
+
+    def __init__(self, file_path, pemetaan, kecamatan, desa, ctx=None,
+                 pesan="Mengimpor data CSV..."):
+        self.file_path = file_path
+        self.pemetaan = pemetaan
+        self.kecamatan = kecamatan or ""
+        self.desa = desa or ""
+        self.ctx = ctx
+        self.pesan = pesan
+        self.jumlah_baris = 0
+        self.jumlah_dimuat = 0
+
+    def _pesan_wilayah(self):
+        return (
+            f"Import CSV gagal!\nHarap Import CSV untuk Desa {self.desa.title()} "
+            f"yang bersumber dari Sidalih."
+        )
+
+    def _pemeriksa_wilayah(self):
+        """
+        Fungsi cek(row) untuk validasi wilayah per baris (setara distinct check: semua nilai = wilayah aplikasi).
+        Beda wilayah → ImportDitolak; cek.ditemukan mencatat apakah KECAMATAN/DESA pernah terisi.
+        """
+        idx_kec, idx_kel = self.pemetaan.idx_kec, self.pemetaan.idx_kel
+        kec_app = normalize_wilayah(self.kecamatan)
+        desa_app = normalize_wilayah(self.desa)
+        # Cache normalisasi wilayah: nilai mentah di satu file hampir selalu sama
+        wilayah_ok = {}
+        ditemukan = {"K": False, "D": False}
+
+        def _satu(kode, mentah, target):
+            ok = wilayah_ok.get((kode, mentah))
+            if ok is None:
+                nilai = mentah.strip()
+                ok = wilayah_ok[(kode, mentah)] = (not nilai) or normalize_wilayah(nilai) == target
+            if not ok:
+                raise ImportDitolak(self._pesan_wilayah(), judul="Error")
+            if not ditemukan[kode] and mentah.strip():
+                ditemukan[kode] = True
+
+        def cek(row):
+            if idx_kec < len(row):
+                _satu("K", row[idx_kec], kec_app)
+            if idx_kel < len(row):
+                _satu("D", row[idx_kel], desa_app)
+
+        cek.ditemukan = ditemukan
+        return cek
+
+    def _periksa_akhir(self, cek):
+        # Header ikut dihitung (sama dengan len(reader) lama)
+        if self.jumlah_baris + 1 < MIN_BARIS_SIDALIH:
+            raise ImportDitolak("File CSV tidak valid atau terlalu pendek.", judul="Error")
+        if not (cek.ditemukan["K"] and cek.ditemukan["D"]):
+            raise ImportDitolak(self._pesan_wilayah(), judul="Error")
+
+    def __iter__(self):
+        pm = self.pemetaan
+        idx_status = pm.idx_status
+        rencana, salin = pm.rencana, pm.salin
+        jumlah_kolom = len(pm.header)
+        dasar = pm.templat(self.kecamatan.upper(), self.desa.upper())
+        cek = self._pemeriksa_wilayah()
+
+        for row in baca_csv_bertahap(self.file_path, self.ctx, self.pesan):
+            self.jumlah_baris += 1
+            if not row:
+                continue
+
+            # --- Validasi wilayah ---
+            cek(row)
+
+            # --- Filter & mapping baris ---
+            if len(row) < jumlah_kolom:
+                continue
+            if row[idx_status].strip().upper() not in STATUS_DIIMPORT:
+                continue
+
+            out = dasar.copy()
+            for src_idx, pos, norm in rencana:
+                val = (row[src_idx] or "").strip()
+                out[pos] = norm(val) if norm is not None else val
+            for pos_utama, pos_asal in salin:
+                out[pos_asal] = out[pos_utama]
+
+            self.jumlah_dimuat += 1
+            yield tuple(out)
+
+        self._periksa_akhir(cek)
+
+    def periksa_wilayah(self):
+        """
+        Validasi wilayah SELURUH file sebelum OTP (streaming, memori konstan, tanpa mapping baris)
+        → CSV yang baris-baris akhirnya berasal dari desa lain ditolak sebelum pengguna konfirmasi.
+        ImportDitolak bila tidak lolos. Worker tetap memeriksa ulang saat import (file bisa berubah).
+        """
+        self.jumlah_baris = 0
+        cek = self._pemeriksa_wilayah()
+        for row in baca_csv_bertahap(self.file_path):
+            self.jumlah_baris += 1
+            if row:
+                cek(row)
+        self._periksa_akhir(cek)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""db_manager membaca %APPDATA% saat di-import → arahkan ke folder sementara untuk pengujian."""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("APPDATA", tempfile.mkdtemp(prefix="nexvo_test_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Regresi: hapus data massal tidak boleh merusak index teks FTS5 (fts_<tahapan>)."""
+
+import sqlite3
+
+import pytest
+
+from db_manager import hapus_buat_akun, hapus_semua_data
+from filter_pemilih import kondisi_sql
+from indeks_teks import ensure_indeks_teks, fts_didukung, indeks_teks_tersedia
+
+
+def _db():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("CREATE TABLE kecamatan (nama TEXT)")
+    conn.execute("CREATE TABLE users (nama TEXT)")
+    conn.execute("CREATE TABLE dphp (NIK TEXT, NAMA TEXT, ALAMAT TEXT, TMPT_LHR TEXT)")
+    conn.execute("INSERT INTO kecamatan VALUES ('Lama')")
+    conn.execute("INSERT INTO dphp VALUES ('1', 'SITI AMINAH', 'JL MAWAR', 'BANDUNG')")
+    ensure_indeks_teks(conn)
+    return conn
+
+
+def _cari_nama(conn, nama):
+    indeks = indeks_teks_tersedia(conn, "dphp")
+    assert indeks == "fts_dphp"
+    conditions, params = kondisi_sql({"nama": nama}, indeks_teks=indeks)
+    sql = "SELECT NIK FROM dphp WHERE " + " AND ".join(conditions)
+    return [r[0] for r in conn.execute(sql, params)]
+
+
+@pytest.mark.parametrize("hapus", [hapus_semua_data, hapus_buat_akun])
+def test_hapus_lalu_insert_dan_cari(hapus):
+    conn = _db()
+    if not fts_didukung(conn):
+        pytest.skip("SQLite tanpa FTS5 trigram")
+
+    hapus(conn)
+    assert conn.execute("SELECT COUNT(*) FROM dphp").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM kecamatan").fetchone()[0] == 1
+    assert _cari_nama(conn, "AMINAH") == []
+
+    conn.execute("INSERT INTO dphp VALUES ('2', 'BUDI SANTOSO', 'JL MELATI', 'GARUT')")
+    assert _cari_nama(conn, "SANTOSO") == ["2"]
+    assert _cari_nama(conn, "AMINAH") == []
+    # rank=1 → cocokkan juga dengan isi tabel dphp (external content)
+    conn.execute("INSERT INTO fts_dphp (fts_dphp, rank) VALUES ('integrity-check', 1)")
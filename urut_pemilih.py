@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+urut_pemilih.py – Pengurutan data pemilih (grid utama) dengan kunci & urutan yang disimpan.
+• Kunci komposit tiap baris disimpan per rowid bersama nilai sumbernya → dihitung ulang hanya
+  bila nilai kolom sumber berubah (edit / import), bukan setiap kali sort_data dipanggil.
+• Setelah mengurutkan, tiap baris mendapat peringkat padat (kunci sama → peringkat sama).
+  Urut ulang tanpa perubahan = sort bilangan bulat; baris yang berubah/baru diurutkan sendiri
+  lalu disisipkan (bisect) ke urutan lama → hanya baris yang tersentuh yang berpindah.
+• Hasil sama dengan list.sort(key=..., reverse=...) yang stabil; satu-satunya beda: bila kunci baris
+  lama dan baris yang berubah persis sama, urutan keduanya mengikuti urutan lama (bukan urutan masukan).
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from operator import attrgetter
+
+from filter_pemilih import urai_update
+
+_ANGKA_HURUF = re.compile(r"(\d+)([A-Za-z]*)")
+
+
+@lru_cache(maxsize=4096)
+def angka_huruf(teks):
+    """'10B' → (10, 'B'), '3' → (3, ''), selain itu (0, TEKS) – untuk TPS / RW / RT."""
+    match = _ANGKA_HURUF.match(teks)
+    if match:
+        return (int(match.group(1)), match.group(2).upper())
+    return (0, teks.upper())
+
+
+def kunci_wilayah(tps, rw, rt, nkk, nama):
+    """Urutan bawaan grid: TPS, RW, RT (angka di depan numerik), NKK, NAMA."""
+    return (
+        angka_huruf(str(tps).strip()),
+        angka_huruf(str(rw).strip()),
+        angka_huruf(str(rt).strip()),
+        str(nkk).strip(),
+        str(nama).strip().upper(),
+    )
+
+
+def kunci_update(last_update):
+    """LastUpdate → (y, m, d, jam) dengan jam ikut sebagai penentu; tak terbaca → paling awal."""
+    val = (last_update or "").strip()
+    tgl = urai_update(val) if val else None
+    if tgl is None:
+        return (0, 0, 0, "")
+    return (*tgl, val[11:] if len(val) == 19 else "")
+
+
+class PengurutTersimpan:
+    """
+    Pengurut satu jenis urutan untuk satu tabel tahapan.
+    • kolom      : nama kolom sumber kunci (urutan = argumen buat_kunci).
+    • buat_kunci : fungsi(*nilai_kolom) -> kunci yang bisa dibandingkan.
+    """
+
+    def __init__(self, kolom, buat_kunci):
+        self._kolom = tuple(kolom)
+        self._ambil = attrgetter(*self._kolom)
+        self._buat_kunci = buat_kunci
+        self._entri = {}        # rowid → [sumber, kunci, (generasi, peringkat) | None]
+        self._generasi = 0
+
+    def _sumber(self, item):
+        try:
+            nilai = self._ambil(item)
+        except AttributeError:
+            # dict / Row: akses per key, kolom hilang → ""
+            nilai = tuple(item.get(k, "") for k in self._kolom)
+            return nilai if len(self._kolom) > 1 else nilai[0]
+        return nilai
+
+    def _entri_untuk(self, item):
+        """Entri kunci baris (dibuat / diperbarui bila nilai sumber berubah)."""
+        sumber = self._sumber(item)
+        rowid = getattr(item, "rowid", None) if not isinstance(item, dict) else item.get("rowid")
+        entri = self._entri.get(rowid) if rowid is not None else None
+        if entri is None or entri[0] != sumber:
+            args = sumber if len(self._kolom) > 1 else (sumber,)
+            entri = [sumber, self._buat_kunci(*args), None]
+            if rowid is not None:
+                self._entri[rowid] = entri
+        return entri
+
+    def kunci(self, item):
+        return self._entri_untuk(item)[1]
+
+    def urutkan(self, data, turun=False):
+        """Urutkan list data in-place (setara data.sort(key=kunci, reverse=turun))."""
+        if not data:
+            return
+        if turun:
+            # Sort stabil menurun = balik(sort stabil menaik atas data yang dibalik)
+            data.reverse()
+            self.urutkan(data)
+            data.reverse()
+            return
+
+        generasi = self._generasi
+        simpanan = self._entri
+        ambil = self._ambil
+        entri, peringkat, tetap, berubah = [], [], [], []
+        # Dibuat sebaris (dipanggil tiap filter / hapus / import): tanpa pemanggilan fungsi per baris
+        for i, item in enumerate(data):
+            try:
+                e = simpanan.get(item.rowid)
+                sumber = ambil(item)
+            except AttributeError:
+                e = self._entri_untuk(item)
+            else:
+                if e is None or e[0] != sumber:
+                    e = self._entri_untuk(item)
+            entri.append(e)
+            p = e[2]
+            if p is not None and p[0] == generasi:
+                peringkat.append(p[1])
+                tetap.append(i)
+            else:
+                peringkat.append(-1)
+                berubah.append(i)
+
+        # Baris tak berubah: cukup sort peringkat (int) → stabil, tie tetap urutan masukan
+        tetap.sort(key=peringkat.__getitem__)
+        if not berubah:
+            data[:] = [data[i] for i in tetap]
+            return
+
+        # Baris berubah / baru: urutkan sendiri, lalu sisipkan ke urutan lama (bisect per baris)
+        berubah.sort(key=lambda i: entri[i][1])
+        kunci_tetap = [entri[i][1] for i in tetap]
+        urutan, awal = [], 0
+        for i in berubah:
+            posisi = bisect_right(kunci_tetap, entri[i][1], awal)
+            urutan.extend(tetap[awal:posisi])
+            urutan.append(i)
+            awal = posisi
+        urutan.extend(tetap[awal:])
+        data[:] = [data[i] for i in urutan]
+        self._susun_peringkat([entri[i] for i in urutan])
+
+    def _susun_peringkat(self, terurut):
+        """Peringkat padat generasi baru untuk semua baris di urutan terakhir (menaik)."""
+        self._generasi += 1
+        generasi = self._generasi
+        peringkat, sebelumnya = -1, object()
+        for e in terurut:
+            if e[1] != sebelumnya:
+                peringkat += 1
+                sebelumnya = e[1]
+            e[2] = (generasi, peringkat)
+        # Entri baris yang sudah tidak dimuat (terhapus / tabel diganti) dibuang sesekali
+        if len(self._entri) > 2 * len(terurut) + 1024:
+            self._entri = {rid: e for rid, e in self._entri.items() if e[2] and e[2][0] == generasi}
+
+
+def pengurut_wilayah():
+    return PengurutTersimpan(("TPS", "RW", "RT", "NKK", "NAMA"), kunci_wilayah)
+
+
+def pengurut_update():
+    return PengurutTersimpan(("LastUpdate",), kunci_update)
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+validasi_engine.py – Mesin pemeriksaan kualitas data pemilih NexVo (satu kali baca).
+• ValidasiRule   : dasar aturan; feed() dipanggil per baris, selesai() mengembalikan hasil.
+• ValidasiEngine : streaming tabel tahapan SEKALI, semua aturan dievaluasi bersamaan.
+• RULES_DEFAULT  : aturan bawaan untuk menu Cek Data (NKK/NIK invalid, dibawah umur, dst).
+Aturan baru cukup dibuat sebagai subclass ValidasiRule lalu didaftarkan ke engine.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from db_manager import sql_pilih_pemilih, versi_data
+from filter_pemilih import FORMAT_TGL_LAHIR, urai_tanggal
+from pemilih_store import StringPool, iter_records
+
+KET_HAPUS = frozenset(("1", "2", "3", "4", "5", "6", "7", "8"))
+
+# Tanggal pemilu acuan untuk potensi dibawah umur
+TANGGAL_PEMILU = datetime(2029, 2, 14)  # 14 Februari 2029
+
+
+def urut_tps_rw_rt(d):
+    """Kunci urut standar hasil cek: TPS, RW, RT, NKK, NAMA."""
+    return (d.get("TPS", ""), d.get("RW", ""), d.get("RT", ""), d.get("NKK", ""), d.get("NAMA", ""))
+
+
+class NilaiBaris:
+    """Nilai kolom kunci yang sudah di-strip sekali per baris (dipakai bersama semua aturan)."""
+    __slots__ = ("ket", "nik", "nkk", "tps")
+
+    def __init__(self, d):
+        self.ket = (d.get("KET") or "").strip().upper()
+        self.nik = (d.get("NIK") or "").strip()
+        self.nkk = (d.get("NKK") or "").strip()
+        self.tps = (d.get("TPS") or "").strip()
+
+
+# =========================================================
+# 🧩 DASAR ATURAN
+# =========================================================
+class ValidasiRule:
+    """
+    Dasar aturan validasi.
+    • nama    : kunci unik hasil (dipakai oleh menu Cek Data).
+    • urutkan : kunci sort hasil (None → urutan tabel).
+    Aturan per-baris cukup override cocok(); aturan berkelompok override feed()/selesai().
+    """
+    nama = ""
+    urutkan = staticmethod(urut_tps_rw_rt)
+
+    def mulai(self):
+        self._hasil = []
+
+    def feed(self, d, v):
+        if self.cocok(d, v):
+            self._hasil.append(d)
+
+    def cocok(self, d, v):
+        return False
+
+    def selesai(self):
+        hasil = self._hasil
+        self._hasil = []
+        if self.urutkan is not None:
+            hasil.sort(key=self.urutkan)
+        return hasil
+
+
+# =========================================================
+# 📋 ATURAN BAWAAN
+# =========================================================
+class _DigitTanggalRule(ValidasiRule):
+    """NKK/NIK dianggap invalid bila panjang ≠ 16 atau digit tanggal/bulan tidak wajar."""
+    urutkan = None
+    kolom = "nkk"
+    batas_tgl = 31
+
+    def cocok(self, d, v):
+        if v.ket in KET_HAPUS:
+            return False
+        nomor = getattr(v, self.kolom)
+        if len(nomor) != 16:
+            return True
+        try:
+            dd, mm = int(nomor[6:8]), int(nomor[8:10])
+        except Exception:
+            return True
+        return not (1 <= dd <= self.batas_tgl and 1 <= mm <= 12)
+
+
+class NkkInvalidRule(_DigitTanggalRule):
+    nama = "nkk_invalid"
+    kolom = "nkk"
+    batas_tgl = 31
+
+
+class NikInvalidRule(_DigitTanggalRule):
+    nama = "nik_invalid"
+    kolom = "nik"
+    batas_tgl = 71   # tanggal lahir perempuan +40
+
+
+class DibawahUmurRule(ValidasiRule):
+    """Umur < 13 pada hari pemilu, atau 13–17 dengan STS = B."""
+    nama = "dibawah_umur"
+    urutkan = None
+
+    def __init__(self, tanggal_pemilu=TANGGAL_PEMILU):
+        self.tanggal_pemilu = tanggal_pemilu
+        self._cache_tgl = {}
+
+    @staticmethod
+    def _parse_tgl(tgl):
+        # Pengurai tanpa strptime yang sama dengan filter umur / kolom TGL_LHR_ISO
+        tgl = urai_tanggal(tgl, FORMAT_TGL_LAHIR)
+        return None if tgl is None else datetime(*tgl)
+
+    def cocok(self, d, v):
+        if v.ket in KET_HAPUS:
+            return False
+        tgl = (d.get("TGL_LHR") or "").strip()
+        if not tgl:
+            return False
+        umur = self._cache_tgl.get(tgl, False)
+        if umur is False:
+            tgl_lhr = self._parse_tgl(tgl)
+            umur = None if tgl_lhr is None else (self.tanggal_pemilu - tgl_lhr).days / 365.25
+            self._cache_tgl[tgl] = umur
+        if umur is None:
+            return False
+        if umur < 13:
+            return True
+        sts = (d.get("STS") or "").strip().upper()
+        return 13 <= umur < 17 and sts == "B"
+
+
+class BedaTpsRule(ValidasiRule):
+    """NKK sama tetapi tersebar di lebih dari satu TPS (KET 1–8 dilewati)."""
+    nama = "beda_tps"
+
+    @staticmethod
+    def urutkan(d):
+        return (d.get("NKK", ""), d.get("TPS", ""), d.get("RW", ""), d.get("RT", ""), d.get("NAMA", ""))
+
+    def mulai(self):
+        self._grup = defaultdict(list)
+        self._tps = defaultdict(set)
+
+    def feed(self, d, v):
+        if not v.nkk or v.ket in KET_HAPUS:
+            return
+        self._grup[v.nkk].append(d)
+        self._tps[v.nkk].add(v.tps)
+
+    def selesai(self):
+        hasil = [
+            d for nkk, daftar in self._grup.items()
+            if len(daftar) > 1 and len(self._tps[nkk]) > 1
+            for d in daftar
+        ]
+        self._grup, self._tps = None, None
+        hasil.sort(key=self.urutkan)
+        return hasil
+
+
+class TidakPadanRule(ValidasiRule):
+    """KET = 8 tanpa pasangan KET = B dengan NIK yang sama."""
+    nama = "tidak_padan"
+
+    def mulai(self):
+        self._kode8 = []
+        self._nik_baru = set()
+
+    def feed(self, d, v):
+        if not v.nik:
+            return
+        if v.ket == "8":
+            self._kode8.append((v.nik, d))
+        elif v.ket == "B":
+            self._nik_baru.add(v.nik)
+
+    def selesai(self):
+        hasil = [d for nik, d in self._kode8 if nik not in self._nik_baru]
+        self._kode8, self._nik_baru = None, None
+        hasil.sort(key=self.urutkan)
+        return hasil
+
+
+class GandaNikRule(ValidasiRule):
+    """NIK muncul lebih dari sekali (KET 1–8 dilewati)."""
+    nama = "ganda_nik"
+
+    def mulai(self):
+        self._grup = defaultdict(list)
+
+    def feed(self, d, v):
+        if v.nik and v.ket not in KET_HAPUS:
+            self._grup[v.nik].append(d)
+
+    def selesai(self):
+        hasil = [d for daftar in self._grup.values() if len(daftar) > 1 for d in daftar]
+        self._grup = None
+        hasil.sort(key=self.urutkan)
+        return hasil
+
+
+class _BaruMenurutJumlahNikRule(ValidasiRule):
+    """Dasar aturan KET = B yang dibedakan dari jumlah kemunculan NIK di seluruh tabel."""
+    unik = True
+
+    def mulai(self):
+        self._jumlah = defaultdict(int)
+        self._baru = []
+
+    def feed(self, d, v):
+        if not v.nik:
+            return
+        self._jumlah[v.nik] += 1
+        if v.ket == "B":
+            self._baru.append((v.nik, d))
+
+    def selesai(self):
+        jumlah = self._jumlah
+        if self.unik:
+            hasil = [d for nik, d in self._baru if jumlah[nik] == 1]
+        else:
+            hasil = [d for nik, d in self._baru if jumlah[nik] > 1]
+        self._jumlah, self._baru = None, None
+        hasil.sort(key=self.urutkan)
+        return hasil
+
+
+class PemilihPemulaRule(_BaruMenurutJumlahNikRule):
+    """Pemilih baru non-DP4: KET = B dan NIK hanya muncul sekali."""
+    nama = "pemilih_pemula"
+    unik = True
+
+
+class BaruKode8Rule(_BaruMenurutJumlahNikRule):
+    """Pemilih baru yang sudah ada di DP4: KET = B dan NIK muncul lebih dari sekali."""
+    nama = "baru_kode8"
+    unik = False
+
+
+class UbahJenisKelaminRule(ValidasiRule):
+    """KET = U dengan JK ≠ JK_ASAL (keduanya L/P)."""
+    nama = "ubah_jeniskelamin"
+
+    def cocok(self, d, v):
+        if v.ket != "U":
+            return False
+        jk = (d.get("JK") or "").strip().upper()
+        jk_asal = (d.get("JK_ASAL") or "").strip().upper()
+        return jk in ("L", "P") and jk_asal in ("L", "P") and jk != jk_asal
+
+
+class UbahTpsRule(ValidasiRule):
+    """KET = U dengan TPS ≠ TPS_ASAL."""
+    nama = "ubah_tps"
+
+    def cocok(self, d, v):
+        return v.ket == "U" and v.tps != (d.get("TPS_ASAL") or "").strip()
+
+
+RULES_DEFAULT = (
+    NkkInvalidRule,
+    NikInvalidRule,
+    DibawahUmurRule,
+    BedaTpsRule,
+    TidakPadanRule,
+    GandaNikRule,
+    PemilihPemulaRule,
+    BaruKode8Rule,
+    UbahJenisKelaminRule,
+    UbahTpsRule,
+)
+
+
+# =========================================================
+# ⚙️ ENGINE
+# =========================================================
+class ValidasiEngine:
+    """
+    Jalankan semua aturan dalam satu kali baca tabel tahapan.
+    Hasil di-cache per (tabel, db_manager.versi_data) → pindah antar hasil cek instan
+    selama tabel tidak berubah; tulisan di koneksi mana pun, reconnect, atau restore membatalkan cache.
+    """
+
+    def __init__(self, rules=None):
+        self._rule_classes = list(rules or RULES_DEFAULT)
+        self._cache_key = None
+        self._cache = None
+
+    def daftar(self, rule_cls):
+        """Daftarkan aturan tambahan (cache lama dibatalkan)."""
+        self._rule_classes.append(rule_cls)
+        self.invalidate()
+
+    def invalidate(self):
+        self._cache_key = None
+        self._cache = None
+
+    @staticmethod
+    def _kunci_cache(conn, tbl_name):
+        versi = versi_data(conn)
+        if versi is None:
+            return None
+        return (tbl_name, versi)
+
+    def jalankan(self, conn, tbl_name, chunk=5000):
+        """
+        Kembalikan (jumlah_baris, {nama_rule: [PemilihRecord, ...]}).
+        Tabel dibaca bertahap (fetchmany) dan hanya baris yang terkena aturan ditahan di memori.
+        """
+        kunci = self._kunci_cache(conn, tbl_name)
+        if kunci is not None and kunci == self._cache_key:
+            return self._cache
+
+        rules = [cls() for cls in self._rule_classes]
+        for r in rules:
+            r.mulai()
+        feeds = [r.feed for r in rules]
+
+        cur = conn.cursor()
+        cur.execute(sql_pilih_pemilih(conn, tbl_name))
+        col_names = [desc[0] for desc in cur.description]
+
+        def _baris():
+            while True:
+                batch = cur.fetchmany(chunk)
+                if not batch:
+                    return
+                yield from batch
+
+        total = 0
+        for d in iter_records(_baris(), col_names, pool=StringPool()):
+            total += 1
+            v = NilaiBaris(d)
+            for feed in feeds:
+                feed(d, v)
+
+        hasil = (total, {r.nama: r.selesai() for r in rules})
+        if kunci is not None:
+            self._cache_key, self._cache = kunci, hasil
+        return hasil